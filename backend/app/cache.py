@@ -0,0 +1,242 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+from app.serialization import FastJSONResponse
+from app.compression import COMPRESSION_MIN_SIZE, ENCODINGS, choose_encoding, compress, weak_etag
+
+# Cache settings, override in .env
+load_dotenv()
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # "memory", "redis" or "none"
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", 300))  # also bounds staleness from writes made outside the API
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", 1024))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+class MemoryBackend:
+    """In-process LRU with a TTL. Thread safe, since sync routes run on FastAPI's threadpool."""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, body)
+        self.generations = {}
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, body: bytes):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def generation(self, tag: str) -> int:
+        return self.generations.get(tag, 0)
+
+    def bump(self, tag: str):
+        with self.lock:
+            self.generations[tag] = self.generations.get(tag, 0) + 1
+            # the old generation's entries can never be hit again, free them now rather than waiting on the LRU
+            stale = [key for key in self.entries if key.startswith(f"{tag}:")]
+            for key in stale:
+                del self.entries[key]
+
+    def __len__(self):
+        return len(self.entries)
+
+class RedisBackend:
+    """Same interface on a Redis (or Redis-compatible) server, so several API processes share one cache."""
+
+    def __init__(self, url: str, ttl: int):
+        import redis  # optional, only needed when CACHE_BACKEND=redis
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(f"cache:{key}")
+
+    def set(self, key: str, body: bytes):
+        self.client.set(f"cache:{key}", body, ex=self.ttl)
+
+    def generation(self, tag: str) -> int:
+        return int(self.client.get(f"cache-generation:{tag}") or 0)
+
+    def bump(self, tag: str):
+        # old entries just stop being looked up and expire on their own
+        self.client.incr(f"cache-generation:{tag}")
+
+    def __len__(self):
+        return self.client.dbsize()
+
+class CatalogVersion:
+    """The trigger-maintained change counter for one catalog (see db/migrations/<dialect>/004_catalog_versions.sql)."""
+
+    def __init__(self, name: str, version: int, updated_at: str | None):
+        self.name = name
+        self.version = version
+        self.etag = f'"{name}-{version}"'
+        self.last_modified = None
+        if updated_at:
+            self.last_modified = datetime.fromisoformat(str(updated_at)).replace(tzinfo=timezone.utc, microsecond=0)
+
+    def headers(self, encoding: str | None = None) -> dict:
+        headers = {"ETag": weak_etag(self.etag) if encoding else self.etag, "Vary": "Accept-Encoding"}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """True if the client's copy (If-None-Match, or failing that If-Modified-Since) is still current."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or self.etag in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified:
+            try:
+                return self.last_modified <= parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+        return False
+
+CATALOG_VERSION = text('SELECT "version", "updated_at" FROM "catalog_versions" WHERE "name" = :name')
+
+def catalog_version(db: Session, name: str) -> CatalogVersion:
+    row = db.execute(CATALOG_VERSION, {"name": name}).first()
+    return CatalogVersion(name, *row) if row else CatalogVersion(name, 0, None)
+
+async def async_catalog_version(db: AsyncSession, name: str) -> CatalogVersion:
+    row = (await db.execute(CATALOG_VERSION, {"name": name})).first()
+    return CatalogVersion(name, *row) if row else CatalogVersion(name, 0, None)
+
+class ResponseCache:
+    """Caches the encoded JSON body of read routes, keyed by path and query string.
+
+    Bodies of COMPRESSION_MIN_SIZE or more are also stored br/gzip compressed, once, when they're
+    cached, so repeat requests get the compressed bytes without compressing anything again.
+
+    Every entry belongs to a tag ("artworks", "artists"). Write routes call invalidate() with the tags
+    they touch, which moves the tag on to a new generation, so every cached key for it misses from then on.
+    Given the catalog's version, responses also carry an ETag/Last-Modified, a client that already has
+    the current version gets a bare 304, and writes made outside the API (which bump the version) miss too.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def key(self, tag: str, request: Request, version: CatalogVersion | None = None) -> str:
+        query = "&".join(sorted(f"{name}={value}" for name, value in request.query_params.multi_items()))
+        version_number = version.version if version else ""
+        return f"{tag}:{self.backend.generation(tag)}:{version_number}:{request.url.path}?{query}"
+
+    def lookup(self, tag: str, request: Request, version: CatalogVersion | None) -> tuple[Response | None, str | None]:
+        """A 304 or the cached response if there is one, otherwise None and the key to store the fresh one under."""
+        headers = version.headers() if version else {}
+        if version and version.matches(request):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers), None
+
+        if self.backend is None:
+            return None, None
+
+        key = self.key(tag, request, version)
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding:
+            body = self.backend.get(f"{key}|{encoding}")
+            if body is not None:
+                self.hits += 1
+                return self.encoded_response(body, encoding, version), None
+        body = self.backend.get(key)
+        if body is not None:
+            self.hits += 1
+            return Response(content=body, media_type="application/json", headers=headers), None
+
+        self.misses += 1
+        return None, key
+
+    def encoded_response(self, body: bytes, encoding: str, version: CatalogVersion | None) -> Response:
+        headers = version.headers(encoding) if version else {"Vary": "Accept-Encoding"}
+        return Response(content=body, media_type="application/json", headers={**headers, "Content-Encoding": encoding})
+
+    def store(self, key: str | None, value, version: CatalogVersion | None, request: Request) -> Response:
+        # value is plain data (dicts, lists, row dataclasses), orjson encodes it without a jsonable_encoder pass
+        response = FastJSONResponse(value, headers=version.headers() if version else {})
+        if key is None:
+            return response
+        self.backend.set(key, response.body)
+        if len(response.body) < COMPRESSION_MIN_SIZE:
+            return response
+
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        encoded = None
+        for name in ENCODINGS:
+            body = compress(response.body, name, cached=True)
+            self.backend.set(f"{key}|{name}", body)
+            if name == encoding:
+                encoded = self.encoded_response(body, name, version)
+        return encoded or response
+
+    def get_or_set(self, tag: str, request: Request, compute, version: CatalogVersion | None = None) -> Response:
+        """Return the cached response for this request, or call compute() and cache what it returns."""
+        response, key = self.lookup(tag, request, version)
+        if response is not None:
+            return response
+        return self.store(key, compute(), version, request)
+
+    async def aget_or_set(self, tag: str, request: Request, compute, version: CatalogVersion | None = None) -> Response:
+        """get_or_set for async routes, compute is an async function.
+
+        Encoding, compressing and (with Redis) storing a miss run on the threadpool, a large body would
+        otherwise hold up every other request on the event loop while it's brotli'd.
+        """
+        response, key = self.lookup(tag, request, version)
+        if response is not None:
+            return response
+        value = await compute()
+        return await run_in_threadpool(self.store, key, value, version, request)
+
+    def invalidate(self, *tags: str):
+        if self.backend is not None:
+            for tag in tags:
+                self.backend.bump(tag)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": CACHE_BACKEND,
+            "entries": len(self.backend) if self.backend is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+def make_backend():
+    if CACHE_BACKEND == "redis":
+        return RedisBackend(REDIS_URL, CACHE_TTL_SECONDS)
+    if CACHE_BACKEND == "none":
+        return None
+    return MemoryBackend(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+response_cache = ResponseCache(make_backend())
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+class ChangeLogIndex:
+    """Base for in-process indexes over catalog tables, kept current from the change log
+    (db/migrations/<dialect>/007_change_log.sql) instead of being rebuilt.
+
+    A subclass names the tables it follows and implements reload(), which reads everything, and
+    update(), which is given the ids changed per table since the last look, each with the operations
+    logged for it ('insert', 'update', 'delete'), and re-reads just those.
+    The index is built on first use; after that refresh() checks the log at most every refresh_seconds,
+    or on the next call after mark_stale(), which write routes call so their own writes show at once.
+    More than rebuild_after pending changes and it reloads instead.
+    """
+
+    tables: tuple = ()
+
+    def __init__(self, refresh_seconds: float, rebuild_after: int):
+        self.refresh_seconds = refresh_seconds
+        self.rebuild_after = rebuild_after
+        self.seq = None  # change log seq the index is current to, None until built
+        self.checked_at = 0.0
+        self.lock = asyncio.Lock()
+
+    async def reload(self, db: AsyncSession):
+        raise NotImplementedError
+
+    async def update(self, db: AsyncSession, changed: dict[str, dict[int, set]]):
+        raise NotImplementedError
+
+    async def rebuild(self, db: AsyncSession):
+        # the seq is read first, so anything written while the tables are read is applied again next time
+        seq = (await db.execute(text('SELECT COALESCE(MAX("seq"), 0) FROM "change_log"'))).scalar()
+        await self.reload(db)
+        self.seq = seq
+
+    async def catch_up(self, db: AsyncSession):
+        entries = (await db.execute(text("""
+            SELECT "seq", "table_name", "row_id", "operation" FROM "change_log"
+            WHERE "seq" > :seq
+            ORDER BY "seq"
+            LIMIT :limit
+        """), {"seq": self.seq, "limit": self.rebuild_after + 1})).all()
+        if len(entries) > self.rebuild_after:
+            await self.rebuild(db)
+            return
+        changed = {}
+        for _, table_name, row_id, operation in entries:
+            if table_name in self.tables:
+                changed.setdefault(table_name, {}).setdefault(row_id, set()).add(operation)
+        if changed:
+            await self.update(db, changed)
+        if entries:
+            self.seq = entries[-1][0]
+
+    def due(self) -> bool:
+        return self.seq is None or time.monotonic() - self.checked_at >= self.refresh_seconds
+
+    async def refresh(self, db: AsyncSession):
+        """Build the index on first use, then catch up with the change log when it's due."""
+        if not self.due() or (self.seq is not None and self.lock.locked()):
+            return  # current enough, or someone else is catching up; answer from what there is
+        async with self.lock:
+            if not self.due():
+                return
+            if self.seq is None:
+                await self.rebuild(db)
+            else:
+                await self.catch_up(db)
+            self.checked_at = time.monotonic()
+
+    def mark_stale(self):
+        """Check the change log on the next call, after a write made through this process."""
+        self.checked_at = 0.0
@@ -0,0 +1,139 @@
+import os
+import zlib
+from dotenv import load_dotenv
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli  # optional, pip install brotli to offer br as well as gzip
+except ImportError:
+    brotli = None
+
+# Compression settings, override in .env
+load_dotenv()
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))  # smaller bodies aren't worth it
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 5))
+# cached bodies are compressed once and served many times, so they get the slower, smaller settings
+CACHED_GZIP_LEVEL = int(os.getenv("CACHED_GZIP_LEVEL", 9))
+CACHED_BROTLI_QUALITY = int(os.getenv("CACHED_BROTLI_QUALITY", 9))
+
+# best first
+ENCODINGS = ["br", "gzip"] if brotli else ["gzip"]
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "image/svg+xml")
+# text/, but each event has to reach the client the moment it's sent, not when a compressor block fills
+STREAMING_TYPES = ("text/event-stream",)
+
+def acceptable_encodings(accept_encoding: str, available: list[str]) -> list[str]:
+    """The encodings in available (best first) that the client accepts, honouring q=0."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                pass
+        accepted[name.strip().lower()] = quality
+    return [encoding for encoding in available if accepted.get(encoding, accepted.get("*", 0)) > 0]
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """The best encoding we have that the client accepts (honouring q=0), or None for identity."""
+    return next(iter(acceptable_encodings(accept_encoding, ENCODINGS)), None)
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=CACHED_BROTLI_QUALITY if cached else BROTLI_QUALITY)
+    compressor = zlib.compressobj(CACHED_GZIP_LEVEL if cached else GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+    return compressor.compress(body) + compressor.flush()
+
+def weak_etag(etag: str) -> str:
+    """A compressed body is a different byte sequence for the same content, which is what a weak ETag says."""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+class StreamCompressor:
+    """Compresses a streamed body chunk by chunk, flushing each so NDJSON/CSV exports still arrive as they're made."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.process(data) + self.compressor.flush()
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self.compressor.finish()
+        return self.compressor.flush()
+
+class CompressionMiddleware:
+    """Negotiated br/gzip for responses of a compressible type and at least minimum_size bytes.
+
+    Responses that already carry a Content-Encoding (cached catalog bodies compressed ahead of time,
+    precompressed files under /images) go out untouched, as do images, ranges, 304s and event streams.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None or "range" in request_headers:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message  # held until the first body chunk shows whether to compress
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                media_type = headers.get("content-type", "")
+                if ("content-encoding" in headers or start_message["status"] in (204, 206, 304)
+                        or not media_type.startswith(COMPRESSIBLE_TYPES) or media_type.startswith(STREAMING_TYPES)
+                        or (not more_body and len(body) < self.minimum_size)):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers:
+                    headers["ETag"] = weak_etag(headers["etag"])
+                if not more_body:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    passthrough = True
+                    return
+                del headers["Content-Length"]
+                compressor = StreamCompressor(encoding)
+                await send(start_message)
+
+            data = compressor.chunk(body) if more_body else compressor.chunk(body) + compressor.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
@@ -1,17 +1,111 @@
+import os
+from dotenv import load_dotenv
 from fastapi import Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import create_engine, text
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import create_engine, event, make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.models import Base # Import necessary models
+from app.migrations import apply_migrations
+from app.utils.jwt import verify_access_token
 
-# SQLite database URL (adjust the path to your db file)
-DATABASE_URL = "sqlite:///../db/artbasethree.db"  # Update the path if needed
+load_dotenv()
 
-# Set up SQLAlchemy engine and session maker
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+# Database URL, override in .env. SQLite by default; for several API replicas point every one of them at
+# the same PostgreSQL, e.g. DATABASE_URL=postgresql+psycopg://art:secret@db/artbase (pip install psycopg asyncpg)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///../db/artbasethree.db")
+
+IS_SQLITE = make_url(DATABASE_URL).get_backend_name() == "sqlite"
+
+# The async routes need an async driver for the same database
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_database_url(url: str) -> str:
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(hide_password=False)
+
+def read_only_url(url: str) -> str:
+    """The same SQLite file opened with mode=ro, so a read connection can never take the write lock."""
+    url = make_url(url)
+    return url.set(database=f"file:{url.database}", query={**url.query, "mode": "ro", "uri": "true"}).render_as_string(hide_password=False)
+
+def getenv_int(names: tuple[str, ...], default: int) -> int:
+    """The first of these settings that is set. Later names are the older spellings, still honoured."""
+    return int(next((os.getenv(name) for name in names if os.getenv(name)), default))
+
+# Reads (the async catalog routes) go to READ_DATABASE_URL, a replica, if one is set. Otherwise to read-only
+# connections on the same SQLite file, which under WAL read the last commit without waiting on the writer.
+# ASYNC_DATABASE_URL, its earlier name, still works.
+READ_DATABASE_URL = async_database_url(
+    os.getenv("READ_DATABASE_URL") or os.getenv("ASYNC_DATABASE_URL")
+    or (read_only_url(DATABASE_URL) if IS_SQLITE else DATABASE_URL))
+
+# Connection pools, per API process, override in .env. SQLite allows one writer at a time anyway, so writes
+# queue for a single connection here instead of spinning on busy_timeout; reads get one connection per core.
+# With several API replicas on PostgreSQL, replicas x (pool size + overflow) has to stay under max_connections.
+# DB_POOL_SIZE and DB_MAX_OVERFLOW, from before reads and writes had separate pools, still set both of them,
+# except that a SQLite writer stays a single connection.
+POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a free connection
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # reconnect before a proxy/firewall drops idle ones
+WRITE_POOL_OPTIONS = {
+    "pool_size": 1 if IS_SQLITE and not os.getenv("DB_WRITE_POOL_SIZE")
+        else getenv_int(("DB_WRITE_POOL_SIZE", "DB_POOL_SIZE"), 10),
+    "max_overflow": 0 if IS_SQLITE and not os.getenv("DB_WRITE_MAX_OVERFLOW")
+        else getenv_int(("DB_WRITE_MAX_OVERFLOW", "DB_MAX_OVERFLOW"), 10),
+    "pool_timeout": POOL_TIMEOUT,
+    "pool_recycle": POOL_RECYCLE,
+}
+READ_POOL_OPTIONS = {
+    "pool_size": getenv_int(("DB_READ_POOL_SIZE", "DB_POOL_SIZE"), os.cpu_count() or 4),
+    "max_overflow": getenv_int(("DB_READ_MAX_OVERFLOW", "DB_MAX_OVERFLOW"), 10),
+    "pool_timeout": POOL_TIMEOUT,
+    "pool_recycle": POOL_RECYCLE,
+}
+
+# Applied to every new SQLite connection, override the sizes in .env
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # readers see the last commit while a write is in progress, nobody waits
+    "synchronous": "NORMAL",  # safe with WAL, syncs at checkpoints instead of on every commit
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536)),  # negative means KiB, per connection
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 268435456)),  # read pages straight from the OS page cache
+    "temp_store": "MEMORY",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),  # a second writer waits instead of failing
+}
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.close()
+
+def apply_sqlite_read_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # journal_mode is the writer's to set, a read-only connection just uses what the file already has
+    for name, value in SQLITE_PRAGMAS.items():
+        if name != "journal_mode":
+            cursor.execute(f"PRAGMA {name} = {value}")
+    cursor.execute("PRAGMA query_only = 1")
+    cursor.close()
+
+# Writer: sync engine and session maker, used by the routes that change data (and by migrations)
+engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if IS_SQLITE else {},
+                       pool_pre_ping=not IS_SQLITE, **WRITE_POOL_OPTIONS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Dependency to get the DB session
+# Readers: async engine for the read-heavy catalog routes, so they scale with the event loop instead of the
+# threadpool. aiosqlite runs each connection on its own thread and SQLite lets go of the GIL while it works.
+read_engine = create_async_engine(READ_DATABASE_URL, poolclass=AsyncAdaptedQueuePool,
+                                  pool_pre_ping=not IS_SQLITE, **READ_POOL_OPTIONS)
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, autoflush=False)
+
+if IS_SQLITE:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+if read_engine.dialect.name == "sqlite":
+    event.listen(read_engine.sync_engine, "connect", apply_sqlite_read_pragmas)
+
+# Dependency to get the DB session, for routes that write
 def get_db():
     db = SessionLocal()
     try:
@@ -19,11 +113,37 @@ def get_db():
     finally:
         db.close()
 
+# Read-only session, for async def routes that only read
+async def get_read_db():
+    async with ReadSessionLocal() as db:
+        yield db
+
 # Example: Dependency for common exception handling
 def get_or_404(query_result):
     if not query_result:
         raise HTTPException(status_code=404, detail="Resource not found")
     return query_result
 
+# Authentication: "Authorization: Bearer <token>" from /users/login or /users/register
+bearer_scheme = HTTPBearer(auto_error=False)
+
+def get_current_user(credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> dict:
+    """The token's payload (username, email, admin), or 401. Repeat tokens come out of the validated-token cache."""
+    payload = verify_access_token(credentials.credentials) if credentials else None
+    if payload is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return payload
+
+def require_admin(user: dict = Depends(get_current_user)) -> dict:
+    """For admin and write routes: get_current_user, and the user has to be an admin."""
+    # admin can come back from SQLite as "0"/"1"
+    if str(user.get("admin")) != "1":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
 # Create all tables in the database if not present
 Base.metadata.create_all(bind=engine)
+
+# Then bring indexes, triggers and views up to date
+apply_migrations(engine)
+
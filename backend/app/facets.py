@@ -0,0 +1,298 @@
+import math
+import os
+from bisect import bisect_right
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import bindparam, text
+from app.change_log import ChangeLogIndex
+
+# Facet settings, override in .env
+load_dotenv()
+FACET_REFRESH_SECONDS = float(os.getenv("FACET_REFRESH_SECONDS", 5))  # how stale writes from elsewhere can be
+FACET_REBUILD_AFTER = int(os.getenv("FACET_REBUILD_AFTER", 500))  # more changes than this and a rebuild is cheaper
+# upper bounds of the price bands, the last band is everything from the last bound up
+FACET_PRICE_BANDS = [int(bound) for bound in os.getenv("FACET_PRICE_BANDS", "500,1000,5000,10000,50000").split(",")]
+FACET_CACHE_ENTRIES = int(os.getenv("FACET_CACHE_ENTRIES", 512))  # filter sets whose counts are kept until a write
+
+FACETS = ("medium", "department", "series", "decade", "sold", "price_band")
+# the filter that narrows each facet's own values; a facet's counts ignore it, so the other choices stay visible
+FACET_FILTERS = {"medium": "medium", "department": "department", "series": "series",
+                 "decade": "year", "sold": "sold", "price_band": "price"}
+ORDERED_FACETS = ("decade", "price_band", "sold")  # listed by value, the rest by count
+RANGE_COLUMNS = ("year", "price")
+
+WORD = np.dtype("<u8")  # bit p of a bitmap is bit p % 64 of word p // 64
+
+ARTWORKS = """
+    SELECT "artworks"."id", "artworks"."artist_id", "departments"."name", "series"."name",
+        "artworks"."year", "artworks"."price", "artworks"."sold"
+    FROM "artworks"
+    LEFT JOIN "departments" ON "departments"."id" = "artworks"."department"
+    LEFT JOIN "series" ON "series"."id" = "artworks"."series"
+"""
+MEDIUMS = """
+    SELECT "artworks_mediums"."artwork_id", "mediums"."name"
+    FROM "artworks_mediums"
+    JOIN "mediums" ON "mediums"."id" = "artworks_mediums"."medium_id"
+"""
+
+def word_bit(position: int):
+    return position >> 6, np.uint64(1 << (position & 63))
+
+def parse_price(price) -> float | None:
+    # DECIMAL in the model, but older rows hold '' or text
+    try:
+        price = float(price)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(price) else price
+
+def price_band(price: float) -> str:
+    band = bisect_right(FACET_PRICE_BANDS, price)
+    low = FACET_PRICE_BANDS[band - 1] if band else 0
+    return f"{low}-{FACET_PRICE_BANDS[band]}" if band < len(FACET_PRICE_BANDS) else f"{low}+"
+
+def band_bounds(band: str) -> dict:
+    low, _, high = band.partition("-")
+    return {"min": int(low.rstrip("+")), "max": int(high) if high else None}
+
+def facet_values(department, series, mediums, year, price, sold) -> dict:
+    return {
+        "medium": sorted(set(mediums)),
+        "department": [department] if department is not None else [],
+        "series": [series] if series is not None else [],
+        "decade": [year // 10 * 10] if year is not None else [],
+        "sold": [sold] if sold is not None else [],
+        "price_band": [price_band(price)] if price is not None else [],
+    }
+
+class Bitmaps:
+    """One bitmap per value of a facet, as the rows of a matrix of 64 bit words, so counting every value
+    under a filter is one AND, one popcount and one sum over the matrix."""
+
+    def __init__(self, words: int):
+        self.rows = {}  # value -> row
+        self.values = []  # row -> value
+        self.matrix = np.zeros((0, words), dtype=WORD)
+
+    def row(self, value) -> int:
+        row = self.rows.get(value)
+        if row is None:
+            row = self.rows[value] = len(self.values)
+            self.values.append(value)
+            if row == len(self.matrix):  # out of rows, double them
+                self.matrix = np.vstack([self.matrix, np.zeros((max(8, row), self.matrix.shape[1]), dtype=WORD)])
+        return row
+
+    def widen(self, words: int):
+        spare = np.zeros((len(self.matrix), words - self.matrix.shape[1]), dtype=WORD)
+        self.matrix = np.hstack([self.matrix, spare])
+
+    def get(self, value):
+        row = self.rows.get(value)
+        return self.matrix[row] if row is not None else np.zeros(self.matrix.shape[1], dtype=WORD)
+
+    def set(self, value, position: int):
+        word, bit = word_bit(position)
+        row = self.row(value)  # first: a new value can grow the matrix, and the new one is what gets the bit
+        self.matrix[row, word] |= bit
+
+    def clear(self, value, position: int):
+        word, bit = word_bit(position)
+        self.matrix[self.rows[value], word] &= ~bit
+
+    def fill(self, values: list, positions: list):
+        """Set a bit per (value, position) pair at once."""
+        rows = np.array([self.row(value) for value in values], dtype=np.intp)
+        positions = np.array(positions, dtype=np.intp)
+        np.bitwise_or.at(self.matrix, (rows, positions >> 6), np.left_shift(np.uint64(1), (positions & 63).astype(np.uint64)))
+
+    def counts(self, base) -> list[tuple]:
+        """(value, count under base) for every value with any."""
+        matrix = self.matrix[:len(self.values)]
+        words = np.flatnonzero(base)
+        if len(words) * 2 < len(base):  # a narrow filter, only look at the words it has bits in
+            matrix, base = matrix[:, words], base[words]
+        counts = np.add.reduce(np.bitwise_count(matrix & base), axis=1, dtype=np.uint32)
+        return [(self.values[row], int(counts[row])) for row in np.flatnonzero(counts)]
+
+class FacetIndex(ChangeLogIndex):
+    """Facet counts for GET /artworks/facets, from one bitmap per facet value.
+
+    Each artwork gets a bit position, and each facet value a bitmap of the artworks that have it (see
+    Bitmaps). Filtering is AND-ing bitmaps, and a write flips a few bits. Year and price ranges are
+    compared over a column per value, then packed into a bitmap like the rest.
+    """
+
+    tables = ("artworks", "artworks_mediums", "departments", "mediums", "series")
+
+    def __init__(self):
+        super().__init__(FACET_REFRESH_SECONDS, FACET_REBUILD_AFTER)
+        self.positions = {}  # artwork id -> bit position
+        self.free = []  # positions of deleted artworks, handed out again
+        self.rows = {}  # artwork id -> (artist id, facet values, year, price), to take its bits back out
+        self.results = {}  # filters -> counts, emptied by every change
+        self.setup(0)
+
+    def setup(self, words: int):
+        self.words = words
+        self.results = {}
+        self.alive = np.zeros(words, dtype=WORD)
+        self.bitmaps = {name: Bitmaps(words) for name in FACETS + ("artist",)}  # artist is a filter only
+        self.columns = {column: np.full(words * 64, np.nan) for column in RANGE_COLUMNS}
+
+    def widen(self, position: int):
+        """Make room for this position, doubling the words."""
+        if position < self.words * 64:
+            return
+        words = max(16, self.words * 2, (position >> 6) + 1)
+        self.alive = np.concatenate([self.alive, np.zeros(words - self.words, dtype=WORD)])
+        for bitmaps in self.bitmaps.values():
+            bitmaps.widen(words)
+        for column in RANGE_COLUMNS:
+            self.columns[column] = np.concatenate([self.columns[column], np.full((words - self.words) * 64, np.nan)])
+        self.words = words
+
+    def load(self, artworks: list, mediums: list):
+        """Replace everything, setting each facet's bits in one go."""
+        mediums_by_artwork = {}
+        for artwork_id, name in mediums:
+            mediums_by_artwork.setdefault(artwork_id, []).append(name)
+        self.setup(max(16, -(-len(artworks) * 5 // 256)))  # a quarter spare, so new artworks don't widen it at once
+        self.positions, self.free, self.rows = {}, [], {}
+        pairs = {name: ([], []) for name in self.bitmaps}
+        for position, (artwork_id, artist_id, department, series, year, price, sold) in enumerate(artworks):
+            price = parse_price(price)
+            values = facet_values(department, series, mediums_by_artwork.get(artwork_id, ()), year, price, sold)
+            self.positions[artwork_id] = position
+            self.rows[artwork_id] = (artist_id, values, year, price)
+            for name, names in {**values, "artist": [artist_id]}.items():
+                for value in names:
+                    pairs[name][0].append(value)
+                    pairs[name][1].append(position)
+            for column, value in (("year", year), ("price", price)):
+                if value is not None:
+                    self.columns[column][position] = value
+        for name, (values, positions) in pairs.items():
+            self.bitmaps[name].fill(values, positions)
+        alive = np.zeros(self.words * 64, dtype=bool)
+        alive[:len(artworks)] = True
+        self.alive = np.packbits(alive, bitorder="little").view(WORD)
+
+    def remove_artwork(self, artwork_id):
+        if artwork_id not in self.rows:
+            return
+        self.results = {}
+        position = self.positions.pop(artwork_id)
+        artist_id, values, _, _ = self.rows.pop(artwork_id)
+        word, bit = word_bit(position)
+        self.alive[word] &= ~bit
+        for name, names in {**values, "artist": [artist_id]}.items():
+            for value in names:
+                self.bitmaps[name].clear(value, position)
+        for column in RANGE_COLUMNS:
+            self.columns[column][position] = np.nan
+        self.free.append(position)
+
+    def put_artwork(self, artwork_id, artist_id, department, series, year, price, sold, mediums):
+        self.remove_artwork(artwork_id)
+        self.results = {}
+        position = self.free.pop() if self.free else len(self.positions)
+        self.widen(position)
+        price = parse_price(price)
+        values = facet_values(department, series, mediums, year, price, sold)
+        self.positions[artwork_id] = position
+        self.rows[artwork_id] = (artist_id, values, year, price)
+        word, bit = word_bit(position)
+        self.alive[word] |= bit
+        for name, names in {**values, "artist": [artist_id]}.items():
+            for value in names:
+                self.bitmaps[name].set(value, position)
+        for column, value in (("year", year), ("price", price)):
+            self.columns[column][position] = np.nan if value is None else value
+
+    def range_bitmap(self, column: str, low: float | None, high: float | None):
+        """Artworks with low <= value <= high in this column; an end left as None is open."""
+        values = self.columns[column]
+        inside = ~np.isnan(values)
+        if low is not None:
+            inside &= values >= low
+        if high is not None:
+            inside &= values <= high
+        return np.packbits(inside, bitorder="little").view(WORD)
+
+    def counts(self, **filters) -> dict:
+        """counted(), remembered per filter set until the next change."""
+        key = tuple(sorted(filters.items()))
+        result = self.results.get(key)
+        if result is None:
+            if len(self.results) >= FACET_CACHE_ENTRIES:
+                self.results = {}
+            result = self.results[key] = self.counted(**filters)
+        return result
+
+    def counted(self, artist_id=None, department=None, series=None, medium=None, sold=None,
+                year_min=None, year_max=None, price_min=None, price_max=None) -> dict:
+        """Matches under every filter, and per facet the count for each value under every filter but its own."""
+        filters = {}
+        for name, value in (("artist", artist_id), ("department", department), ("series", series),
+                            ("medium", medium), ("sold", sold)):
+            if value is not None:
+                filters[name] = self.bitmaps[name].get(value)
+        if year_min is not None or year_max is not None:
+            filters["year"] = self.range_bitmap("year", year_min, year_max)
+        if price_min is not None or price_max is not None:
+            filters["price"] = self.range_bitmap("price", price_min, price_max)
+
+        matches = self.alive
+        for members in filters.values():
+            matches = matches & members
+        facets = {}
+        for facet in FACETS:
+            base = self.alive
+            for name, members in filters.items():
+                if name != FACET_FILTERS[facet]:
+                    base = base & members
+            counts = self.bitmaps[facet].counts(base)
+            if facet == "price_band":
+                counts.sort(key=lambda item: band_bounds(item[0])["min"])
+                facets[facet] = [{"value": value, **band_bounds(value), "count": count} for value, count in counts]
+                continue
+            counts.sort(key=None if facet in ORDERED_FACETS else lambda item: (-item[1], item[0]))
+            facets[facet] = [{"value": value, "count": count} for value, count in counts]
+        return {"total": int(np.bitwise_count(matches).sum()), "facets": facets}
+
+    async def reload(self, db: AsyncSession):
+        artworks = (await db.execute(text(ARTWORKS + ' ORDER BY "artworks"."id"'))).all()
+        mediums = (await db.execute(text(MEDIUMS))).all()
+        self.load(artworks, mediums)
+
+    async def update(self, db: AsyncSession, changed: dict[str, dict[int, set]]):
+        if any(operations - {"insert"} for table_name in ("departments", "mediums", "series")
+               for operations in changed.get(table_name, {}).values()):
+            await self.reload(db)  # a rename or delete moves every artwork under it; rare enough to start over
+            return
+        # a new department, medium or series has no artworks yet: its bitmap is added, under the name
+        # read with the artwork, when the first artwork that has it comes through below
+        ids = list(changed.get("artworks", {}).keys() | changed.get("artworks_mediums", {}).keys())
+        if not ids:
+            return
+        artworks = (await db.execute(
+            text(ARTWORKS + ' WHERE "artworks"."id" IN :ids').bindparams(bindparam("ids", expanding=True)), {"ids": ids}
+        )).all()
+        mediums = (await db.execute(
+            text(MEDIUMS + ' WHERE "artworks_mediums"."artwork_id" IN :ids').bindparams(bindparam("ids", expanding=True)),
+            {"ids": ids}
+        )).all()
+        mediums_by_artwork = {}
+        for artwork_id, name in mediums:
+            mediums_by_artwork.setdefault(artwork_id, []).append(name)
+        current = {row[0]: row for row in artworks}
+        for artwork_id in ids:
+            if artwork_id in current:
+                self.put_artwork(*current[artwork_id], mediums_by_artwork.get(artwork_id, []))
+            else:
+                self.remove_artwork(artwork_id)
+
+facet_index = FacetIndex()
@@ -1,13 +1,18 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import artworks, artists, users
+from app.routers import analytics, artworks, artists, images, sync, users
 from app.dependencies import get_db
+from app.cache import response_cache
+from app.utils.password import password_pool
+from app.serialization import FastJSONResponse
+from app.compression import CompressionMiddleware
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Art Base One",
     description="An API for managing artworks, artists and clients.",
     version="0.0.1",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -18,13 +23,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# br/gzip for anything compressible over COMPRESSION_MIN_SIZE that isn't compressed already
+app.add_middleware(CompressionMiddleware)
+
 @app.get("/")
 def read_root():
     return {"message": "This is Art Base One"}
 
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss counts for the response cache on the catalog routes."""
+    return response_cache.stats()
+
+@app.get("/password-pool/stats")
+def password_pool_stats():
+    """Queue depth and rejections for the bcrypt worker pool behind /users/register and /users/login."""
+    return password_pool.stats()
+
 # Include routers
 app.include_router(artists.router, prefix="/artists", tags=["artists"])
 app.include_router(artworks.router, prefix="/artworks", tags=["artworks"])
+app.include_router(images.router, prefix="/images", tags=["images"])
+app.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+app.include_router(sync.router, prefix="/sync", tags=["sync"])
 
 # app.include_router(mediums.router, prefix="/mediums", tags=["mediums"])
 app.include_router(users.router, prefix="/users", tags=["users"])
\ No newline at end of file
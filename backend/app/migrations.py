@@ -0,0 +1,49 @@
+from pathlib import Path
+
+# Plain .sql files, one folder per database (sqlite/, postgresql/), applied in filename order (001_..., 002_..., etc.)
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "db" / "migrations"
+
+# any constant will do, it just has to be the same for every API process sharing the database
+MIGRATION_LOCK_ID = 7408001
+
+def apply_migrations(engine):
+    """Apply any migration in db/migrations/<dialect> that this database hasn't seen yet.
+
+    models.py only knows about tables, so indexes, triggers and views live in these
+    scripts. Each one runs inside its own transaction and is recorded in schema_migrations.
+    """
+    dialect = engine.dialect.name
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if dialect == "postgresql":
+            # several replicas starting at once: the first one migrates, the rest wait and then find nothing to do
+            cursor.execute(f"SELECT pg_advisory_lock({MIGRATION_LOCK_ID})")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS "schema_migrations" (
+                "name" TEXT PRIMARY KEY,
+                "applied_at" TIMESTAMP DEFAULT(CURRENT_TIMESTAMP)
+            )
+        """)
+        cursor.execute('SELECT "name" FROM "schema_migrations"')
+        applied = {row[0] for row in cursor.fetchall()}
+        raw.commit()
+
+        for path in sorted((MIGRATIONS_DIR / dialect).glob("*.sql")):
+            if path.name in applied:
+                continue
+            script = path.read_text() + f"\nINSERT INTO \"schema_migrations\" (\"name\") VALUES ('{path.name}');"
+            if dialect == "sqlite":
+                # executescript handles trigger bodies (BEGIN ... END;) that a plain execute can't
+                raw.driver_connection.executescript("BEGIN;\n" + script + "\nCOMMIT;")
+            else:
+                # psycopg runs a multi-statement string in one execute, inside the transaction it opened
+                cursor.execute(script)
+                raw.commit()
+    finally:
+        if dialect == "postgresql":
+            # the lock belongs to the session, not the transaction, so it has to be let go even after a failure
+            raw.rollback()
+            raw.cursor().execute(f"SELECT pg_advisory_unlock({MIGRATION_LOCK_ID})")
+            raw.commit()
+        raw.close()
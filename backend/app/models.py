@@ -154,7 +154,8 @@ class SoldArtwork(Base):
 class AdditionalImage(Base):
     __tablename__ = "additional_images"
 
+    # the table has no primary key of its own, an artwork can have several images
     artwork_id = Column(Integer, ForeignKey("artworks.id"), primary_key=True)
-    image_url = Column(String, nullable=False)
+    image_url = Column(String, nullable=False, primary_key=True)
 
     artwork = relationship("Artwork", backref="additional_images")
@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import text
+from app.dependencies import get_read_db
+from app.serialization import FastJSONResponse, row_type
+
+router = APIRouter()
+
+# Every report reads the rollup tables that triggers keep current (see db/migrations/<dialect>/006_sales_rollups.sql),
+# so it costs the same however many sales there are. Revenue is stored in cents and reported in currency units.
+ORDER_COLUMNS = {"revenue": '"revenue_cents"', "sales": '"sales"'}
+
+ArtistSales = row_type("ArtistSales", ["artist_id", "name", "sales", "revenue"])
+MonthSales = row_type("MonthSales", ["month", "sales", "revenue"])
+OrganizationTypeSales = row_type("OrganizationTypeSales", ["organization_type", "sales", "revenue"])
+CollectorSales = row_type("CollectorSales", ["person_id", "name", "organization", "sales", "revenue"])
+
+async def report(db: AsyncSession, row_class, query: str, params: dict | None = None) -> FastJSONResponse:
+    try:
+        rows = (await db.execute(text(query), params or {})).all()
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database query failed.") from e
+    return FastJSONResponse({"data": [row_class(*row) for row in rows]})
+
+@router.get("/summary")
+async def sales_summary(db: AsyncSession = Depends(get_read_db)):
+    """Total sales and revenue, summed over the handful of organization type rows."""
+    try:
+        row = (await db.execute(text("""
+            SELECT COALESCE(SUM("sales"), 0), COALESCE(SUM("revenue_cents"), 0) FROM "sales_by_organization_type"
+        """))).one()
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database query failed.") from e
+    return FastJSONResponse({"sales": row[0], "revenue": row[1] / 100})
+
+@router.get("/artists")
+async def sales_by_artist(
+    order: str = Query("revenue", pattern="^(revenue|sales)$"),
+    limit: int = Query(20, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Top artists by revenue or number of sales."""
+    return await report(db, ArtistSales, f"""
+        SELECT "sales_by_artist"."artist_id", "artists"."first_name" || ' ' || "artists"."last_name",
+            "sales", "revenue_cents" / 100.0
+        FROM "sales_by_artist"
+        LEFT JOIN "artists" ON "artists"."id" = "sales_by_artist"."artist_id"
+        WHERE "sales" > 0
+        ORDER BY {ORDER_COLUMNS[order]} DESC
+        LIMIT :limit
+    """, {"limit": limit})
+
+@router.get("/months")
+async def sales_by_month(
+    start: str | None = Query(None, pattern=r"^\d{4}-\d{2}$"),  # YYYY-MM, inclusive
+    end: str | None = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Sales and revenue per month, oldest first. Sales without a date are under "unknown"."""
+    where, params = ['"sales" > 0'], {}
+    if start:
+        where.append('"month" >= :start')
+        params["start"] = start
+    if end:
+        where.append('"month" <= :end')
+        params["end"] = end
+    return await report(db, MonthSales, f"""
+        SELECT "month", "sales", "revenue_cents" / 100.0 FROM "sales_by_month"
+        WHERE {" AND ".join(where)}
+        ORDER BY "month"
+    """, params)
+
+@router.get("/organization-types")
+async def sales_by_organization_type(db: AsyncSession = Depends(get_read_db)):
+    """Sales and revenue per buyer organization type (museum, gallery, ...), "none" for private buyers."""
+    return await report(db, OrganizationTypeSales, """
+        SELECT "organization_type", "sales", "revenue_cents" / 100.0 FROM "sales_by_organization_type"
+        WHERE "sales" > 0
+        ORDER BY "revenue_cents" DESC
+    """)
+
+@router.get("/collectors")
+async def sales_by_collector(
+    order: str = Query("revenue", pattern="^(revenue|sales)$"),
+    limit: int = Query(20, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Top collectors by amount spent or number of works bought."""
+    return await report(db, CollectorSales, f"""
+        SELECT "sales_by_collector"."person_id", "persons"."first_name" || ' ' || "persons"."last_name",
+            "organizations"."name", "sales", "revenue_cents" / 100.0
+        FROM "sales_by_collector"
+        LEFT JOIN "persons" ON "persons"."id" = "sales_by_collector"."person_id"
+        LEFT JOIN "organizations" ON "organizations"."id" = "persons"."org"
+        WHERE "sales" > 0
+        ORDER BY {ORDER_COLUMNS[order]} DESC
+        LIMIT :limit
+    """, {"limit": limit})
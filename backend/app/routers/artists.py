@@ -1,25 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from app.dependencies import get_db, get_or_404
+from app.dependencies import get_read_db, get_or_404
+from app.cache import response_cache, async_catalog_version
 from app.models import Artist
+from app.serialization import row_type
 
 router = APIRouter()
 
+# every artists column, selected as plain rows rather than ORM objects
+ARTIST_COLUMNS = [column.key for column in Artist.__table__.columns]
+ArtistRow = row_type("ArtistRow", ARTIST_COLUMNS)
+ArtistName = row_type("ArtistName", ["first_name", "last_name"])
+
 @router.get("/names")
-def get_artist_names(db: Session = Depends(get_db)):
+async def get_artist_names(request: Request, db: AsyncSession = Depends(get_read_db)):
     """Fetch all artist names."""
+    async def load_names():
+        artists = (await db.execute(select(Artist.first_name, Artist.last_name))).all()
+        return [ArtistName(*artist) for artist in artists]
     try:
-        artists = db.query(Artist).all()
-        return [{"first_name": artist.first_name, "last_name": artist.last_name} for artist in artists]
+        return await response_cache.aget_or_set("artists", request, load_names, await async_catalog_version(db, "artists"))
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database query failed.") from e
 
 @router.get("/")
-def get_all_artists(db: Session = Depends(get_db)):
+async def get_all_artists(request: Request, db: AsyncSession = Depends(get_read_db)):
     """Fetch all artist records."""
+    async def load_artists():
+        artists = (await db.execute(select(*Artist.__table__.columns))).all()
+        return [ArtistRow(*get_or_404(artist)) for artist in artists]
     try:
-        artists = db.query(Artist).all()
-        return [get_or_404(artist) for artist in artists]
+        return await response_cache.aget_or_set("artists", request, load_artists, await async_catalog_version(db, "artists"))
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database query failed.") from e
\ No newline at end of file
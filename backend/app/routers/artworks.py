@@ -1,37 +1,423 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.sql import text
-from app.dependencies import get_db, get_or_404
-from app.models import Artwork, Artist
+from sqlalchemy.sql import text, bindparam
+from app.dependencies import get_db, get_read_db, get_or_404, require_admin, ReadSessionLocal, engine
+from app.cache import response_cache, async_catalog_version
+from app.suggest import SUGGEST_MAX_LIMIT, suggest_index
+from app.facets import facet_index
+from app.fingerprints import SIMILAR_MAX_LIMIT, fingerprint_store
+from app.serialization import FastJSONResponse, dumps, row_type
+from app.models import Artwork, Artist, ArtworkMedium, Department, Medium, Series
 from datetime import datetime
+import base64
+import csv
+import io
+import json
+import orjson
+import re
 
 router = APIRouter()
 
+# Public art_list columns, in the order pages and exports write them
+ART_LIST_COLUMNS = ["id", "name", "title", "size", "year", "mediums", "image_url", "description",
+                    "series", "department", "price", "sold"]
+ArtListRow = row_type("ArtListRow", ART_LIST_COLUMNS)
+
+# art_list is a table kept in sync by triggers (see db/migrations/<dialect>/002_art_list_table.sql),
+# so a page is a straight walk down its (last_name, id) index. last_name rides along for the next cursor.
+ART_LIST_PAGE = """
+    SELECT "id", "name", "title", "size", "year", "mediums", "image_url", "description",
+        "series", "department", "price", "sold", "last_name"
+    FROM "art_list"
+    WHERE {where}
+    ORDER BY "last_name" ASC, "id" ASC
+    LIMIT :limit
+"""
+
+def encode_cursor(last_name: str, artwork_id: int) -> str:
+    """Opaque cursor pointing just past the last row of a page."""
+    return base64.urlsafe_b64encode(json.dumps([last_name, artwork_id]).encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        last_name, artwork_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(last_name), int(artwork_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/")
-def get_all_artworks(db: Session = Depends(get_db)):
-    """     Fetches all artowork rows from the 'art_list' view in the database, which adds in mediums, series, and departments as text -- rather than as an ID number.
-            Returns: dict: A dictionary with a "data" key containing a list of rows as dictionaries.
+async def get_all_artworks(
+    request: Request,
+    cursor: str | None = None,  # next_cursor from the previous page
+    limit: int = Query(50, ge=1, le=500),
+    artist_id: int | None = None,
+    department: str | None = None,  # department name, as shown in art_list
+    series: str | None = None,  # series name
+    medium: str | None = None,  # medium name
+    sold: int | None = Query(None, ge=0, le=1),
+    year_min: int | None = None,
+    year_max: int | None = None,
+    price_min: float | None = None,
+    price_max: float | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """     Fetches a page of artworks from the 'art_list' table, which adds in mediums, series, and departments as text -- rather than as an ID number.
+            Pages are keyset based on (last_name, id), so every page costs the same no matter how deep it is. Optional filters narrow the list.
+            Returns: dict: A "data" key with the rows as dictionaries, and "next_cursor" to pass back for the next page (None on the last page).
     """
+    where = ["1 = 1"]
+    params = {"limit": limit + 1}  # one extra row tells us if there's another page
+
+    if cursor:
+        params["cursor_last_name"], params["cursor_id"] = decode_cursor(cursor)
+        where.append('("last_name", "id") > (:cursor_last_name, :cursor_id)')
+    if artist_id is not None:
+        where.append('"artist_id" = :artist_id')
+        params["artist_id"] = artist_id
+    if department is not None:
+        where.append('"department" = :department')
+        params["department"] = department
+    if series is not None:
+        where.append('"series" = :series')
+        params["series"] = series
+    if medium is not None:
+        where.append("""
+            "id" IN (SELECT "artwork_id" FROM "artworks_mediums"
+                JOIN "mediums" ON "mediums"."id" = "artworks_mediums"."medium_id"
+                WHERE "mediums"."name" = :medium)
+        """)
+        params["medium"] = medium
+    if sold is not None:
+        where.append('"sold" = :sold')
+        params["sold"] = sold
+    if year_min is not None:
+        where.append('"year" >= :year_min')
+        params["year_min"] = year_min
+    if year_max is not None:
+        where.append('"year" <= :year_max')
+        params["year_max"] = year_max
+    if price_min is not None:
+        where.append('"price" >= :price_min')
+        params["price_min"] = price_min
+    if price_max is not None:
+        where.append('"price" <= :price_max')
+        params["price_max"] = price_max
+
+    async def load_page():
+        # rows go straight from tuples into ArtListRow, last_name is the extra column at the end
+        result = (await db.execute(text(ART_LIST_PAGE.format(where=" AND ".join(where))), params)).all()
+        data = [ArtListRow(*row[:-1]) for row in result[:limit]]
+        next_cursor = None
+        if len(result) > limit:
+            next_cursor = encode_cursor(result[limit - 1][-1], data[-1].id)
+        return {"data": data, "next_cursor": next_cursor}
+
     try:
-        result = db.execute(text("SELECT * FROM art_list")).mappings().all() 
-        get_or_404(result)  
-        data = [dict(row) for row in result]
-        return {"data": data}
+        return await response_cache.aget_or_set("artworks", request, load_page, await async_catalog_version(db, "artworks"))
     except SQLAlchemyError as e:
         raise HTTPException(status_code=500, detail="Database query failed.") from e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
 
 @router.get("/titles")
-def get_artwork_titles(db: Session = Depends(get_db)):
-    artworks = db.query(Artwork.title).all()
-    return {"titles": [artwork.title for artwork in artworks]}
+async def get_artwork_titles(request: Request, db: AsyncSession = Depends(get_read_db)):
+    async def load_titles():
+        titles = (await db.execute(select(Artwork.title))).scalars().all()
+        return {"titles": list(titles)}
+    return await response_cache.aget_or_set("artworks", request, load_titles, await async_catalog_version(db, "artworks"))
+
+@router.get("/suggest")
+async def suggest(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=SUGGEST_MAX_LIMIT),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Typeahead: artworks, artists and series whose title or name has a word starting with prefix, most popular first.
+
+    Case and accents don't matter. Answered from an in-process index (app/suggest.py), not per-keystroke queries.
+    Returns: dict: "data" with {"type": artwork/artist/series, "id", "label"} per suggestion.
+    """
+    try:
+        await suggest_index.refresh(db)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database query failed.") from e
+    return FastJSONResponse({"data": suggest_index.search(prefix, limit)})
+
+@router.get("/facets")
+async def get_facets(
+    artist_id: int | None = None,
+    department: str | None = None,
+    series: str | None = None,
+    medium: str | None = None,
+    sold: int | None = Query(None, ge=0, le=1),
+    year_min: int | None = None,
+    year_max: int | None = None,
+    price_min: float | None = None,
+    price_max: float | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Counts per medium, department, series, decade, sold status and price band, for the same filters as GET /artworks/.
+
+    Each facet is counted under every filter but its own, so picking a medium still shows how many
+    artworks the other mediums would give. Answered from an in-process bitmap index (app/facets.py).
+    Returns: dict: "total" matching every filter, and "facets" with a list of {"value", "count"} per facet.
+    """
+    try:
+        await facet_index.refresh(db)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database query failed.") from e
+    return FastJSONResponse(facet_index.counts(
+        artist_id=artist_id, department=department, series=series, medium=medium, sold=sold,
+        year_min=year_min, year_max=year_max, price_min=price_min, price_max=price_max
+    ))
+
+EXPORT_BATCH_SIZE = 500
+
+async def export_rows(format: str):
+    """Yield the whole catalog as NDJSON or CSV, one batch of rows at a time.
+
+    Rows come off the database cursor EXPORT_BATCH_SIZE at a time and are written out straight away,
+    so memory stays flat however big the catalog is. The session is opened here rather than via
+    get_read_db because it has to stay open for as long as the response is streaming.
+    """
+    async with ReadSessionLocal() as db:
+        result = await db.stream(
+            text(f'SELECT {", ".join(ART_LIST_COLUMNS)} FROM "art_list" ORDER BY "last_name" ASC, "id" ASC'),
+            execution_options={"yield_per": EXPORT_BATCH_SIZE},
+        )
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(ART_LIST_COLUMNS)
+            async for batch in result.partitions():
+                writer.writerows(batch)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            async for batch in result.partitions():
+                yield b"".join(dumps(ArtListRow(*row)) + b"\n" for row in batch)
+
+@router.get("/export")
+async def export_artworks(format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Streams every artwork in art_list as NDJSON (one JSON object per line) or CSV, for full catalog pulls."""
+    if format == "csv":
+        return StreamingResponse(export_rows(format), media_type="text/csv",
+                                 headers={"Content-Disposition": 'attachment; filename="artworks.csv"'})
+    return StreamingResponse(export_rows(format), media_type="application/x-ndjson")
+
+# Column weights for bm25, in artworks_search column order: title, description, keywords, artist, mediums, series
+SEARCH_WEIGHTS = "10.0, 2.0, 5.0, 4.0, 3.0, 3.0"
+SQLITE_ARTWORK_SEARCH = f"""
+    SELECT "art_list"."id", "name", "art_list"."title", "size", "year", "art_list"."mediums", "image_url",
+        "art_list"."description", "art_list"."series", "department", "price", "sold",
+        highlight("artworks_search", 0, '<mark>', '</mark>') AS "title_highlight",
+        snippet("artworks_search", -1, '<mark>', '</mark>', '…', 12) AS "snippet"
+    FROM "artworks_search"
+    JOIN "art_list" ON "art_list"."id" = "artworks_search"."rowid"
+    WHERE "artworks_search" MATCH :query
+    ORDER BY bm25("artworks_search", {SEARCH_WEIGHTS})
+    LIMIT :limit OFFSET :offset
+"""
+# PostgreSQL: a weighted tsvector per artwork (see db/migrations/postgresql/003_artwork_search.sql),
+# ts_rank_cd weights are for D (description), C (mediums, series), B (keywords, artist), A (title)
+POSTGRESQL_ARTWORK_SEARCH = """
+    SELECT "art_list"."id", "name", "art_list"."title", "size", "year", "art_list"."mediums", "image_url",
+        "art_list"."description", "art_list"."series", "department", "price", "sold",
+        ts_headline('artworks_search', "art_list"."title", "query",
+            'StartSel=<mark>, StopSel=</mark>, HighlightAll=true') AS "title_highlight",
+        ts_headline('artworks_search', coalesce("art_list"."description", ''), "query",
+            'StartSel=<mark>, StopSel=</mark>, MaxWords=12, MinWords=4, FragmentDelimiter=…') AS "snippet"
+    FROM "artworks_search"
+    JOIN "art_list" ON "art_list"."id" = "artworks_search"."id",
+        to_tsquery('artworks_search', :query) AS "query"
+    WHERE "artworks_search"."document" @@ "query"
+    ORDER BY ts_rank_cd('{0.2, 0.3, 0.5, 1.0}', "artworks_search"."document", "query") DESC, "art_list"."id"
+    LIMIT :limit OFFSET :offset
+"""
+ARTWORK_SEARCH = POSTGRESQL_ARTWORK_SEARCH if engine.dialect.name == "postgresql" else SQLITE_ARTWORK_SEARCH
+SearchRow = row_type("SearchRow", ART_LIST_COLUMNS + ["title_highlight", "snippet"])
+
+def fts_query(q: str) -> str:
+    """Turn what a visitor typed into a full-text query: every word must match, each as a prefix.
+    Words are quoted, so punctuation and FTS operators (AND, NEAR, *, ...) in the input are just text.
+    """
+    words = re.findall(r"\w+", q)
+    if engine.dialect.name == "postgresql":
+        # \w+ never contains tsquery operators (& | ! : ( )), so the words are safe as they are
+        return " & ".join(f"{word}:*" for word in words)
+    return " ".join(f'"{word}"*' for word in words)
+
+@router.get("/search")
+async def search_artworks(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Full-text search over title, description, keywords, artist, mediums and series, best matches first.
+    Returns: dict: "data" with art_list rows plus "title_highlight" and "snippet", matches wrapped in <mark>.
+    """
+    query = fts_query(q)
+    if not query:
+        return {"data": []}
+    try:
+        result = (await db.execute(text(ARTWORK_SEARCH), {"query": query, "limit": limit, "offset": offset})).all()
+        return FastJSONResponse({"data": [SearchRow(*row) for row in result]})
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database query failed.") from e
+
+# ?expand= names and how each one is loaded: joinedload for the single related rows (same query),
+# selectinload for collections (one extra query per relationship, however many artworks).
+EXPAND_OPTIONS = {
+    "artist": joinedload(Artwork.artist),
+    "series": joinedload(Artwork.series_rel),
+    "department": joinedload(Artwork.department_rel),
+    "mediums": selectinload(Artwork.mediums),
+    "images": selectinload(Artwork.additional_images),
+    "srcset": None,  # resized copies of image_url from image_derivatives, one extra query
+}
+BATCH_LIMIT = 200
+
+def parse_expand(expand: str | None) -> set[str]:
+    names = {name.strip() for name in (expand or "").split(",") if name.strip()}
+    unknown = names - EXPAND_OPTIONS.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown expand: {', '.join(sorted(unknown))}. "
+                                                    f"Choose from {', '.join(EXPAND_OPTIONS)}.")
+    return names
+
+def columns_dict(obj) -> dict:
+    """A model's own columns as a dict, without touching any relationship."""
+    return {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
+
+async def image_srcsets(db: AsyncSession, urls: list[str]) -> dict:
+    """Resized copies of each image URL (made by util/image_derivatives.py), one query for all of them.
+
+    Returns {url: {format: {"srcset": "url 320w, url 800w", size: {"url", "width", "height"}, ...}}},
+    formats best first, so a client can build <picture>/<source srcset> or pick the smallest that fits.
+    """
+    srcsets = {}
+    if not urls:
+        return srcsets
+    rows = (await db.execute(text("""
+        SELECT "source_url", "size", "format", "url", "width", "height" FROM "image_derivatives"
+        WHERE "source_url" IN :urls
+        ORDER BY "source_url", CASE "format" WHEN 'avif' THEN 0 WHEN 'webp' THEN 1 ELSE 2 END, "width"
+    """).bindparams(bindparam("urls", expanding=True)), {"urls": list(set(urls))})).all()
+    for source_url, size, format, url, width, height in rows:
+        formats = srcsets.setdefault(source_url, {})
+        entry = formats.setdefault(format, {"srcset": ""})
+        entry[size] = {"url": url, "width": width, "height": height}
+        entry["srcset"] = f'{entry["srcset"]}, {url} {width}w' if entry["srcset"] else f"{url} {width}w"
+    return srcsets
+
+def serialize_artwork(artwork: Artwork, expand: set[str], srcsets: dict | None = None) -> dict:
+    """Artwork columns, plus whatever was asked for in expand. Expanding series or department swaps the id for the row."""
+    data = columns_dict(artwork)
+    if "artist" in expand:
+        data["artist"] = columns_dict(artwork.artist)
+    if "series" in expand:
+        data["series"] = columns_dict(artwork.series_rel) if artwork.series_rel else None
+    if "department" in expand:
+        data["department"] = columns_dict(artwork.department_rel) if artwork.department_rel else None
+    if "mediums" in expand:
+        data["mediums"] = [columns_dict(medium) for medium in artwork.mediums]
+    if "images" in expand:
+        data["additional_images"] = [image.image_url for image in artwork.additional_images]
+    if "srcset" in expand:
+        data["image_srcset"] = (srcsets or {}).get(artwork.image_url, {})
+    return data
+
+async def load_artworks(db: AsyncSession, ids: list[int], expand: set[str]) -> list[Artwork]:
+    """All the requested artworks and their expansions in a fixed number of queries, no lazy loads
+    (which an AsyncSession couldn't do anyway)."""
+    query = select(Artwork).options(*(EXPAND_OPTIONS[name] for name in expand if EXPAND_OPTIONS[name] is not None))
+    return (await db.execute(query.where(Artwork.id.in_(ids)))).unique().scalars().all()
+
+@router.get("/batch")
+async def get_artworks_batch(ids: str, expand: str | None = None, db: AsyncSession = Depends(get_read_db)):
+    """Fetch up to BATCH_LIMIT artworks at once, e.g. /artworks/batch?ids=1,2,3&expand=artist,mediums.
+    Returns: dict: "data" with the artworks in the order asked for, and "missing" with any ids that don't exist.
+    """
+    try:
+        artwork_ids = list(dict.fromkeys(int(artwork_id) for artwork_id in ids.split(",") if artwork_id.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids should be a comma separated list of numbers")
+    if len(artwork_ids) > BATCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_LIMIT} ids per batch")
+    names = parse_expand(expand)
+
+    try:
+        found = {artwork.id: artwork for artwork in await load_artworks(db, artwork_ids, names)}
+        srcsets = await image_srcsets(db, [artwork.image_url for artwork in found.values()]) if "srcset" in names else None
+        return FastJSONResponse({
+            "data": [serialize_artwork(found[artwork_id], names, srcsets) for artwork_id in artwork_ids if artwork_id in found],
+            "missing": [artwork_id for artwork_id in artwork_ids if artwork_id not in found],
+        })
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database query failed.") from e
+
+@router.get("/{artwork_id}/similar")
+async def get_similar_artworks(
+    artwork_id: int,
+    limit: int = Query(10, ge=1, le=SIMILAR_MAX_LIMIT),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Artworks whose image looks most like this one's, by perceptual hash and colour, from util/image_fingerprints.py.
+
+    Returns: dict: "data" with {"id", "title", "image_url", "score", "distance", "duplicate"} per artwork, best first.
+    score is 0-1, distance the differing hash bits out of 128, and duplicate marks a likely copy of the same image.
+    """
+    try:
+        found = (await db.execute(text("""
+            SELECT "image_fingerprints"."row" FROM "artworks"
+            LEFT JOIN "image_fingerprints" ON "image_fingerprints"."source_url" = "artworks"."image_url"
+            WHERE "artworks"."id" = :id
+        """), {"id": artwork_id})).first()
+        row = get_or_404(found)[0]
+        if row is None:
+            raise HTTPException(status_code=404, detail="This artwork's image hasn't been fingerprinted yet")
+        rows = (await db.execute(text('SELECT MAX("row") + 1 FROM "image_fingerprints"'))).scalar()
+
+        # a few spare candidates, for rows whose image no artwork uses any more
+        matches = await run_in_threadpool(fingerprint_store.similar, row, rows, limit * 2 + 10)
+        if matches is None:
+            raise HTTPException(status_code=404, detail="This artwork's image hasn't been fingerprinted yet")
+        query = text("""
+            SELECT "image_fingerprints"."row", "artworks"."id", "artworks"."title", "artworks"."image_url"
+            FROM "image_fingerprints"
+            JOIN "artworks" ON "artworks"."image_url" = "image_fingerprints"."source_url"
+            WHERE "image_fingerprints"."row" IN :rows AND "artworks"."id" != :id
+            ORDER BY "artworks"."id"
+        """).bindparams(bindparam("rows", expanding=True))
+        artworks = {}
+        for match_row, *artwork in (await db.execute(query, {"rows": [row, *(match[0] for match in matches)], "id": artwork_id})).all():
+            artworks.setdefault(match_row, []).append(artwork)
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database query failed.") from e
+
+    data = []
+    for match_row, score, distance, duplicate in [(row, 1.0, 0, True), *matches]:  # other artworks using the same image first
+        for match_id, title, image_url in artworks.get(match_row, []):
+            data.append({"id": match_id, "title": title, "image_url": image_url,
+                         "score": score, "distance": distance, "duplicate": duplicate})
+    return FastJSONResponse({"data": data[:limit]})
 
 @router.get("/{artwork_id}")
-def get_artwork(artwork_id: int, db: Session = Depends(get_db)):
-    artwork = db.query(Artwork).filter(Artwork.id == artwork_id).first()
-    return get_or_404(artwork)
+async def get_artwork(artwork_id: int, expand: str | None = None, db: AsyncSession = Depends(get_read_db)):
+    """Fetch one artwork. ?expand=artist,mediums,series,department,images,srcset pulls in the related rows too."""
+    names = parse_expand(expand)
+    artwork = get_or_404(next(iter(await load_artworks(db, [artwork_id], names)), None))
+    srcsets = await image_srcsets(db, [artwork.image_url]) if "srcset" in names else None
+    return FastJSONResponse(serialize_artwork(artwork, names, srcsets))
 
 @router.post("/")
 def add_artwork(
@@ -69,7 +455,7 @@ def add_artwork(
         keywords=keywords,
         department=department,
         series=series,
-        date_added=datetime.timezone.utc(),
+        date_added=datetime.utcnow(),  # naive UTC, same as the column default
         price=price,
         sold=sold
     )
@@ -78,5 +464,171 @@ def add_artwork(
     db.add(new_artwork)
     db.commit()
     db.refresh(new_artwork)
+    response_cache.invalidate("artworks")
+    suggest_index.mark_stale()
+    facet_index.mark_stale()
+
+    return {"message": "Artwork added successfully", "artwork": columns_dict(new_artwork)}
+
+class ArtworkIn(BaseModel):
+    """One artwork in a POST /artworks/bulk body. Mediums, series and department are given by name."""
+    id: int | None = None  # set to replace an existing artwork instead of adding one
+    artist_id: int
+    title: str = Field(min_length=1)
+    size: str
+    year: int | None = None
+    end_year: int | None = None
+    image_url: str | None = None
+    hi_res_url: str | None = None
+    description: str | None = None
+    keywords: str | None = None
+    price: float | None = None
+    sold: int = Field(0, ge=0, le=1)
+    mediums: list[str] = []
+    series: str | None = None
+    department: str | None = None
+
+BULK_LIMIT = 1000
+BULK_CHUNK_SIZE = 200  # artworks per transaction
+
+def parse_bulk_body(body: bytes, content_type: str) -> list:
+    """A JSON array, or NDJSON (one object per line) when sent as application/x-ndjson.
+    A line that isn't valid JSON becomes a None entry, reported as that item's error."""
+    try:
+        if content_type.startswith("application/x-ndjson"):
+            items = []
+            for line in body.splitlines():
+                if line.strip():
+                    try:
+                        items.append(orjson.loads(line))
+                    except orjson.JSONDecodeError:
+                        items.append(None)
+            return items
+        items = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body should be a JSON array of artworks, or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body should be a JSON array of artworks, or NDJSON")
+    return items
 
-    return {"message": "Artwork added successfully", "artwork": new_artwork}
+def ids_by_name(db: Session, model, names: set[str]) -> dict:
+    """One IN query for every name in the batch."""
+    if not names:
+        return {}
+    return dict(db.execute(select(model.name, model.id).where(model.name.in_(names))).all())
+
+def medium_ids(db: Session, names: set[str]) -> dict:
+    """Ids for these medium names. Mediums are free-form, the ones that don't exist yet are added in the
+    current transaction, so they go away again if the artworks that wanted them can't be written."""
+    mediums = ids_by_name(db, Medium, names)
+    missing = sorted(names - mediums.keys())
+    if missing:
+        # another writer may have just added the same name, the re-select picks up its id either way
+        db.execute(text('INSERT INTO "mediums" ("name") VALUES (:name) ON CONFLICT ("name") DO NOTHING'),
+                   [{"name": name} for name in missing])
+        mediums = ids_by_name(db, Medium, names)
+    return mediums
+
+def write_artworks(db: Session, entries: list[dict]):
+    """Insert or replace a set of resolved entries inside the current transaction.
+    New artworks go in with one multi-row INSERT ... RETURNING, their mediums with one executemany."""
+    mediums = medium_ids(db, {name for entry in entries for name in entry["mediums"]})
+    creates = [entry for entry in entries if entry["status"] == "created"]
+    updates = [entry for entry in entries if entry["status"] == "updated"]
+    if creates:
+        ids = db.scalars(insert(Artwork).returning(Artwork.id, sort_by_parameter_order=True),
+                         [entry["values"] for entry in creates]).all()
+        for entry, artwork_id in zip(creates, ids):
+            entry["id"] = artwork_id
+    if updates:
+        db.execute(update(Artwork), [{"id": entry["id"], **entry["values"]} for entry in updates])
+        db.execute(delete(ArtworkMedium).where(ArtworkMedium.artwork_id.in_([entry["id"] for entry in updates])))
+    artwork_mediums = [{"artwork_id": entry["id"], "medium_id": medium_id}
+                       for entry in entries for medium_id in sorted({mediums[name] for name in entry["mediums"]})]
+    if artwork_mediums:
+        db.execute(insert(ArtworkMedium), artwork_mediums)
+
+def bulk_write(db: Session, items: list) -> list[dict]:
+    """Validate, resolve names and write a batch of artworks. Returns one result per item, in order."""
+    results = [None] * len(items)
+    artworks = {}
+    for index, item in enumerate(items):
+        try:
+            artworks[index] = ArtworkIn.model_validate(item)
+        except ValidationError as e:
+            results[index] = {"index": index, "status": "error",
+                              "error": "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" if error["loc"] else error["msg"]
+                                                 for error in e.errors())}
+
+    # every lookup is one set-based query for the whole batch
+    valid = artworks.values()
+    artist_ids = set(db.scalars(select(Artist.id).where(Artist.id.in_({artwork.artist_id for artwork in valid}))))
+    existing_ids = set(db.scalars(select(Artwork.id).where(Artwork.id.in_({artwork.id for artwork in valid if artwork.id}))))
+    series = ids_by_name(db, Series, {artwork.series for artwork in valid if artwork.series})
+    # a series or department has to exist already, mediums are added with the chunk that first uses them
+    departments = ids_by_name(db, Department, {artwork.department for artwork in valid if artwork.department})
+
+    entries = []
+    for index, artwork in artworks.items():
+        problems = []
+        if artwork.artist_id not in artist_ids:
+            problems.append(f"Unknown artist_id {artwork.artist_id}")
+        if artwork.id is not None and artwork.id not in existing_ids:
+            problems.append(f"Unknown artwork id {artwork.id}")
+        if artwork.series and artwork.series not in series:
+            problems.append(f"Unknown series {artwork.series!r}")
+        if artwork.department and artwork.department not in departments:
+            problems.append(f"Unknown department {artwork.department!r}")
+        if problems:
+            results[index] = {"index": index, "status": "error", "error": "; ".join(problems)}
+            continue
+        values = artwork.model_dump(exclude={"id", "mediums", "series", "department"})
+        values["series"] = series.get(artwork.series)
+        values["department"] = departments.get(artwork.department)
+        if artwork.id is None:
+            values["date_added"] = datetime.utcnow()
+        entries.append({"index": index, "id": artwork.id, "status": "updated" if artwork.id else "created",
+                        "values": values, "mediums": set(artwork.mediums)})
+
+    for start in range(0, len(entries), BULK_CHUNK_SIZE):
+        chunk = entries[start:start + BULK_CHUNK_SIZE]
+        try:
+            write_artworks(db, chunk)
+            db.commit()
+        except SQLAlchemyError:
+            # something in the chunk broke a constraint, redo it one artwork at a time to find out which
+            db.rollback()
+            for entry in chunk:
+                try:
+                    write_artworks(db, [entry])
+                    db.commit()
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    entry["status"], entry["error"] = "error", str(e.orig) if getattr(e, "orig", None) else str(e)
+        for entry in chunk:
+            results[entry["index"]] = {key: entry[key] for key in ("index", "status", "id", "error") if key in entry}
+            if entry["status"] == "error":
+                results[entry["index"]].pop("id", None)
+    return results
+
+@router.post("/bulk")
+async def bulk_artworks(request: Request, db: Session = Depends(get_db), user: dict = Depends(require_admin)):
+    """Add or replace up to BULK_LIMIT artworks in one call, as a JSON array or NDJSON (Content-Type: application/x-ndjson).
+
+    Each artwork is an ArtworkIn: an id replaces that artwork, its mediums included. Artists, series and
+    departments are looked up once for the whole batch, and rows are written BULK_CHUNK_SIZE to a
+    transaction, so one bad artwork doesn't cost the rest. New mediums are added in the transaction of
+    the artworks that use them, and roll back with them.
+    Returns: dict: "results" with {"index", "status": created/updated/error, "id" or "error"} per item, in order,
+    and counts per status.
+    """
+    items = parse_bulk_body(await request.body(), request.headers.get("content-type", ""))
+    if len(items) > BULK_LIMIT:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_LIMIT} artworks per call")
+    # the write session is sync, keep its queries off the event loop
+    results = await run_in_threadpool(bulk_write, db, items)
+    response_cache.invalidate("artworks")
+    suggest_index.mark_stale()
+    facet_index.mark_stale()
+    counts = {status: sum(result["status"] == status for result in results) for status in ("created", "updated", "error")}
+    return {**counts, "results": results}
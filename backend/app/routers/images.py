@@ -0,0 +1,104 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+from mimetypes import guess_type
+from pathlib import Path
+import anyio
+from dotenv import load_dotenv
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from app.compression import acceptable_encodings
+
+# The folder /images/... URLs point into, and optionally an nginx internal location that serves the same folder
+load_dotenv()
+IMAGES_DIR = Path(os.getenv("IMAGES_DIR", Path(__file__).resolve().parents[2] / "db" / "images")).resolve()
+IMAGES_ACCEL_REDIRECT = os.getenv("IMAGES_ACCEL_REDIRECT")  # e.g. "/protected-images/"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=300, must-revalidate"
+# derivatives from util/image_derivatives.py carry their content hash in the file name
+HASHED_NAME = re.compile(r"^([0-9a-f]{16})-[a-z]+\.[a-z]+$")
+# images are already compressed, only these are worth a .br/.gz sibling
+PRECOMPRESSED_TYPES = {".svg", ".json", ".txt", ".csv"}
+PRECOMPRESSED_ENCODINGS = {"br": ".br", "gzip": ".gz"}  # best first
+
+router = APIRouter()
+
+@lru_cache(maxsize=4096)
+def content_hash(path: str, mtime_ns: int, size: int) -> str:
+    """Short sha256 of a file. mtime and size are part of the cache key, so a replaced file is hashed again."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def resolve_image(path: str) -> Path:
+    """The file behind an /images/... path, refusing anything that resolves outside IMAGES_DIR."""
+    file_path = (IMAGES_DIR / path).resolve()
+    if not file_path.is_relative_to(IMAGES_DIR) or not file_path.is_file() or file_path.name.startswith("."):
+        raise HTTPException(status_code=404, detail="Image not found")
+    return file_path
+
+def precompressed_sibling(file_path: Path, accept_encoding: str) -> tuple[Path, str] | None:
+    if file_path.suffix.lower() not in PRECOMPRESSED_TYPES:
+        return None
+    # the brotli module isn't needed to send a .br made ahead of time, so every encoding with a sibling counts
+    for encoding in acceptable_encodings(accept_encoding, list(PRECOMPRESSED_ENCODINGS)):
+        sibling = file_path.with_name(file_path.name + PRECOMPRESSED_ENCODINGS[encoding])
+        if sibling.is_file():
+            return sibling, encoding
+    return None
+
+def send_path_response(file_path: Path, stat_result: os.stat_result, headers: dict, media_type: str | None) -> Response:
+    """Hand the bytes off without copying them through Python when the server can do it.
+
+    Behind nginx (IMAGES_ACCEL_REDIRECT set) nginx serves the file itself, with sendfile and Range.
+    Otherwise FileResponse answers Range requests and streams the file in chunks, each read on an
+    anyio worker thread, so memory stays flat but a big download does keep borrowing worker threads.
+    """
+    if IMAGES_ACCEL_REDIRECT:
+        relative = file_path.relative_to(IMAGES_DIR).as_posix()
+        return Response(headers={**headers, "X-Accel-Redirect": IMAGES_ACCEL_REDIRECT.rstrip("/") + "/" + relative},
+                        media_type=media_type)
+    return FileResponse(file_path, headers=headers, media_type=media_type, stat_result=stat_result)
+
+@router.api_route("/{path:path}", methods=["GET", "HEAD"])
+async def get_image(path: str, request: Request, v: str | None = None):
+    """Serve a file from the images folder (artwork originals and their derivatives).
+
+    Content-hashed URLs are cached forever: derivatives always are, and an original is when asked for
+    as /images/name.jpg?v=<hash>. Plain original URLs get a short max-age plus an ETag from the content
+    hash, so revalidating is a 304.
+    """
+    file_path = resolve_image(path)
+    stat_result = await anyio.to_thread.run_sync(os.stat, file_path)
+
+    hashed = HASHED_NAME.match(file_path.name)
+    if hashed:
+        digest = hashed.group(1)
+    else:
+        digest = await anyio.to_thread.run_sync(content_hash, str(file_path), stat_result.st_mtime_ns, stat_result.st_size)
+    sibling = None
+    if "range" not in request.headers:
+        sibling = precompressed_sibling(file_path, request.headers.get("accept-encoding", ""))
+    # a compressed copy is a different representation, so it gets its own strong ETag
+    etag = f'"{digest}-{sibling[1]}"' if sibling else f'"{digest}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE if hashed or v == digest else REVALIDATE,
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    media_type = None
+    if sibling:
+        media_type = guess_type(file_path.name)[0]
+        file_path, headers["Content-Encoding"] = sibling
+        stat_result = await anyio.to_thread.run_sync(os.stat, file_path)
+
+    return send_path_response(file_path, stat_result, headers, media_type)
@@ -0,0 +1,181 @@
+import asyncio
+import os
+from dotenv import load_dotenv
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql import text
+from app.dependencies import ReadSessionLocal, get_read_db
+from app.models import Artist, ArtworkMedium, Artwork, Department, Medium, Series
+from app.serialization import FastJSONResponse, row_type
+
+router = APIRouter()
+
+load_dotenv()
+SYNC_LIMIT = int(os.getenv("SYNC_LIMIT", 1000))  # change log entries per /sync page, by default
+SYNC_POLL_SECONDS = float(os.getenv("SYNC_POLL_SECONDS", 1))  # how often /sync/stream looks for a new seq
+SYNC_KEEPALIVE_SECONDS = float(os.getenv("SYNC_KEEPALIVE_SECONDS", 15))  # comment line so proxies keep it open
+IN_CHUNK_SIZE = 500  # ids per IN (...), under SQLite's bound parameter limit
+
+# the tables db/migrations/<dialect>/007_change_log.sql logs, and their rows as they are sent
+SYNC_MODELS = (Artist, Artwork, ArtworkMedium, Department, Medium, Series)
+SYNC_ROWS = {
+    model.__tablename__: row_type(f"Sync{model.__name__}", [column.key for column in model.__table__.columns])
+    for model in SYNC_MODELS
+}
+
+def entry_key(table, row_id, related_id):
+    """The logged row's primary key by column name; artworks_mediums is keyed by both of its ids."""
+    if table == ArtworkMedium.__tablename__:
+        return {"artwork_id": row_id, "medium_id": related_id}
+    return {"id": row_id}
+
+async def current_rows(db: AsyncSession, table_name: str, keys: list[tuple]) -> dict:
+    """The rows of one table with these keys as they are now, by key. Keys missing from the result are gone."""
+    row_class = SYNC_ROWS[table_name]
+    link = table_name == ArtworkMedium.__tablename__
+    # raw values rather than the ORM's types, as on the catalog routes: price isn't always a clean DECIMAL
+    columns = ", ".join(f'"{column}"' for column in row_class.__slots__)
+    query = text(f'SELECT {columns} FROM "{table_name}" WHERE "{"artwork_id" if link else "id"}" IN :ids')
+    query = query.bindparams(bindparam("ids", expanding=True))
+    wanted = set(keys)
+    rows = {}
+    for start in range(0, len(keys), IN_CHUNK_SIZE):
+        ids = list({row_id for row_id, _ in keys[start:start + IN_CHUNK_SIZE]})
+        for row in (await db.execute(query, {"ids": ids})).all():
+            row = row_class(*row)
+            key = (row.artwork_id, row.medium_id) if link else (row.id, None)
+            if key in wanted:  # an artwork's other mediums come back too
+                rows[key] = row
+    return rows
+
+@router.get("/")
+async def get_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(SYNC_LIMIT, ge=1, le=10000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Rows inserted, updated or deleted after change log seq `since`, oldest change first.
+
+    A row changed several times in the page is sent once, as it is now; a row that no longer exists
+    comes back as a delete with no "row". Pass "next" as `since` to get the rest while "has_more" is true,
+    and keep it for the next refresh. since=0 is the whole catalog.
+    """
+    try:
+        entries = (await db.execute(text("""
+            SELECT "seq", "table_name", "row_id", "related_id", "operation" FROM "change_log"
+            WHERE "seq" > :since
+            ORDER BY "seq"
+            LIMIT :limit
+        """), {"since": since, "limit": limit})).all()
+
+        # the last entry for each row decides where it goes in the page
+        latest = {}
+        for seq, table_name, row_id, related_id, operation in entries:
+            key = (table_name, row_id, related_id)
+            latest.pop(key, None)
+            latest[key] = (seq, operation)
+
+        keys_by_table = {}
+        for table_name, row_id, related_id in latest:
+            keys_by_table.setdefault(table_name, []).append((row_id, related_id))
+        rows = {
+            table_name: await current_rows(db, table_name, keys)
+            for table_name, keys in keys_by_table.items() if table_name in SYNC_ROWS
+        }
+    except SQLAlchemyError as e:
+        raise HTTPException(status_code=500, detail="Database query failed.") from e
+
+    # Rows are read after the log, so one may already include a change from past this page; that change
+    # is sent again on the next refresh, and applying a row twice leaves the client where it was.
+    changes = []
+    for (table_name, row_id, related_id), (seq, operation) in latest.items():
+        row = rows.get(table_name, {}).get((row_id, related_id))
+        if row is None:
+            operation = "delete"
+        elif operation == "delete":
+            operation = "insert"  # deleted and then added back under the same key
+        change = {"seq": seq, "table": table_name, "op": operation, "key": entry_key(table_name, row_id, related_id)}
+        if row is not None:
+            change["row"] = row
+        changes.append(change)
+
+    return FastJSONResponse({
+        "changes": changes,
+        "next": entries[-1][0] if entries else since,
+        "has_more": len(entries) == limit,
+    })
+
+class SequenceWatcher:
+    """Polls the newest change log seq for every /sync/stream client at once, and only while one is connected."""
+
+    def __init__(self, interval: float = SYNC_POLL_SECONDS):
+        self.interval = interval
+        self.latest = None
+        self.listeners = 0
+        self.changed = asyncio.Condition()
+        self.task = None
+
+    async def poll(self):
+        while self.listeners:
+            try:
+                async with ReadSessionLocal() as db:
+                    latest = (await db.execute(text('SELECT COALESCE(MAX("seq"), 0) FROM "change_log"'))).scalar()
+            except SQLAlchemyError:
+                latest = self.latest  # try again next time round; clients just hear nothing until then
+            if latest != self.latest:
+                async with self.changed:
+                    self.latest = latest
+                    self.changed.notify_all()
+            await asyncio.sleep(self.interval)
+        self.task = None
+
+    async def wait_past(self, seq: int, timeout: float) -> int | None:
+        """The newest seq once it is past `seq`, or None if that doesn't happen within timeout seconds."""
+        if self.task is None:
+            self.task = asyncio.create_task(self.poll())
+        async with self.changed:
+            try:
+                await asyncio.wait_for(
+                    self.changed.wait_for(lambda: self.latest is not None and self.latest > seq), timeout
+                )
+            except asyncio.TimeoutError:
+                return None
+            return self.latest
+
+sequence_watcher = SequenceWatcher()
+
+@router.get("/stream")
+async def stream_changes(
+    since: int = Query(0, ge=0),
+    last_event_id: int | None = Header(None),
+):
+    """Server-sent events carrying each new change log seq as it is committed: `id` and `data` are the seq.
+
+    Nothing but the number is pushed; on an event, call GET /sync with the seq you last synced to.
+    A reconnecting EventSource sends Last-Event-ID and picks up from there.
+    """
+    seq = last_event_id if last_event_id is not None else since
+
+    async def events():
+        nonlocal seq
+        sequence_watcher.listeners += 1
+        try:
+            yield f"retry: {int(SYNC_POLL_SECONDS * 1000)}\n\n"
+            while True:  # until the client goes and Starlette cancels this
+                latest = await sequence_watcher.wait_past(seq, SYNC_KEEPALIVE_SECONDS)
+                if latest is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                seq = latest
+                yield f"id: {seq}\nevent: changes\ndata: {seq}\n\n"
+        finally:
+            sequence_watcher.listeners -= 1
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # no buffering in nginx either
+    )
@@ -1,33 +1,59 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.dependencies import get_db
+from app.dependencies import get_db, get_read_db, get_current_user
 from app.models import User
-from app.utils.password import hash_password, verify_password
+from app.utils.password import hash_password_async, verify_password_async, PasswordPoolBusy
 from app.utils.jwt import create_access_token  # Assuming this is the utility function you wrote earlier
 
 router = APIRouter()
 
+# These routes are async so that waiting on bcrypt holds no thread. Lookups use the read session, so
+# the writer connection is only taken for the actual write, through run_in_threadpool since it's sync.
+
+async def find_user(db: AsyncSession, username: str) -> User | None:
+    return (await db.execute(select(User).where(User.username == username))).scalars().first()
+
+def save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def update_password(db: Session, user_id: int, hashed_password: str):
+    db.execute(update(User).where(User.id == user_id).values(password=hashed_password))
+    db.commit()
+
+async def password_work(coroutine):
+    """Await the password pool, answering 503 when it's already full."""
+    try:
+        return await coroutine
+    except PasswordPoolBusy:
+        raise HTTPException(status_code=503, detail="Too many sign-ins at once, try again shortly",
+                            headers={"Retry-After": "1"})
+
 # User registration route
 @router.post("/register")
-def register_user(username: str, password: str, email: str, db: Session = Depends(get_db)):
+async def register_user(username: str, password: str, email: str,
+                        read_db: AsyncSession = Depends(get_read_db), db: Session = Depends(get_db)):
     # Check if the username already exists
-    db_user = db.query(User).filter(User.username == username).first()
+    db_user = await find_user(read_db, username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
 
     # Hash the password before saving to the database
-    hashed_password = hash_password(password)
+    hashed_password = await password_work(hash_password_async(password))
     
     # Create a new user instance
     new_user = User(username=username, password=hashed_password, email=email)
     
     # Add the user to the database and commit
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await run_in_threadpool(save_user, db, new_user)
 
     # Create JWT for the newly registered user
-    user_data = {"username": new_user.username, "email": new_user.email, "is_admin": new_user.admin}
+    user_data = {"username": new_user.username, "email": new_user.email, "admin": new_user.admin}
     access_token = create_access_token(data=user_data)
 
     return {
@@ -39,15 +65,21 @@ def register_user(username: str, password: str, email: str, db: Session = Depend
 
 # Example login route
 @router.post("/login")
-def login_user(username: str, password: str, db: Session = Depends(get_db)):
+async def login_user(username: str, password: str,
+                     read_db: AsyncSession = Depends(get_read_db), db: Session = Depends(get_db)):
     # Retrieve the user by username
-    db_user = db.query(User).filter(User.username == username).first()
+    db_user = await find_user(read_db, username)
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
     # Verify the password
-    if not verify_password(password, db_user.password):
+    verified, new_hash = await password_work(verify_password_async(password, db_user.password))
+    if not verified:
         raise HTTPException(status_code=401, detail="Incorrect password")
+
+    # Hashed with an older work factor, store it again with the current one
+    if new_hash:
+        await run_in_threadpool(update_password, db, db_user.id, new_hash)
     
     # Create JWT with user info and admin status
     user_data = {"username": db_user.username, "email": db_user.email, "admin": db_user.admin}
@@ -59,3 +91,8 @@ def login_user(username: str, password: str, db: Session = Depends(get_db)):
         "token_type": "bearer",
         "user": {"username": db_user.username, "email": db_user.email, "is_admin": db_user.admin}
     }
+
+@router.get("/me")
+def read_current_user(user: dict = Depends(get_current_user)):
+    """Who the bearer token belongs to."""
+    return {"username": user["username"], "email": user["email"], "admin": user["admin"]}
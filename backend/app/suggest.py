@@ -0,0 +1,226 @@
+import os
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from heapq import nsmallest
+from itertools import groupby
+from dotenv import load_dotenv
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import bindparam, text
+from app.change_log import ChangeLogIndex
+from app.serialization import row_type
+
+# Typeahead settings, override in .env
+load_dotenv()
+SUGGEST_MAX_LIMIT = int(os.getenv("SUGGEST_MAX_LIMIT", 20))
+SUGGEST_REFRESH_SECONDS = float(os.getenv("SUGGEST_REFRESH_SECONDS", 5))  # how stale writes from elsewhere can be
+SUGGEST_REBUILD_AFTER = int(os.getenv("SUGGEST_REBUILD_AFTER", 500))  # more changes than this and a rebuild is cheaper
+SUGGEST_SCAN_LIMIT = 256  # prefixes matching more keys than this are kept in rank order
+MAX_KEY_LENGTH = 64  # nobody types further than this into a search box
+
+WORDS = re.compile(r"\w+")
+LAST_CHAR = "\U0010ffff"
+
+Suggestion = row_type("Suggestion", ["type", "id", "label"])
+
+# what the index reads from each table, by id
+SOURCES = {
+    "artists": 'SELECT "id", "first_name", "last_name", "artist_name" FROM "artists"',
+    "series": 'SELECT "id", "name" FROM "series"',
+    "artworks": 'SELECT "id", "title", "artist_id", "series", "sold" FROM "artworks"',
+}
+
+def fold(value: str) -> str:
+    """Lower case without accents, so "École" and "ecole" are the same key."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def fold_prefix(prefix: str) -> str:
+    """What someone has typed so far, folded like the keys. A trailing space stays: "van " is a whole word."""
+    folded = " ".join(WORDS.findall(fold(prefix)))
+    return folded + " " if folded and prefix[-1:].isspace() else folded
+
+def index_keys(*names: str | None) -> list[str]:
+    """One key per word start in each name, so "claude mo" and "mo" both find "Claude Monet"."""
+    keys = set()
+    for name in names:
+        if not name:
+            continue
+        words = WORDS.findall(fold(name))
+        folded = " ".join(words)
+        start = 0
+        for word in words:
+            keys.add(folded[start:start + MAX_KEY_LENGTH])
+            start += len(word) + 1
+    return sorted(keys)
+
+def artist_label(first_name, last_name, artist_name) -> str:
+    return " ".join(name for name in (first_name, last_name) if name) or artist_name or ""
+
+class SuggestIndex(ChangeLogIndex):
+    """Artwork titles, artist names and series names in a sorted list of folded keys, for GET /artworks/suggest.
+
+    A prefix is a bisect into the list. Prefixes with too many keys to scan per keystroke (one or two
+    letters, common words) also keep their entries in rank order, updated in place as entries change.
+    Entries are weighted by popularity: an artwork that sold counts double, and an artist or series by
+    the works they have and sold.
+    """
+
+    tables = tuple(SOURCES)
+
+    def __init__(self):
+        super().__init__(SUGGEST_REFRESH_SECONDS, SUGGEST_REBUILD_AFTER)
+        self.keys = []  # sorted (key, entry id); an entry id is (type, row id)
+        # entry id -> (rank, keys). A rank is (-weight, len(label), label, entry id): sorting ranks sorts
+        # best first, and the one tuple is shared by every ranked list the entry is in.
+        self.entries = {}
+        self.ranked = {}  # prefix -> rank per key under it, sorted, for prefixes over SUGGEST_SCAN_LIMIT keys
+        self.artworks = {}  # artwork id -> (artist id, series id, popularity), to move weights when it changes
+        self.popularity = Counter()  # artist and series entry ids -> popularity of their artworks
+
+    def search(self, prefix: str, limit: int) -> list:
+        folded = fold_prefix(prefix)
+        if not folded:
+            return []
+        ranked = self.ranked.get(folded)
+        if ranked is None:
+            start = bisect_left(self.keys, (folded,))
+            end = bisect_left(self.keys, (folded + LAST_CHAR,), start)
+            if end - start > SUGGEST_SCAN_LIMIT:  # grown past the limit since the index was built
+                ranked = self.ranked[folded] = sorted(self.entries[entry_id][0] for _, entry_id in self.keys[start:end])
+            else:
+                ranked = nsmallest(limit, {self.entries[entry_id][0] for _, entry_id in self.keys[start:end]})
+        best = []
+        for rank in ranked:
+            if not best or best[-1] is not rank:  # an entry with two keys under the prefix is in twice, side by side
+                best.append(rank)
+                if len(best) == limit:
+                    break
+        return [Suggestion(entry_id[0], entry_id[1], label) for _, _, label, entry_id in best]
+
+    def ranked_under(self, key: str):
+        for end in range(1, len(key) + 1):
+            ranked = self.ranked.get(key[:end])
+            if ranked is not None:
+                yield ranked
+
+    def set_entry(self, entry_id, label: str, weight: int, keys: list[str]):
+        old = self.entries.get(entry_id)
+        if old is not None and old[0][0] == -weight and old[0][2] == label and old[1] == keys:
+            return
+        rank = (-weight, len(label), label, entry_id)
+        if old is not None and old[1] == keys:  # reweighed: same place in the keys, new place in the rankings
+            for key in keys:
+                for ranked in self.ranked_under(key):
+                    del ranked[bisect_left(ranked, old[0])]
+                    insort(ranked, rank)
+            self.entries[entry_id] = (rank, keys)
+            return
+        self.remove_entry(entry_id)
+        self.entries[entry_id] = (rank, keys)
+        for key in keys:
+            insort(self.keys, (key, entry_id))
+            for ranked in self.ranked_under(key):
+                insort(ranked, rank)
+
+    def remove_entry(self, entry_id):
+        old = self.entries.pop(entry_id, None)
+        if old is None:
+            return
+        rank, keys = old
+        for key in keys:
+            del self.keys[bisect_left(self.keys, (key, entry_id))]
+            for ranked in self.ranked_under(key):
+                del ranked[bisect_left(ranked, rank)]
+
+    def reweigh(self, entry_id):
+        if entry_id in self.entries:
+            (_, _, label, _), keys = self.entries[entry_id]
+            self.set_entry(entry_id, label, 1 + self.popularity[entry_id], keys)
+
+    def put_artist(self, artist_id, first_name, last_name, artist_name):
+        entry_id = ("artist", artist_id)
+        keys = index_keys(artist_label(first_name, last_name, artist_name), artist_name)
+        self.set_entry(entry_id, artist_label(first_name, last_name, artist_name), 1 + self.popularity[entry_id], keys)
+
+    def put_series(self, series_id, name):
+        entry_id = ("series", series_id)
+        self.set_entry(entry_id, name, 1 + self.popularity[entry_id], index_keys(name))
+
+    def put_artwork(self, artwork_id, title, artist_id, series_id, sold):
+        self.drop_artwork(artwork_id)
+        popularity = 1 + (sold or 0)
+        self.artworks[artwork_id] = (artist_id, series_id, popularity)
+        self.set_entry(("artwork", artwork_id), title, popularity, index_keys(title))
+        for entry_id in (("artist", artist_id), ("series", series_id)):
+            self.popularity[entry_id] += popularity
+            self.reweigh(entry_id)
+
+    def drop_artwork(self, artwork_id):
+        facts = self.artworks.pop(artwork_id, None)
+        if facts is None:
+            return
+        artist_id, series_id, popularity = facts
+        for entry_id in (("artist", artist_id), ("series", series_id)):
+            self.popularity[entry_id] -= popularity
+            self.reweigh(entry_id)
+        self.remove_entry(("artwork", artwork_id))
+
+    def load(self, artists: list, series: list, artworks: list):
+        """Replace everything, sorting once instead of inserting key by key."""
+        facts, popularity, labels = {}, Counter(), {}
+        for artwork_id, title, artist_id, series_id, sold in artworks:
+            facts[artwork_id] = (artist_id, series_id, 1 + (sold or 0))
+            popularity[("artist", artist_id)] += 1 + (sold or 0)
+            popularity[("series", series_id)] += 1 + (sold or 0)
+            labels[("artwork", artwork_id)] = (title, 1 + (sold or 0), index_keys(title))
+        for artist_id, first_name, last_name, artist_name in artists:
+            label = artist_label(first_name, last_name, artist_name)
+            labels[("artist", artist_id)] = (label, 1 + popularity[("artist", artist_id)], index_keys(label, artist_name))
+        for series_id, name in series:
+            labels[("series", series_id)] = (name, 1 + popularity[("series", series_id)], index_keys(name))
+        entries = {
+            entry_id: ((-weight, len(label), label, entry_id), keys) for entry_id, (label, weight, keys) in labels.items()
+        }
+        keys = sorted((key, entry_id) for entry_id, (_, entry_keys) in entries.items() for key in entry_keys)
+
+        # rank every prefix over the scan limit now, a letter at a time: only big prefixes have big extensions
+        ranked = {}
+        pending = [(0, len(keys), 1)]
+        while pending:
+            start, end, depth = pending.pop()
+            for prefix, group in groupby(range(start, end), key=lambda position: keys[position][0][:depth]):
+                positions = list(group)
+                if len(positions) > SUGGEST_SCAN_LIMIT and len(prefix) == depth:
+                    ranked[prefix] = sorted(entries[keys[position][1]][0] for position in positions)
+                    pending.append((positions[0], positions[-1] + 1, depth + 1))
+
+        self.keys, self.entries, self.ranked, self.artworks, self.popularity = keys, entries, ranked, facts, popularity
+
+    def apply(self, changed: dict, rows: dict):
+        """Bring the rows whose ids changed up to date: put the ones still there, drop the rest."""
+        for table_name, put, drop in (
+            ("artists", self.put_artist, lambda artist_id: self.remove_entry(("artist", artist_id))),
+            ("series", self.put_series, lambda series_id: self.remove_entry(("series", series_id))),
+            ("artworks", self.put_artwork, self.drop_artwork),
+        ):
+            current = {row[0]: row for row in rows.get(table_name, [])}
+            for row_id in changed.get(table_name, ()):
+                if row_id in current:
+                    put(*current[row_id])
+                else:
+                    drop(row_id)
+
+    async def reload(self, db: AsyncSession):
+        rows = {table_name: (await db.execute(text(query))).all() for table_name, query in SOURCES.items()}
+        self.load(rows["artists"], rows["series"], rows["artworks"])
+
+    async def update(self, db: AsyncSession, changed: dict[str, dict[int, set]]):
+        rows = {}
+        for table_name, ids in changed.items():
+            query = text(SOURCES[table_name] + ' WHERE "id" IN :ids').bindparams(bindparam("ids", expanding=True))
+            rows[table_name] = (await db.execute(query, {"ids": list(ids)})).all()
+        self.apply(changed, rows)
+
+suggest_index = SuggestIndex()
@@ -1,13 +1,103 @@
 import jwt
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from dotenv import dotenv_values, find_dotenv, load_dotenv
 
 # Load environment variables
 load_dotenv()
-JWT_SECRET = os.getenv("JWT_SECRET")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")  # Default to HS256 if not set in .env
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 60))  # Default to 60 minutes if not set
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))  # validated tokens remembered, oldest go first
+KEYS_RELOAD_SECONDS = int(os.getenv("JWT_KEYS_RELOAD_SECONDS", 30))  # how often .env is checked for new keys
+
+class KeyRing:
+    """Signing keys by kid, re-read from .env when it changes, so rotating a secret needs no restart.
+
+    JWT_KEYS="2025-06:secret-a,2025-01:secret-b" lists every key tokens may be signed with and
+    JWT_ACTIVE_KID picks the one new tokens get (default: the first). To rotate, add the new key in
+    front, and drop the old one once its tokens have expired. A plain JWT_SECRET still works, as kid "default".
+    """
+
+    def __init__(self):
+        self.path = find_dotenv(usecwd=True)
+        self.mtime = None
+        self.checked_at = 0
+        self.keys = {}
+        self.active_kid = None
+        self.lock = threading.Lock()
+        self.reload()
+
+    def reload(self):
+        # read into the ring only, never os.environ: the rest of the settings keep the process environment first.
+        # For the key settings .env wins, since that's where a rotation is made.
+        values = {name: os.getenv(name) for name in ("JWT_KEYS", "JWT_SECRET", "JWT_ACTIVE_KID")}
+        if self.path:
+            values.update((name, value) for name, value in dotenv_values(self.path).items() if name in values)
+        keys = dict(entry.strip().split(":", 1) for entry in (values["JWT_KEYS"] or "").split(",") if ":" in entry)
+        if values["JWT_SECRET"]:
+            keys.setdefault("default", values["JWT_SECRET"])
+        self.keys = keys
+        self.active_kid = values["JWT_ACTIVE_KID"] or next(iter(keys), None)
+
+    def refresh(self):
+        """Reload if .env changed, looking at most every KEYS_RELOAD_SECONDS."""
+        now = time.monotonic()
+        if now - self.checked_at < KEYS_RELOAD_SECONDS:
+            return
+        with self.lock:
+            self.checked_at = now
+            mtime = os.path.getmtime(self.path) if self.path and os.path.exists(self.path) else None
+            if mtime != self.mtime:
+                self.mtime = mtime
+                self.reload()
+
+    def get(self, kid: str | None) -> str | None:
+        self.refresh()
+        return self.keys.get(kid or "default")
+
+    def active(self) -> tuple[str, str]:
+        self.refresh()
+        if self.active_kid not in self.keys:
+            raise RuntimeError("No JWT signing key configured, set JWT_KEYS or JWT_SECRET in .env")
+        return self.active_kid, self.keys[self.active_kid]
+
+keyring = KeyRing()
+
+class TokenCache:
+    """Bounded LRU of tokens that already passed verification, each dropped at its exp.
+
+    A repeat request with the same token is a dict lookup instead of a decode and HMAC. Entries remember
+    the key they were checked against, so a token whose kid was rotated out stops being accepted.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # token -> (exp, kid, secret, payload)
+        self.lock = threading.Lock()
+
+    def get(self, token: str) -> dict | None:
+        with self.lock:
+            entry = self.entries.get(token)
+            if entry is None:
+                return None
+            exp, kid, secret, payload = entry
+            if exp <= time.time() or keyring.keys.get(kid) != secret:
+                del self.entries[token]
+                return None
+            self.entries.move_to_end(token)
+            return payload
+
+    def set(self, token: str, exp: float, kid: str, secret: str, payload: dict):
+        with self.lock:
+            self.entries[token] = (exp, kid, secret, payload)
+            self.entries.move_to_end(token)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
 
 # Utility function to create a JWT token
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -17,13 +107,24 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm=ALGORITHM)
+    kid, secret = keyring.active()
+    encoded_jwt = jwt.encode(to_encode, secret, algorithm=ALGORITHM, headers={"kid": kid})
     return encoded_jwt
 
-# Utility function to verify a JWT token (if needed)
+# Utility function to verify a JWT token
 def verify_access_token(token: str):
+    keyring.refresh()
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
-        return payload  # Return decoded payload (you can access the user data here)
-    except jwt.JWTError:
+        kid = jwt.get_unverified_header(token).get("kid") or "default"
+        secret = keyring.get(kid)
+        if secret is None:
+            return None  # signed with a key we don't have (any more)
+        payload = jwt.decode(token, secret, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
         return None  # Invalid token
+    if "exp" in payload:
+        token_cache.set(token, payload["exp"], kid, secret, payload)
+    return payload  # Return decoded payload (you can access the user data here)
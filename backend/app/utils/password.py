@@ -1,7 +1,18 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
 from passlib.context import CryptContext
 
-# Set up bcrypt for password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing settings, override in .env
+load_dotenv()
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))  # work factor, each +1 doubles the cost
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", 2))  # processes that do nothing but bcrypt
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", 32))  # running + queued, beyond that we answer 503
+
+# Set up bcrypt for password hashing. Hashes made with a different work factor count as deprecated,
+# so verify_and_update hands back a new hash for them.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def hash_password(password: str) -> str:
     """Hashes the password using bcrypt"""
@@ -11,6 +22,69 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies if the provided password matches the hashed password"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verifies the password, and if the hash uses an old work factor returns a new one to store."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+class PasswordPoolBusy(Exception):
+    """More hashing work is waiting than PASSWORD_MAX_PENDING allows."""
+
+class PasswordPool:
+    """Runs bcrypt on its own process pool, off the event loop, the GIL and FastAPI's threadpool.
+
+    bcrypt is ~250 ms of CPU per call, so a burst of logins would otherwise tie up the threads the
+    catalog routes need. The number of calls running or queued is capped, past that submit() raises
+    PasswordPoolBusy straight away rather than letting the queue (and everyone's wait) grow.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = None
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0  # raised in the worker, e.g. a malformed stored hash, or the pool broke
+        self.rejected = 0
+
+    async def submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordPoolBusy()
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.pending += 1
+        try:
+            result = await asyncio.wrap_future(self.executor.submit(fn, *args))
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "work_factor": BCRYPT_ROUNDS,
+            "running": min(self.pending, self.workers),
+            "queued": max(self.pending - self.workers, 0),
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+password_pool = PasswordPool(PASSWORD_WORKERS, PASSWORD_MAX_PENDING)
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the password pool."""
+    return await password_pool.submit(hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """verify_and_update_password on the password pool."""
+    return await password_pool.submit(verify_and_update_password, plain_password, hashed_password)
+
 def main():
     """Test functionality of password utillity functions."""
     pwd = 'TEST'
@@ -20,4 +94,4 @@ def main():
     print('verified?: ', verify_password(pwd, hashed))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,17 @@
+-- Indexes behind the keyset pagination and filters on GET /artworks/
+-- On PostgreSQL the tables come from models.py rather than schema.sql, so the baseline's artist_ids index is made here too.
+
+CREATE INDEX IF NOT EXISTS "artist_ids" ON "artworks" ("artist_id");
+
+-- pages walk artworks in (last_name, id) order, same as the art_list view
+CREATE INDEX IF NOT EXISTS "artist_last_names" ON "artists" ("last_name", "id");
+
+-- one index per filter on GET /artworks/
+CREATE INDEX IF NOT EXISTS "department_ids" ON "artworks" ("department");
+CREATE INDEX IF NOT EXISTS "series_ids" ON "artworks" ("series");
+CREATE INDEX IF NOT EXISTS "sold_status" ON "artworks" ("sold");
+CREATE INDEX IF NOT EXISTS "years" ON "artworks" ("year");
+CREATE INDEX IF NOT EXISTS "prices" ON "artworks" ("price");
+
+-- the primary key on artworks_mediums starts with artwork_id, this covers "every artwork in this medium"
+CREATE INDEX IF NOT EXISTS "medium_ids" ON "artworks_mediums" ("medium_id", "artwork_id");
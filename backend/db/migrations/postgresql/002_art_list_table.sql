@@ -0,0 +1,176 @@
+-- PostgreSQL version of sqlite/002_art_list_table.sql: art_list as a real table, kept up to date row by row
+-- by triggers. Same columns and indexes, string_agg in place of GROUP_CONCAT, and plpgsql trigger functions.
+
+DROP VIEW IF EXISTS "art_list";
+DROP VIEW IF EXISTS "mediums_by_artwork";
+
+CREATE VIEW "mediums_by_artwork" AS
+SELECT string_agg("mediums"."name", ',' ORDER BY "mediums"."id") AS "mediums", "artworks"."title", "artworks"."id"
+FROM "mediums"
+JOIN "artworks_mediums" ON "mediums"."id" = "artworks_mediums"."medium_id"
+JOIN "artworks" ON "artworks_mediums"."artwork_id" = "artworks"."id"
+GROUP BY "artworks"."id";
+
+-- how one art_list row is built, the triggers below always go through this with WHERE "id" = ...
+CREATE VIEW "art_list_source" AS
+SELECT "artworks"."id", first_name || ' ' || last_name AS "name", "artworks"."title", "size", "year",
+    (SELECT string_agg("mediums"."name", ',' ORDER BY "mediums"."id") FROM "artworks_mediums"
+        JOIN "mediums" ON "mediums"."id" = "artworks_mediums"."medium_id"
+        WHERE "artworks_mediums"."artwork_id" = "artworks"."id") AS "mediums",
+    "artworks"."image_url", "artworks"."description",
+    "series"."name" AS "series", "departments"."name" AS "department", "price", "sold",
+    "artworks"."artist_id", "artists"."last_name", "artworks"."series" AS "series_id", "artworks"."department" AS "department_id"
+FROM "artworks"
+JOIN "artists" ON "artists"."id" = "artworks"."artist_id"
+LEFT JOIN "series" ON "series"."id" = "artworks"."series"
+LEFT JOIN "departments" ON "departments"."id" = "artworks"."department";
+
+CREATE TABLE IF NOT EXISTS "art_list" (
+    "id" INTEGER,
+    "name" TEXT,
+    "title" TEXT NOT NULL,
+    "size" TEXT,
+    "year" INTEGER,
+    "mediums" TEXT,
+    "image_url" TEXT,
+    "description" TEXT,
+    "series" TEXT,
+    "department" TEXT,
+    "price" DECIMAL,
+    "sold" INTEGER,
+    -- not part of the public row, used to keep the table in sync and to page/filter
+    "artist_id" INTEGER NOT NULL,
+    "last_name" TEXT,
+    "series_id" INTEGER,
+    "department_id" INTEGER,
+    PRIMARY KEY("id")
+);
+
+-- artworks: rebuild the one row
+CREATE OR REPLACE FUNCTION "art_list_artwork_changed"() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM "art_list" WHERE "id" = OLD."id";
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO "art_list" SELECT * FROM "art_list_source" WHERE "id" = NEW."id";
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "art_list_artwork" ON "artworks";
+CREATE TRIGGER "art_list_artwork"
+AFTER INSERT OR UPDATE OR DELETE ON "artworks"
+FOR EACH ROW EXECUTE FUNCTION "art_list_artwork_changed"();
+
+-- artworks_mediums: only the mediums column changes
+CREATE OR REPLACE FUNCTION "art_list_refresh_mediums"("changed_id" INTEGER) RETURNS VOID AS $$
+BEGIN
+    UPDATE "art_list" SET "mediums" = (SELECT "mediums" FROM "art_list_source" WHERE "art_list_source"."id" = "changed_id")
+    WHERE "art_list"."id" = "changed_id";
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION "art_list_artwork_medium_changed"() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM "art_list_refresh_mediums"(OLD."artwork_id");
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM "art_list_refresh_mediums"(NEW."artwork_id");
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "art_list_artwork_medium" ON "artworks_mediums";
+CREATE TRIGGER "art_list_artwork_medium"
+AFTER INSERT OR UPDATE OR DELETE ON "artworks_mediums"
+FOR EACH ROW EXECUTE FUNCTION "art_list_artwork_medium_changed"();
+
+-- renaming or deleting a medium touches every artwork made with it
+CREATE OR REPLACE FUNCTION "art_list_medium_changed"() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE "art_list" SET "mediums" = (SELECT "mediums" FROM "art_list_source" WHERE "art_list_source"."id" = "art_list"."id")
+    WHERE "id" IN (SELECT "artwork_id" FROM "artworks_mediums" WHERE "medium_id" = OLD."id");
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "art_list_medium" ON "mediums";
+CREATE TRIGGER "art_list_medium"
+AFTER UPDATE OF "name" OR DELETE ON "mediums"
+FOR EACH ROW EXECUTE FUNCTION "art_list_medium_changed"();
+
+-- series, departments and artists: copy the changed name onto their artworks
+CREATE OR REPLACE FUNCTION "art_list_series_changed"() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE "art_list" SET "series" = NULL WHERE "series_id" = OLD."id";
+    ELSE
+        UPDATE "art_list" SET "series" = NEW."name" WHERE "series_id" = NEW."id";
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "art_list_series" ON "series";
+CREATE TRIGGER "art_list_series"
+AFTER UPDATE OF "name" OR DELETE ON "series"
+FOR EACH ROW EXECUTE FUNCTION "art_list_series_changed"();
+
+CREATE OR REPLACE FUNCTION "art_list_department_changed"() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        UPDATE "art_list" SET "department" = NULL WHERE "department_id" = OLD."id";
+    ELSE
+        UPDATE "art_list" SET "department" = NEW."name" WHERE "department_id" = NEW."id";
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "art_list_department" ON "departments";
+CREATE TRIGGER "art_list_department"
+AFTER UPDATE OF "name" OR DELETE ON "departments"
+FOR EACH ROW EXECUTE FUNCTION "art_list_department_changed"();
+
+-- art_list inner joins artists, an artwork without its artist drops out
+CREATE OR REPLACE FUNCTION "art_list_artist_changed"() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        DELETE FROM "art_list" WHERE "artist_id" = OLD."id";
+    ELSE
+        UPDATE "art_list" SET "name" = NEW."first_name" || ' ' || NEW."last_name", "last_name" = NEW."last_name"
+        WHERE "artist_id" = NEW."id";
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "art_list_artist" ON "artists";
+CREATE TRIGGER "art_list_artist"
+AFTER UPDATE OF "first_name", "last_name" OR DELETE ON "artists"
+FOR EACH ROW EXECUTE FUNCTION "art_list_artist_changed"();
+
+-- fill it from what's already there
+INSERT INTO "art_list" SELECT * FROM "art_list_source" ON CONFLICT ("id") DO NOTHING;
+
+-- paging and filters now run against art_list, these move over from artworks/artists
+DROP INDEX IF EXISTS "artist_last_names";
+DROP INDEX IF EXISTS "department_ids";
+DROP INDEX IF EXISTS "series_ids";
+DROP INDEX IF EXISTS "sold_status";
+DROP INDEX IF EXISTS "years";
+DROP INDEX IF EXISTS "prices";
+
+CREATE INDEX IF NOT EXISTS "art_list_order" ON "art_list" ("last_name", "id");
+CREATE INDEX IF NOT EXISTS "art_list_artist_ids" ON "art_list" ("artist_id");
+CREATE INDEX IF NOT EXISTS "art_list_series_ids" ON "art_list" ("series_id");
+CREATE INDEX IF NOT EXISTS "art_list_department_ids" ON "art_list" ("department_id");
+CREATE INDEX IF NOT EXISTS "art_list_series" ON "art_list" ("series");
+CREATE INDEX IF NOT EXISTS "art_list_departments" ON "art_list" ("department");
+CREATE INDEX IF NOT EXISTS "art_list_sold" ON "art_list" ("sold");
+CREATE INDEX IF NOT EXISTS "art_list_years" ON "art_list" ("year");
+CREATE INDEX IF NOT EXISTS "art_list_prices" ON "art_list" ("price");
@@ -0,0 +1,56 @@
+-- PostgreSQL version of sqlite/003_artwork_search.sql, for GET /artworks/search.
+-- A weighted tsvector per artwork with a GIN index stands in for FTS5. The artworks_search text search
+-- configuration runs words through unaccent, so "croises" finds "Croisés" like remove_diacritics does.
+CREATE EXTENSION IF NOT EXISTS "unaccent";
+
+DROP TEXT SEARCH CONFIGURATION IF EXISTS "artworks_search";
+CREATE TEXT SEARCH CONFIGURATION "artworks_search" (COPY = simple);
+ALTER TEXT SEARCH CONFIGURATION "artworks_search"
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+
+CREATE TABLE IF NOT EXISTS "artworks_search" (
+    "id" INTEGER,
+    "document" TSVECTOR NOT NULL,
+    PRIMARY KEY("id")
+);
+
+CREATE INDEX IF NOT EXISTS "artworks_search_documents" ON "artworks_search" USING GIN ("document");
+
+-- weights follow SEARCH_WEIGHTS in the SQLite version: title A, keywords and artist B, mediums and series C, description D
+CREATE OR REPLACE FUNCTION "artworks_search_document"("title" TEXT, "description" TEXT, "keywords" TEXT,
+    "artist" TEXT, "mediums" TEXT, "series" TEXT) RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('artworks_search', coalesce($1, '')), 'A')
+        || setweight(to_tsvector('artworks_search', coalesce($3, '') || ' ' || coalesce($4, '')), 'B')
+        || setweight(to_tsvector('artworks_search', coalesce($5, '') || ' ' || coalesce($6, '')), 'C')
+        || setweight(to_tsvector('artworks_search', coalesce($2, '')), 'D');
+$$ LANGUAGE SQL STABLE;
+
+-- art_list already has the artist, mediums and series names filled in, and every change to those
+-- (or to the artwork itself) rewrites its art_list row, so following art_list keeps search in sync.
+CREATE OR REPLACE FUNCTION "artworks_search_changed"() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        DELETE FROM "artworks_search" WHERE "id" = OLD."id";
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO "artworks_search" ("id", "document")
+        VALUES (NEW."id", "artworks_search_document"(NEW."title", NEW."description",
+            (SELECT "keywords" FROM "artworks" WHERE "id" = NEW."id"), NEW."name", NEW."mediums", NEW."series"))
+        ON CONFLICT ("id") DO UPDATE SET "document" = EXCLUDED."document";
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "artworks_search" ON "art_list";
+CREATE TRIGGER "artworks_search"
+AFTER INSERT OR UPDATE OR DELETE ON "art_list"
+FOR EACH ROW EXECUTE FUNCTION "artworks_search_changed"();
+
+-- fill it from what's already there
+INSERT INTO "artworks_search" ("id", "document")
+SELECT "art_list"."id", "artworks_search_document"("art_list"."title", "art_list"."description", "artworks"."keywords",
+    "art_list"."name", "art_list"."mediums", "art_list"."series")
+FROM "art_list"
+JOIN "artworks" ON "artworks"."id" = "art_list"."id"
+ON CONFLICT ("id") DO NOTHING;
@@ -0,0 +1,30 @@
+-- PostgreSQL version of sqlite/004_catalog_versions.sql: a change counter per catalog, bumped by triggers
+-- on every write. Statement level triggers, so a bulk write bumps the version once rather than per row.
+CREATE TABLE IF NOT EXISTS "catalog_versions" (
+    "name" TEXT,
+    "version" INTEGER NOT NULL DEFAULT(0),
+    "updated_at" TIMESTAMP DEFAULT(now() AT TIME ZONE 'utc'),
+    PRIMARY KEY("name")
+);
+
+INSERT INTO "catalog_versions" ("name") VALUES ('artworks'), ('artists') ON CONFLICT ("name") DO NOTHING;
+
+-- TG_ARGV[0] is the catalog to bump
+CREATE OR REPLACE FUNCTION "catalog_version_bump"() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE "catalog_versions" SET "version" = "version" + 1, "updated_at" = now() AT TIME ZONE 'utc'
+    WHERE "name" = TG_ARGV[0];
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- every change to an artwork, its mediums, series, department or artist rewrites its art_list row
+DROP TRIGGER IF EXISTS "catalog_version_art_list" ON "art_list";
+CREATE TRIGGER "catalog_version_art_list"
+AFTER INSERT OR UPDATE OR DELETE ON "art_list"
+FOR EACH STATEMENT EXECUTE FUNCTION "catalog_version_bump"('artworks');
+
+DROP TRIGGER IF EXISTS "catalog_version_artist" ON "artists";
+CREATE TRIGGER "catalog_version_artist"
+AFTER INSERT OR UPDATE OR DELETE ON "artists"
+FOR EACH STATEMENT EXECUTE FUNCTION "catalog_version_bump"('artists');
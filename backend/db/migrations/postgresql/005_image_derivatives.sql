@@ -0,0 +1,14 @@
+-- Resized / re-encoded copies of each original image, written by util/image_derivatives.py.
+-- Keyed on the original's URL, the same value artworks.image_url and artists.image_url hold.
+CREATE TABLE IF NOT EXISTS "image_derivatives" (
+    "source_url" TEXT NOT NULL,
+    "source_hash" TEXT NOT NULL, -- sha256 of the original, derivatives are only rebuilt when this changes
+    "size" TEXT NOT NULL CHECK("size" IN ('thumb', 'medium', 'large')),
+    "format" TEXT NOT NULL CHECK("format" IN ('jpeg', 'webp', 'avif')),
+    "url" TEXT NOT NULL,
+    "width" INTEGER NOT NULL,
+    "height" INTEGER NOT NULL,
+    "bytes" INTEGER NOT NULL,
+    "created_at" TIMESTAMP DEFAULT(CURRENT_TIMESTAMP),
+    PRIMARY KEY("source_url", "size", "format")
+);
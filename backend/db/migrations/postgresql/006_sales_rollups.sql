@@ -0,0 +1,128 @@
+-- PostgreSQL version of sqlite/006_sales_rollups.sql: count and revenue per artist, month, organization type
+-- and collector, kept current by a trigger on sold_artworks. Revenue is whole cents.
+-- A sale counts for the artist and organization type it had when it was recorded (or last edited): both
+-- are kept in sales_rollup_snapshots, and a later update or delete takes the sale back from those.
+
+CREATE TABLE IF NOT EXISTS "sales_by_artist" (
+    "artist_id" INTEGER,
+    "sales" INTEGER NOT NULL DEFAULT(0),
+    "revenue_cents" BIGINT NOT NULL DEFAULT(0),
+    PRIMARY KEY("artist_id")
+);
+
+CREATE TABLE IF NOT EXISTS "sales_by_month" (
+    "month" TEXT,
+    "sales" INTEGER NOT NULL DEFAULT(0),
+    "revenue_cents" BIGINT NOT NULL DEFAULT(0),
+    PRIMARY KEY("month")
+);
+
+CREATE TABLE IF NOT EXISTS "sales_by_organization_type" (
+    "organization_type" TEXT,
+    "sales" INTEGER NOT NULL DEFAULT(0),
+    "revenue_cents" BIGINT NOT NULL DEFAULT(0),
+    PRIMARY KEY("organization_type")
+);
+
+CREATE TABLE IF NOT EXISTS "sales_by_collector" (
+    "person_id" INTEGER,
+    "sales" INTEGER NOT NULL DEFAULT(0),
+    "revenue_cents" BIGINT NOT NULL DEFAULT(0),
+    PRIMARY KEY("person_id")
+);
+
+-- one row per sale: the artist and organization type its rollup rows were counted under
+CREATE TABLE IF NOT EXISTS "sales_rollup_snapshots" (
+    "sale_id" INTEGER,
+    "artist_id" INTEGER,
+    "organization_type" TEXT NOT NULL,
+    PRIMARY KEY("sale_id")
+);
+
+-- top-N by revenue or count is an index walk
+CREATE INDEX IF NOT EXISTS "sales_by_artist_revenue" ON "sales_by_artist" ("revenue_cents");
+CREATE INDEX IF NOT EXISTS "sales_by_artist_sales" ON "sales_by_artist" ("sales");
+CREATE INDEX IF NOT EXISTS "sales_by_collector_revenue" ON "sales_by_collector" ("revenue_cents");
+CREATE INDEX IF NOT EXISTS "sales_by_collector_sales" ON "sales_by_collector" ("sales");
+
+-- add (sign 1) or take back (sign -1) one sale in every rollup, under the artist and organization type given
+CREATE OR REPLACE FUNCTION "sales_rollup_apply"("sale" "sold_artworks", "sale_artist_id" INTEGER, "sale_organization_type" TEXT, "sign" INTEGER) RETURNS VOID AS $$
+DECLARE
+    "cents" BIGINT := ROUND(COALESCE("sale"."price", 0) * 100)::BIGINT * "sign";
+BEGIN
+    IF "sale_artist_id" IS NOT NULL THEN
+        INSERT INTO "sales_by_artist" ("artist_id", "sales", "revenue_cents")
+        VALUES ("sale_artist_id", "sign", "cents")
+        ON CONFLICT ("artist_id") DO UPDATE SET "sales" = "sales_by_artist"."sales" + EXCLUDED."sales",
+            "revenue_cents" = "sales_by_artist"."revenue_cents" + EXCLUDED."revenue_cents";
+    END IF;
+
+    INSERT INTO "sales_by_month" ("month", "sales", "revenue_cents")
+    VALUES (COALESCE(to_char(COALESCE("sale"."date_sold", "sale"."timestamp"), 'YYYY-MM'), 'unknown'), "sign", "cents")
+    ON CONFLICT ("month") DO UPDATE SET "sales" = "sales_by_month"."sales" + EXCLUDED."sales",
+        "revenue_cents" = "sales_by_month"."revenue_cents" + EXCLUDED."revenue_cents";
+
+    INSERT INTO "sales_by_organization_type" ("organization_type", "sales", "revenue_cents")
+    VALUES ("sale_organization_type", "sign", "cents")
+    ON CONFLICT ("organization_type") DO UPDATE SET "sales" = "sales_by_organization_type"."sales" + EXCLUDED."sales",
+        "revenue_cents" = "sales_by_organization_type"."revenue_cents" + EXCLUDED."revenue_cents";
+
+    INSERT INTO "sales_by_collector" ("person_id", "sales", "revenue_cents")
+    VALUES ("sale"."person_id", "sign", "cents")
+    ON CONFLICT ("person_id") DO UPDATE SET "sales" = "sales_by_collector"."sales" + EXCLUDED."sales",
+        "revenue_cents" = "sales_by_collector"."revenue_cents" + EXCLUDED."revenue_cents";
+END;
+$$ LANGUAGE plpgsql;
+
+-- record who a sale counts for now and add it under them
+CREATE OR REPLACE FUNCTION "sales_rollup_record"("sale" "sold_artworks") RETURNS VOID AS $$
+DECLARE
+    "snapshot" "sales_rollup_snapshots";
+BEGIN
+    INSERT INTO "sales_rollup_snapshots" ("sale_id", "artist_id", "organization_type")
+    VALUES ("sale"."id", (SELECT "artist_id" FROM "artworks" WHERE "artworks"."id" = "sale"."artwork_id"),
+        COALESCE((SELECT "type" FROM "organizations" WHERE "organizations"."id" = "sale"."org_id"), 'none'))
+    ON CONFLICT ("sale_id") DO UPDATE SET "artist_id" = EXCLUDED."artist_id", "organization_type" = EXCLUDED."organization_type"
+    RETURNING * INTO "snapshot";
+    PERFORM "sales_rollup_apply"("sale", "snapshot"."artist_id", "snapshot"."organization_type", 1);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION "sales_rollup_changed"() RETURNS TRIGGER AS $$
+DECLARE
+    "snapshot" "sales_rollup_snapshots";
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- taken back from where it was counted, not from the artwork's or organization's current values
+        DELETE FROM "sales_rollup_snapshots" WHERE "sale_id" = OLD."id" RETURNING * INTO "snapshot";
+        IF FOUND THEN
+            PERFORM "sales_rollup_apply"(OLD, "snapshot"."artist_id", "snapshot"."organization_type", -1);
+        END IF;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM "sales_rollup_record"(NEW);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "sales_rollup" ON "sold_artworks";
+CREATE TRIGGER "sales_rollup"
+AFTER INSERT OR UPDATE OR DELETE ON "sold_artworks"
+FOR EACH ROW EXECUTE FUNCTION "sales_rollup_changed"();
+
+-- schema.sql's update_artwork_sold, which the SQLite baseline has and models.py can't express
+CREATE OR REPLACE FUNCTION "update_artwork_sold"() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE "artworks" SET "sold" = 1 WHERE "id" = NEW."artwork_id";
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "update_artwork_sold" ON "sold_artworks";
+CREATE TRIGGER "update_artwork_sold"
+AFTER INSERT ON "sold_artworks"
+FOR EACH ROW EXECUTE FUNCTION "update_artwork_sold"();
+
+-- fill them from the sales already recorded
+SELECT "sales_rollup_record"("sold_artworks") FROM "sold_artworks";
@@ -0,0 +1,76 @@
+-- PostgreSQL version of sqlite/007_change_log.sql: every insert, update and delete on the catalog tables
+-- gets the next "seq", for GET /sync.
+CREATE TABLE IF NOT EXISTS "change_log" (
+    "seq" BIGINT GENERATED ALWAYS AS IDENTITY,
+    "table_name" TEXT NOT NULL,
+    "row_id" INTEGER NOT NULL, -- id, or artwork_id for artworks_mediums
+    "related_id" INTEGER, -- medium_id for artworks_mediums
+    "operation" TEXT NOT NULL CHECK("operation" IN ('insert', 'update', 'delete')),
+    "changed_at" TIMESTAMP DEFAULT(now() AT TIME ZONE 'utc'),
+    PRIMARY KEY("seq")
+);
+
+CREATE OR REPLACE FUNCTION "change_log_record"() RETURNS TRIGGER AS $$
+DECLARE
+    "old_key" INTEGER[];
+    "new_key" INTEGER[];
+BEGIN
+    -- sequence values are handed out at insert but become visible at commit, so two concurrent writers
+    -- could commit out of order and a client at the higher seq would never see the lower one. Holding
+    -- this lock until commit keeps seq order and commit order the same; catalog writes are rare enough.
+    PERFORM pg_advisory_xact_lock(7408002);
+    IF TG_TABLE_NAME = 'artworks_mediums' THEN
+        IF TG_OP <> 'INSERT' THEN "old_key" := ARRAY[OLD."artwork_id", OLD."medium_id"]; END IF;
+        IF TG_OP <> 'DELETE' THEN "new_key" := ARRAY[NEW."artwork_id", NEW."medium_id"]; END IF;
+    ELSE
+        IF TG_OP <> 'INSERT' THEN "old_key" := ARRAY[OLD."id", NULL]; END IF;
+        IF TG_OP <> 'DELETE' THEN "new_key" := ARRAY[NEW."id", NULL]; END IF;
+    END IF;
+    IF TG_OP = 'UPDATE' AND "old_key" IS DISTINCT FROM "new_key" THEN
+        -- the key changed: the row is gone from under the old one and new under the other
+        INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+        VALUES (TG_TABLE_NAME, "old_key"[1], "old_key"[2], 'delete');
+        INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+        VALUES (TG_TABLE_NAME, "new_key"[1], "new_key"[2], 'insert');
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+        VALUES (TG_TABLE_NAME, "old_key"[1], "old_key"[2], 'delete');
+    ELSE
+        INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+        VALUES (TG_TABLE_NAME, "new_key"[1], "new_key"[2], lower(TG_OP));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "change_log" ON "artists";
+CREATE TRIGGER "change_log" AFTER INSERT OR UPDATE OR DELETE ON "artists"
+FOR EACH ROW EXECUTE FUNCTION "change_log_record"();
+
+DROP TRIGGER IF EXISTS "change_log" ON "departments";
+CREATE TRIGGER "change_log" AFTER INSERT OR UPDATE OR DELETE ON "departments"
+FOR EACH ROW EXECUTE FUNCTION "change_log_record"();
+
+DROP TRIGGER IF EXISTS "change_log" ON "series";
+CREATE TRIGGER "change_log" AFTER INSERT OR UPDATE OR DELETE ON "series"
+FOR EACH ROW EXECUTE FUNCTION "change_log_record"();
+
+DROP TRIGGER IF EXISTS "change_log" ON "mediums";
+CREATE TRIGGER "change_log" AFTER INSERT OR UPDATE OR DELETE ON "mediums"
+FOR EACH ROW EXECUTE FUNCTION "change_log_record"();
+
+DROP TRIGGER IF EXISTS "change_log" ON "artworks";
+CREATE TRIGGER "change_log" AFTER INSERT OR UPDATE OR DELETE ON "artworks"
+FOR EACH ROW EXECUTE FUNCTION "change_log_record"();
+
+DROP TRIGGER IF EXISTS "change_log" ON "artworks_mediums";
+CREATE TRIGGER "change_log" AFTER INSERT OR UPDATE OR DELETE ON "artworks_mediums"
+FOR EACH ROW EXECUTE FUNCTION "change_log_record"();
+
+-- everything already there counts as inserted, so /sync?since=0 is a full snapshot
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'artists', "id", NULL, 'insert' FROM "artists";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'departments', "id", NULL, 'insert' FROM "departments";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'series', "id", NULL, 'insert' FROM "series";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'mediums', "id", NULL, 'insert' FROM "mediums";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'artworks', "id", NULL, 'insert' FROM "artworks";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'artworks_mediums', "artwork_id", "medium_id", 'insert' FROM "artworks_mediums";
@@ -0,0 +1,2 @@
+-- PostgreSQL version of sqlite/008_title_index.sql; models.py never declared the broken one, so just add it.
+CREATE INDEX IF NOT EXISTS "titles" ON "artworks" ("title");
@@ -0,0 +1,8 @@
+-- PostgreSQL version of sqlite/009_image_fingerprints.sql
+CREATE TABLE IF NOT EXISTS "image_fingerprints" (
+    "source_url" TEXT NOT NULL,
+    "source_hash" TEXT NOT NULL,
+    "row" INTEGER NOT NULL UNIQUE,
+    "created_at" TIMESTAMP DEFAULT(now() AT TIME ZONE 'utc'),
+    PRIMARY KEY("source_url")
+);
@@ -0,0 +1,179 @@
+-- Turn art_list from a view into a real table, kept up to date row by row by triggers.
+-- Reads become a plain indexed scan; the joins and GROUP_CONCAT only run when something is written.
+
+DROP VIEW IF EXISTS "art_list";
+DROP VIEW IF EXISTS "mediums_by_artwork";
+
+-- group by id rather than title, two artworks with the same title were being merged
+CREATE VIEW "mediums_by_artwork" AS
+SELECT GROUP_CONCAT("mediums"."name") AS "mediums", "title", "artworks"."id"
+FROM "mediums"
+JOIN "artworks_mediums" ON "mediums"."id" = "artworks_mediums"."medium_id"
+JOIN "artworks" ON "artworks_mediums"."artwork_id" = "artworks"."id"
+GROUP BY "artworks"."id";
+
+-- how one art_list row is built, the triggers below always go through this with WHERE "id" = ...
+CREATE VIEW "art_list_source" AS
+SELECT "artworks"."id", first_name || ' ' || last_name AS "name", "artworks"."title", "size", "year",
+    (SELECT GROUP_CONCAT("mediums"."name") FROM "artworks_mediums"
+        JOIN "mediums" ON "mediums"."id" = "artworks_mediums"."medium_id"
+        WHERE "artworks_mediums"."artwork_id" = "artworks"."id") AS "mediums",
+    "artworks"."image_url", "artworks"."description",
+    "series"."name" AS "series", "departments"."name" AS "department", "price", "sold",
+    "artworks"."artist_id", "artists"."last_name", "artworks"."series" AS "series_id", "artworks"."department" AS "department_id"
+FROM "artworks"
+JOIN "artists" ON "artists"."id" = "artworks"."artist_id"
+LEFT JOIN "series" ON "series"."id" = "artworks"."series"
+LEFT JOIN "departments" ON "departments"."id" = "artworks"."department";
+
+CREATE TABLE IF NOT EXISTS "art_list" (
+    "id" INTEGER,
+    "name" TEXT,
+    "title" TEXT NOT NULL,
+    "size" TEXT,
+    "year" INTEGER,
+    "mediums" TEXT,
+    "image_url" TEXT,
+    "description" TEXT,
+    "series" TEXT,
+    "department" TEXT,
+    "price" DECIMAL,
+    "sold" INTEGER,
+    -- not part of the public row, used to keep the table in sync and to page/filter
+    "artist_id" INTEGER NOT NULL,
+    "last_name" TEXT,
+    "series_id" INTEGER,
+    "department_id" INTEGER,
+    PRIMARY KEY("id")
+);
+
+-- artworks: rebuild the one row
+CREATE TRIGGER IF NOT EXISTS "art_list_artwork_insert"
+AFTER INSERT ON "artworks"
+FOR EACH ROW
+BEGIN
+    INSERT OR REPLACE INTO "art_list" SELECT * FROM "art_list_source" WHERE "id" = NEW."id";
+END;
+
+CREATE TRIGGER IF NOT EXISTS "art_list_artwork_update"
+AFTER UPDATE ON "artworks"
+FOR EACH ROW
+BEGIN
+    DELETE FROM "art_list" WHERE "id" = OLD."id";
+    INSERT OR REPLACE INTO "art_list" SELECT * FROM "art_list_source" WHERE "id" = NEW."id";
+END;
+
+CREATE TRIGGER IF NOT EXISTS "art_list_artwork_delete"
+AFTER DELETE ON "artworks"
+FOR EACH ROW
+BEGIN
+    DELETE FROM "art_list" WHERE "id" = OLD."id";
+END;
+
+-- artworks_mediums: only the mediums column changes
+CREATE TRIGGER IF NOT EXISTS "art_list_artwork_medium_insert"
+AFTER INSERT ON "artworks_mediums"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "mediums" = (SELECT "mediums" FROM "art_list_source" WHERE "id" = NEW."artwork_id")
+    WHERE "id" = NEW."artwork_id";
+END;
+
+CREATE TRIGGER IF NOT EXISTS "art_list_artwork_medium_update"
+AFTER UPDATE ON "artworks_mediums"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "mediums" = (SELECT "mediums" FROM "art_list_source" WHERE "id" = "art_list"."id")
+    WHERE "id" IN (OLD."artwork_id", NEW."artwork_id");
+END;
+
+CREATE TRIGGER IF NOT EXISTS "art_list_artwork_medium_delete"
+AFTER DELETE ON "artworks_mediums"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "mediums" = (SELECT "mediums" FROM "art_list_source" WHERE "id" = OLD."artwork_id")
+    WHERE "id" = OLD."artwork_id";
+END;
+
+-- renaming or deleting a medium touches every artwork made with it
+CREATE TRIGGER IF NOT EXISTS "art_list_medium_rename"
+AFTER UPDATE OF "name" ON "mediums"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "mediums" = (SELECT "mediums" FROM "art_list_source" WHERE "id" = "art_list"."id")
+    WHERE "id" IN (SELECT "artwork_id" FROM "artworks_mediums" WHERE "medium_id" = NEW."id");
+END;
+
+CREATE TRIGGER IF NOT EXISTS "art_list_medium_delete"
+AFTER DELETE ON "mediums"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "mediums" = (SELECT "mediums" FROM "art_list_source" WHERE "id" = "art_list"."id")
+    WHERE "id" IN (SELECT "artwork_id" FROM "artworks_mediums" WHERE "medium_id" = OLD."id");
+END;
+
+-- series, departments and artists: copy the changed name onto their artworks
+CREATE TRIGGER IF NOT EXISTS "art_list_series_update"
+AFTER UPDATE OF "name" ON "series"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "series" = NEW."name" WHERE "series_id" = NEW."id";
+END;
+
+CREATE TRIGGER IF NOT EXISTS "art_list_series_delete"
+AFTER DELETE ON "series"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "series" = NULL WHERE "series_id" = OLD."id";
+END;
+
+CREATE TRIGGER IF NOT EXISTS "art_list_department_update"
+AFTER UPDATE OF "name" ON "departments"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "department" = NEW."name" WHERE "department_id" = NEW."id";
+END;
+
+CREATE TRIGGER IF NOT EXISTS "art_list_department_delete"
+AFTER DELETE ON "departments"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "department" = NULL WHERE "department_id" = OLD."id";
+END;
+
+CREATE TRIGGER IF NOT EXISTS "art_list_artist_update"
+AFTER UPDATE OF "first_name", "last_name" ON "artists"
+FOR EACH ROW
+BEGIN
+    UPDATE "art_list" SET "name" = NEW."first_name" || ' ' || NEW."last_name", "last_name" = NEW."last_name"
+    WHERE "artist_id" = NEW."id";
+END;
+
+-- art_list inner joins artists, an artwork without its artist drops out
+CREATE TRIGGER IF NOT EXISTS "art_list_artist_delete"
+AFTER DELETE ON "artists"
+FOR EACH ROW
+BEGIN
+    DELETE FROM "art_list" WHERE "artist_id" = OLD."id";
+END;
+
+-- fill it from what's already there
+INSERT OR REPLACE INTO "art_list" SELECT * FROM "art_list_source";
+
+-- paging and filters now run against art_list, these move over from artworks/artists
+DROP INDEX IF EXISTS "artist_last_names";
+DROP INDEX IF EXISTS "department_ids";
+DROP INDEX IF EXISTS "series_ids";
+DROP INDEX IF EXISTS "sold_status";
+DROP INDEX IF EXISTS "years";
+DROP INDEX IF EXISTS "prices";
+
+CREATE INDEX IF NOT EXISTS "art_list_order" ON "art_list" ("last_name", "id");
+CREATE INDEX IF NOT EXISTS "art_list_artist_ids" ON "art_list" ("artist_id");
+CREATE INDEX IF NOT EXISTS "art_list_series_ids" ON "art_list" ("series_id");
+CREATE INDEX IF NOT EXISTS "art_list_department_ids" ON "art_list" ("department_id");
+CREATE INDEX IF NOT EXISTS "art_list_series" ON "art_list" ("series");
+CREATE INDEX IF NOT EXISTS "art_list_departments" ON "art_list" ("department");
+CREATE INDEX IF NOT EXISTS "art_list_sold" ON "art_list" ("sold");
+CREATE INDEX IF NOT EXISTS "art_list_years" ON "art_list" ("year");
+CREATE INDEX IF NOT EXISTS "art_list_prices" ON "art_list" ("price");
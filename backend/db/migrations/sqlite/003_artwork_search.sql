@@ -0,0 +1,44 @@
+-- Full-text search over artworks for GET /artworks/search, using SQLite's FTS5.
+-- rowid is the artwork id. remove_diacritics lets "croises" find "Croisés", and the prefix
+-- index keeps "gou*" style typeahead queries from scanning the whole term list.
+CREATE VIRTUAL TABLE IF NOT EXISTS "artworks_search" USING fts5(
+    "title", "description", "keywords", "artist", "mediums", "series",
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+-- art_list already has the artist, mediums and series names filled in, and every change to those
+-- (or to the artwork itself) rewrites its art_list row, so following art_list keeps search in sync.
+CREATE TRIGGER IF NOT EXISTS "artworks_search_insert"
+AFTER INSERT ON "art_list"
+FOR EACH ROW
+BEGIN
+    DELETE FROM "artworks_search" WHERE "rowid" = NEW."id";
+    INSERT INTO "artworks_search" ("rowid", "title", "description", "keywords", "artist", "mediums", "series")
+    VALUES (NEW."id", NEW."title", NEW."description", (SELECT "keywords" FROM "artworks" WHERE "id" = NEW."id"),
+        NEW."name", NEW."mediums", NEW."series");
+END;
+
+CREATE TRIGGER IF NOT EXISTS "artworks_search_update"
+AFTER UPDATE ON "art_list"
+FOR EACH ROW
+BEGIN
+    DELETE FROM "artworks_search" WHERE "rowid" = OLD."id";
+    INSERT INTO "artworks_search" ("rowid", "title", "description", "keywords", "artist", "mediums", "series")
+    VALUES (NEW."id", NEW."title", NEW."description", (SELECT "keywords" FROM "artworks" WHERE "id" = NEW."id"),
+        NEW."name", NEW."mediums", NEW."series");
+END;
+
+CREATE TRIGGER IF NOT EXISTS "artworks_search_delete"
+AFTER DELETE ON "art_list"
+FOR EACH ROW
+BEGIN
+    DELETE FROM "artworks_search" WHERE "rowid" = OLD."id";
+END;
+
+-- fill it from what's already there
+INSERT INTO "artworks_search" ("rowid", "title", "description", "keywords", "artist", "mediums", "series")
+SELECT "art_list"."id", "art_list"."title", "art_list"."description", "artworks"."keywords",
+    "art_list"."name", "art_list"."mediums", "art_list"."series"
+FROM "art_list"
+JOIN "artworks" ON "artworks"."id" = "art_list"."id";
@@ -0,0 +1,53 @@
+-- A change counter per catalog, bumped by triggers on every write. The API turns it into an ETag,
+-- so checking whether a client's copy is still current is one primary key lookup.
+CREATE TABLE IF NOT EXISTS "catalog_versions" (
+    "name" TEXT,
+    "version" INTEGER NOT NULL DEFAULT(0),
+    "updated_at" TIMESTAMP DEFAULT(CURRENT_TIMESTAMP),
+    PRIMARY KEY("name")
+);
+
+INSERT OR IGNORE INTO "catalog_versions" ("name") VALUES ('artworks'), ('artists');
+
+-- every change to an artwork, its mediums, series, department or artist rewrites its art_list row
+CREATE TRIGGER IF NOT EXISTS "catalog_version_art_list_insert"
+AFTER INSERT ON "art_list"
+FOR EACH ROW
+BEGIN
+    UPDATE "catalog_versions" SET "version" = "version" + 1, "updated_at" = CURRENT_TIMESTAMP WHERE "name" = 'artworks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS "catalog_version_art_list_update"
+AFTER UPDATE ON "art_list"
+FOR EACH ROW
+BEGIN
+    UPDATE "catalog_versions" SET "version" = "version" + 1, "updated_at" = CURRENT_TIMESTAMP WHERE "name" = 'artworks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS "catalog_version_art_list_delete"
+AFTER DELETE ON "art_list"
+FOR EACH ROW
+BEGIN
+    UPDATE "catalog_versions" SET "version" = "version" + 1, "updated_at" = CURRENT_TIMESTAMP WHERE "name" = 'artworks';
+END;
+
+CREATE TRIGGER IF NOT EXISTS "catalog_version_artist_insert"
+AFTER INSERT ON "artists"
+FOR EACH ROW
+BEGIN
+    UPDATE "catalog_versions" SET "version" = "version" + 1, "updated_at" = CURRENT_TIMESTAMP WHERE "name" = 'artists';
+END;
+
+CREATE TRIGGER IF NOT EXISTS "catalog_version_artist_update"
+AFTER UPDATE ON "artists"
+FOR EACH ROW
+BEGIN
+    UPDATE "catalog_versions" SET "version" = "version" + 1, "updated_at" = CURRENT_TIMESTAMP WHERE "name" = 'artists';
+END;
+
+CREATE TRIGGER IF NOT EXISTS "catalog_version_artist_delete"
+AFTER DELETE ON "artists"
+FOR EACH ROW
+BEGIN
+    UPDATE "catalog_versions" SET "version" = "version" + 1, "updated_at" = CURRENT_TIMESTAMP WHERE "name" = 'artists';
+END;
@@ -0,0 +1,132 @@
+-- Sales rollups for the /analytics endpoints: count and revenue per artist, month, organization type and
+-- collector, kept current by triggers on sold_artworks, so a report reads a few rows instead of
+-- aggregating the whole sales history. Revenue is whole cents, adding and subtracting stays exact.
+-- A sale counts for the artist and organization type it had when it was recorded (or last edited): both
+-- are kept in sales_rollup_snapshots, and a later update or delete takes the sale back from those, so
+-- reassigning an artwork or retyping an organization doesn't move sales already counted.
+
+CREATE TABLE IF NOT EXISTS "sales_by_artist" (
+    "artist_id" INTEGER,
+    "sales" INTEGER NOT NULL DEFAULT(0),
+    "revenue_cents" INTEGER NOT NULL DEFAULT(0),
+    PRIMARY KEY("artist_id")
+);
+
+CREATE TABLE IF NOT EXISTS "sales_by_month" (
+    "month" TEXT,
+    "sales" INTEGER NOT NULL DEFAULT(0),
+    "revenue_cents" INTEGER NOT NULL DEFAULT(0),
+    PRIMARY KEY("month")
+);
+
+CREATE TABLE IF NOT EXISTS "sales_by_organization_type" (
+    "organization_type" TEXT,
+    "sales" INTEGER NOT NULL DEFAULT(0),
+    "revenue_cents" INTEGER NOT NULL DEFAULT(0),
+    PRIMARY KEY("organization_type")
+);
+
+CREATE TABLE IF NOT EXISTS "sales_by_collector" (
+    "person_id" INTEGER,
+    "sales" INTEGER NOT NULL DEFAULT(0),
+    "revenue_cents" INTEGER NOT NULL DEFAULT(0),
+    PRIMARY KEY("person_id")
+);
+
+-- one row per sale: the artist and organization type its rollup rows were counted under
+CREATE TABLE IF NOT EXISTS "sales_rollup_snapshots" (
+    "sale_id" INTEGER,
+    "artist_id" INTEGER,
+    "organization_type" TEXT NOT NULL,
+    PRIMARY KEY("sale_id")
+);
+
+-- top-N by revenue or count is an index walk
+CREATE INDEX IF NOT EXISTS "sales_by_artist_revenue" ON "sales_by_artist" ("revenue_cents");
+CREATE INDEX IF NOT EXISTS "sales_by_artist_sales" ON "sales_by_artist" ("sales");
+CREATE INDEX IF NOT EXISTS "sales_by_collector_revenue" ON "sales_by_collector" ("revenue_cents");
+CREATE INDEX IF NOT EXISTS "sales_by_collector_sales" ON "sales_by_collector" ("sales");
+
+CREATE TRIGGER IF NOT EXISTS "sales_rollup_insert"
+AFTER INSERT ON "sold_artworks"
+FOR EACH ROW
+BEGIN
+    INSERT OR REPLACE INTO "sales_rollup_snapshots" ("sale_id", "artist_id", "organization_type")
+    VALUES (NEW."id", (SELECT "artist_id" FROM "artworks" WHERE "id" = NEW."artwork_id"), COALESCE((SELECT "type" FROM "organizations" WHERE "id" = NEW."org_id"), 'none'));
+    INSERT INTO "sales_by_artist" ("artist_id", "sales", "revenue_cents") VALUES ((SELECT "artist_id" FROM "sales_rollup_snapshots" WHERE "sale_id" = NEW."id"), 1, CAST(ROUND(COALESCE(NEW."price", 0) * 100) AS INTEGER))
+    ON CONFLICT ("artist_id") DO UPDATE SET "sales" = "sales" + 1, "revenue_cents" = "revenue_cents" + excluded."revenue_cents";
+    INSERT INTO "sales_by_month" ("month", "sales", "revenue_cents") VALUES (COALESCE(strftime('%Y-%m', NEW."date_sold"), strftime('%Y-%m', NEW."timestamp"), 'unknown'), 1, CAST(ROUND(COALESCE(NEW."price", 0) * 100) AS INTEGER))
+    ON CONFLICT ("month") DO UPDATE SET "sales" = "sales" + 1, "revenue_cents" = "revenue_cents" + excluded."revenue_cents";
+    INSERT INTO "sales_by_organization_type" ("organization_type", "sales", "revenue_cents") VALUES ((SELECT "organization_type" FROM "sales_rollup_snapshots" WHERE "sale_id" = NEW."id"), 1, CAST(ROUND(COALESCE(NEW."price", 0) * 100) AS INTEGER))
+    ON CONFLICT ("organization_type") DO UPDATE SET "sales" = "sales" + 1, "revenue_cents" = "revenue_cents" + excluded."revenue_cents";
+    INSERT INTO "sales_by_collector" ("person_id", "sales", "revenue_cents") VALUES (NEW."person_id", 1, CAST(ROUND(COALESCE(NEW."price", 0) * 100) AS INTEGER))
+    ON CONFLICT ("person_id") DO UPDATE SET "sales" = "sales" + 1, "revenue_cents" = "revenue_cents" + excluded."revenue_cents";
+END;
+
+-- an edited sale is taken back as it was counted and recorded again as it is now
+CREATE TRIGGER IF NOT EXISTS "sales_rollup_update"
+AFTER UPDATE ON "sold_artworks"
+FOR EACH ROW
+BEGIN
+    UPDATE "sales_by_artist" SET "sales" = "sales" - 1, "revenue_cents" = "revenue_cents" - CAST(ROUND(COALESCE(OLD."price", 0) * 100) AS INTEGER)
+    WHERE "artist_id" = (SELECT "artist_id" FROM "sales_rollup_snapshots" WHERE "sale_id" = OLD."id");
+    UPDATE "sales_by_month" SET "sales" = "sales" - 1, "revenue_cents" = "revenue_cents" - CAST(ROUND(COALESCE(OLD."price", 0) * 100) AS INTEGER)
+    WHERE "month" = COALESCE(strftime('%Y-%m', OLD."date_sold"), strftime('%Y-%m', OLD."timestamp"), 'unknown');
+    UPDATE "sales_by_organization_type" SET "sales" = "sales" - 1, "revenue_cents" = "revenue_cents" - CAST(ROUND(COALESCE(OLD."price", 0) * 100) AS INTEGER)
+    WHERE "organization_type" = (SELECT "organization_type" FROM "sales_rollup_snapshots" WHERE "sale_id" = OLD."id");
+    UPDATE "sales_by_collector" SET "sales" = "sales" - 1, "revenue_cents" = "revenue_cents" - CAST(ROUND(COALESCE(OLD."price", 0) * 100) AS INTEGER)
+    WHERE "person_id" = OLD."person_id";
+    DELETE FROM "sales_rollup_snapshots" WHERE "sale_id" = OLD."id";
+    INSERT OR REPLACE INTO "sales_rollup_snapshots" ("sale_id", "artist_id", "organization_type")
+    VALUES (NEW."id", (SELECT "artist_id" FROM "artworks" WHERE "id" = NEW."artwork_id"), COALESCE((SELECT "type" FROM "organizations" WHERE "id" = NEW."org_id"), 'none'));
+    INSERT INTO "sales_by_artist" ("artist_id", "sales", "revenue_cents") VALUES ((SELECT "artist_id" FROM "sales_rollup_snapshots" WHERE "sale_id" = NEW."id"), 1, CAST(ROUND(COALESCE(NEW."price", 0) * 100) AS INTEGER))
+    ON CONFLICT ("artist_id") DO UPDATE SET "sales" = "sales" + 1, "revenue_cents" = "revenue_cents" + excluded."revenue_cents";
+    INSERT INTO "sales_by_month" ("month", "sales", "revenue_cents") VALUES (COALESCE(strftime('%Y-%m', NEW."date_sold"), strftime('%Y-%m', NEW."timestamp"), 'unknown'), 1, CAST(ROUND(COALESCE(NEW."price", 0) * 100) AS INTEGER))
+    ON CONFLICT ("month") DO UPDATE SET "sales" = "sales" + 1, "revenue_cents" = "revenue_cents" + excluded."revenue_cents";
+    INSERT INTO "sales_by_organization_type" ("organization_type", "sales", "revenue_cents") VALUES ((SELECT "organization_type" FROM "sales_rollup_snapshots" WHERE "sale_id" = NEW."id"), 1, CAST(ROUND(COALESCE(NEW."price", 0) * 100) AS INTEGER))
+    ON CONFLICT ("organization_type") DO UPDATE SET "sales" = "sales" + 1, "revenue_cents" = "revenue_cents" + excluded."revenue_cents";
+    INSERT INTO "sales_by_collector" ("person_id", "sales", "revenue_cents") VALUES (NEW."person_id", 1, CAST(ROUND(COALESCE(NEW."price", 0) * 100) AS INTEGER))
+    ON CONFLICT ("person_id") DO UPDATE SET "sales" = "sales" + 1, "revenue_cents" = "revenue_cents" + excluded."revenue_cents";
+END;
+
+CREATE TRIGGER IF NOT EXISTS "sales_rollup_delete"
+AFTER DELETE ON "sold_artworks"
+FOR EACH ROW
+BEGIN
+    UPDATE "sales_by_artist" SET "sales" = "sales" - 1, "revenue_cents" = "revenue_cents" - CAST(ROUND(COALESCE(OLD."price", 0) * 100) AS INTEGER)
+    WHERE "artist_id" = (SELECT "artist_id" FROM "sales_rollup_snapshots" WHERE "sale_id" = OLD."id");
+    UPDATE "sales_by_month" SET "sales" = "sales" - 1, "revenue_cents" = "revenue_cents" - CAST(ROUND(COALESCE(OLD."price", 0) * 100) AS INTEGER)
+    WHERE "month" = COALESCE(strftime('%Y-%m', OLD."date_sold"), strftime('%Y-%m', OLD."timestamp"), 'unknown');
+    UPDATE "sales_by_organization_type" SET "sales" = "sales" - 1, "revenue_cents" = "revenue_cents" - CAST(ROUND(COALESCE(OLD."price", 0) * 100) AS INTEGER)
+    WHERE "organization_type" = (SELECT "organization_type" FROM "sales_rollup_snapshots" WHERE "sale_id" = OLD."id");
+    UPDATE "sales_by_collector" SET "sales" = "sales" - 1, "revenue_cents" = "revenue_cents" - CAST(ROUND(COALESCE(OLD."price", 0) * 100) AS INTEGER)
+    WHERE "person_id" = OLD."person_id";
+    DELETE FROM "sales_rollup_snapshots" WHERE "sale_id" = OLD."id";
+END;
+
+-- fill them from the sales already recorded
+
+INSERT OR REPLACE INTO "sales_rollup_snapshots" ("sale_id", "artist_id", "organization_type")
+SELECT "sold_artworks"."id", (SELECT "artist_id" FROM "artworks" WHERE "id" = "sold_artworks"."artwork_id"),
+    COALESCE((SELECT "type" FROM "organizations" WHERE "id" = "sold_artworks"."org_id"), 'none')
+FROM "sold_artworks";
+
+INSERT OR REPLACE INTO "sales_by_artist" ("artist_id", "sales", "revenue_cents")
+SELECT (SELECT "artist_id" FROM "sales_rollup_snapshots" WHERE "sale_id" = "sold_artworks"."id"), COUNT(*), SUM(CAST(ROUND(COALESCE("sold_artworks"."price", 0) * 100) AS INTEGER))
+FROM "sold_artworks"
+GROUP BY 1;
+
+INSERT OR REPLACE INTO "sales_by_month" ("month", "sales", "revenue_cents")
+SELECT COALESCE(strftime('%Y-%m', "sold_artworks"."date_sold"), strftime('%Y-%m', "sold_artworks"."timestamp"), 'unknown'), COUNT(*), SUM(CAST(ROUND(COALESCE("sold_artworks"."price", 0) * 100) AS INTEGER))
+FROM "sold_artworks"
+GROUP BY 1;
+
+INSERT OR REPLACE INTO "sales_by_organization_type" ("organization_type", "sales", "revenue_cents")
+SELECT (SELECT "organization_type" FROM "sales_rollup_snapshots" WHERE "sale_id" = "sold_artworks"."id"), COUNT(*), SUM(CAST(ROUND(COALESCE("sold_artworks"."price", 0) * 100) AS INTEGER))
+FROM "sold_artworks"
+GROUP BY 1;
+
+INSERT OR REPLACE INTO "sales_by_collector" ("person_id", "sales", "revenue_cents")
+SELECT "sold_artworks"."person_id", COUNT(*), SUM(CAST(ROUND(COALESCE("sold_artworks"."price", 0) * 100) AS INTEGER))
+FROM "sold_artworks"
+GROUP BY 1;
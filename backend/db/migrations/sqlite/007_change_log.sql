@@ -0,0 +1,167 @@
+-- A change log for GET /sync: every insert, update and delete on the catalog tables gets the next "seq",
+-- so a client that remembers the last seq it saw can ask for just what changed since.
+-- AUTOINCREMENT so a seq is never handed out twice, even if the newest entries were ever deleted.
+-- An update that changes a row's key is logged as a delete of the old key and an insert of the new one,
+-- otherwise a client replaying the log would keep the row under its old key as well.
+CREATE TABLE IF NOT EXISTS "change_log" (
+    "seq" INTEGER PRIMARY KEY AUTOINCREMENT,
+    "table_name" TEXT NOT NULL,
+    "row_id" INTEGER NOT NULL, -- id, or artwork_id for artworks_mediums
+    "related_id" INTEGER, -- medium_id for artworks_mediums
+    "operation" TEXT NOT NULL CHECK("operation" IN ('insert', 'update', 'delete')),
+    "changed_at" TIMESTAMP DEFAULT(CURRENT_TIMESTAMP)
+);
+
+CREATE TRIGGER IF NOT EXISTS "change_log_artists_insert"
+AFTER INSERT ON "artists"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('artists', NEW."id", NULL, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_artists_update"
+AFTER UPDATE ON "artists"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    SELECT 'artists', OLD."id", NULL, 'delete' WHERE OLD."id" IS NOT NEW."id";
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    VALUES ('artists', NEW."id", NULL, CASE WHEN OLD."id" IS NEW."id" THEN 'update' ELSE 'insert' END);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_artists_delete"
+AFTER DELETE ON "artists"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('artists', OLD."id", NULL, 'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_departments_insert"
+AFTER INSERT ON "departments"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('departments', NEW."id", NULL, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_departments_update"
+AFTER UPDATE ON "departments"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    SELECT 'departments', OLD."id", NULL, 'delete' WHERE OLD."id" IS NOT NEW."id";
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    VALUES ('departments', NEW."id", NULL, CASE WHEN OLD."id" IS NEW."id" THEN 'update' ELSE 'insert' END);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_departments_delete"
+AFTER DELETE ON "departments"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('departments', OLD."id", NULL, 'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_series_insert"
+AFTER INSERT ON "series"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('series', NEW."id", NULL, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_series_update"
+AFTER UPDATE ON "series"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    SELECT 'series', OLD."id", NULL, 'delete' WHERE OLD."id" IS NOT NEW."id";
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    VALUES ('series', NEW."id", NULL, CASE WHEN OLD."id" IS NEW."id" THEN 'update' ELSE 'insert' END);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_series_delete"
+AFTER DELETE ON "series"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('series', OLD."id", NULL, 'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_mediums_insert"
+AFTER INSERT ON "mediums"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('mediums', NEW."id", NULL, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_mediums_update"
+AFTER UPDATE ON "mediums"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    SELECT 'mediums', OLD."id", NULL, 'delete' WHERE OLD."id" IS NOT NEW."id";
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    VALUES ('mediums', NEW."id", NULL, CASE WHEN OLD."id" IS NEW."id" THEN 'update' ELSE 'insert' END);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_mediums_delete"
+AFTER DELETE ON "mediums"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('mediums', OLD."id", NULL, 'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_artworks_insert"
+AFTER INSERT ON "artworks"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('artworks', NEW."id", NULL, 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_artworks_update"
+AFTER UPDATE ON "artworks"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    SELECT 'artworks', OLD."id", NULL, 'delete' WHERE OLD."id" IS NOT NEW."id";
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    VALUES ('artworks', NEW."id", NULL, CASE WHEN OLD."id" IS NEW."id" THEN 'update' ELSE 'insert' END);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_artworks_delete"
+AFTER DELETE ON "artworks"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('artworks', OLD."id", NULL, 'delete');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_artworks_mediums_insert"
+AFTER INSERT ON "artworks_mediums"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('artworks_mediums', NEW."artwork_id", NEW."medium_id", 'insert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_artworks_mediums_update"
+AFTER UPDATE ON "artworks_mediums"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    SELECT 'artworks_mediums', OLD."artwork_id", OLD."medium_id", 'delete'
+    WHERE OLD."artwork_id" IS NOT NEW."artwork_id" OR OLD."medium_id" IS NOT NEW."medium_id";
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation")
+    VALUES ('artworks_mediums', NEW."artwork_id", NEW."medium_id",
+        CASE WHEN OLD."artwork_id" IS NEW."artwork_id" AND OLD."medium_id" IS NEW."medium_id" THEN 'update' ELSE 'insert' END);
+END;
+
+CREATE TRIGGER IF NOT EXISTS "change_log_artworks_mediums_delete"
+AFTER DELETE ON "artworks_mediums"
+FOR EACH ROW
+BEGIN
+    INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") VALUES ('artworks_mediums', OLD."artwork_id", OLD."medium_id", 'delete');
+END;
+
+-- everything already there counts as inserted, so /sync?since=0 is a full snapshot
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'artists', "id", NULL, 'insert' FROM "artists";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'departments', "id", NULL, 'insert' FROM "departments";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'series', "id", NULL, 'insert' FROM "series";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'mediums', "id", NULL, 'insert' FROM "mediums";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'artworks', "id", NULL, 'insert' FROM "artworks";
+INSERT INTO "change_log" ("table_name", "row_id", "related_id", "operation") SELECT 'artworks_mediums', "artwork_id", "medium_id", 'insert' FROM "artworks_mediums";
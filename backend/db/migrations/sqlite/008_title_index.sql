@@ -0,0 +1,4 @@
+-- schema.sql declared "titles" on a column that doesn't exist, which SQLite took as the string 'titles':
+-- an index on a constant. Put it on "title", where lookups by name need it.
+DROP INDEX IF EXISTS "titles";
+CREATE INDEX "titles" ON "artworks" ("title");
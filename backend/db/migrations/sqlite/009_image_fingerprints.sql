@@ -0,0 +1,9 @@
+-- Which row of the fingerprint matrices (db/fingerprints/*.npy, written by util/image_fingerprints.py)
+-- holds each artwork image. Keyed on the image's URL, like image_derivatives.
+CREATE TABLE IF NOT EXISTS "image_fingerprints" (
+    "source_url" TEXT NOT NULL,
+    "source_hash" TEXT NOT NULL, -- sha256 of the original, a fingerprint is only recomputed when this changes
+    "row" INTEGER NOT NULL UNIQUE, -- rows are handed out in order and never reused
+    "created_at" TIMESTAMP DEFAULT(CURRENT_TIMESTAMP),
+    PRIMARY KEY("source_url")
+);
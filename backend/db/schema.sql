@@ -178,4 +178,8 @@ ORDER BY "artists"."last_name" ASC, "artworks"."id" ASC
 CREATE INDEX "artist_ids" on "artworks" ("artist_id");
 
 -- helps when searching for titles of Artworks, often used when adding mediums to an artwork, or looking for a painting by name.
-CREATE INDEX "titles" on "artworks" ("titles");
+CREATE INDEX "titles" on "artworks" ("title");
+
+-- Everything after this baseline (new indexes, the art_list table and its triggers, ...) lives in db/migrations/sqlite/.
+-- On PostgreSQL the tables come from models.py and the rest from db/migrations/postgresql/.
+-- The API applies any migration a database hasn't seen yet on startup, see app/migrations.py.
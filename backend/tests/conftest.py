@@ -0,0 +1,46 @@
+import sqlite3
+import pytest
+from sqlalchemy import create_engine
+from app.migrations import MIGRATIONS_DIR, apply_migrations
+
+SCHEMA = MIGRATIONS_DIR.parent / "schema.sql"
+
+# a small catalog already in the database when the migrations run, so their backfills get checked too
+SEED = """
+INSERT INTO "artists" ("id", "first_name", "last_name", "short_bio") VALUES
+    (1, 'Berthe', 'Morisot', 'Painter'),
+    (2, 'Gustave', 'Caillebotte', 'Painter and collector');
+INSERT INTO "departments" ("id", "name") VALUES (1, 'Paintings'), (2, 'Works on paper');
+INSERT INTO "series" ("id", "artist_id", "name") VALUES (1, 1, 'Harbours'), (2, 2, 'Rooftops');
+INSERT INTO "mediums" ("id", "name") VALUES (1, 'oil'), (2, 'canvas'), (3, 'watercolour');
+INSERT INTO "artworks" ("id", "artist_id", "title", "size", "year", "description", "keywords", "department", "series", "price") VALUES
+    (1, 1, 'The Harbour at Lorient', '43 x 73 cm', 1869, 'Boats at rest', 'harbour boats', 1, 1, 1200.50),
+    (2, 2, 'Rooftops in the Snow', '64 x 82 cm', 1878, 'Paris under snow', 'winter roofs', 1, 2, 900),
+    (3, 2, 'Sketch of a Bridge', '20 x 30 cm', 1876, NULL, NULL, 2, NULL, NULL);
+INSERT INTO "artworks_mediums" ("artwork_id", "medium_id") VALUES (1, 1), (1, 2), (2, 1), (3, 3);
+INSERT INTO "organizations" ("id", "name", "city", "state", "type") VALUES
+    (1, 'Harbour Museum', 'Boston', 'MA', 'museum'),
+    (2, 'Corner Gallery', 'Portland', 'ME', 'gallery');
+INSERT INTO "persons" ("id", "first_name", "last_name", "email", "org", "type") VALUES
+    (1, 'Ada', 'Collector', 'ada@example.com', 1, 'collector'),
+    (2, 'Ben', 'Buyer', 'ben@example.com', NULL, 'client');
+INSERT INTO "sold_artworks" ("id", "artwork_id", "person_id", "org_id", "price", "date_sold") VALUES
+    (1, 2, 1, 1, 900, '2024-03-14');
+"""
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh database: schema.sql, the seed catalog, then every SQLite migration, as an autocommit connection."""
+    path = tmp_path / "artbase.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA.read_text())
+    conn.executescript(SEED)
+    conn.close()
+
+    engine = create_engine(f"sqlite:///{path}")
+    apply_migrations(engine)
+    engine.dispose()
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    yield conn
+    conn.close()
@@ -0,0 +1,51 @@
+def rows(conn, table):
+    """Every row of art_list or art_list_source by id, mediums sorted (GROUP_CONCAT's order isn't fixed)."""
+    cursor = conn.execute(f'SELECT * FROM "{table}" ORDER BY "id"')
+    columns = [column[0] for column in cursor.description]
+    result = []
+    for row in cursor.fetchall():
+        row = dict(zip(columns, row))
+        row["mediums"] = sorted(row["mediums"].split(",")) if row["mediums"] else []
+        result.append(row)
+    return result
+
+def assert_in_sync(conn):
+    assert rows(conn, "art_list") == rows(conn, "art_list_source")
+
+def test_backfill(db):
+    assert_in_sync(db)
+    assert [row["id"] for row in rows(db, "art_list")] == [1, 2, 3]
+
+def test_artwork_insert_update_delete(db):
+    db.execute("""
+        INSERT INTO "artworks" ("id", "artist_id", "title", "size", "department", "series", "price")
+        VALUES (4, 1, 'Summer Day', '45 x 75 cm', 1, 1, 300)
+    """)
+    db.execute('INSERT INTO "artworks_mediums" ("artwork_id", "medium_id") VALUES (4, 1), (4, 3)')
+    assert_in_sync(db)
+
+    db.execute("""UPDATE "artworks" SET "title" = 'A Summer''s Day', "artist_id" = 2, "series" = NULL, "price" = 350 WHERE "id" = 4""")
+    db.execute('DELETE FROM "artworks_mediums" WHERE "artwork_id" = 4 AND "medium_id" = 3')
+    db.execute('UPDATE "artworks_mediums" SET "medium_id" = 2 WHERE "artwork_id" = 4 AND "medium_id" = 1')
+    assert_in_sync(db)
+
+    db.execute('DELETE FROM "artworks" WHERE "id" = 4')
+    assert_in_sync(db)
+    assert 4 not in [row["id"] for row in rows(db, "art_list")]
+
+def test_names_follow_artists_series_departments_and_mediums(db):
+    db.execute("""UPDATE "artists" SET "first_name" = 'B.', "last_name" = 'Morisot-Manet' WHERE "id" = 1""")
+    db.execute("""UPDATE "series" SET "name" = 'Ports' WHERE "id" = 1""")
+    db.execute("""UPDATE "departments" SET "name" = 'Oil paintings' WHERE "id" = 1""")
+    db.execute("""UPDATE "mediums" SET "name" = 'oil paint' WHERE "id" = 1""")
+    assert_in_sync(db)
+
+    db.execute('DELETE FROM "series" WHERE "id" = 2')
+    db.execute('DELETE FROM "departments" WHERE "id" = 2')
+    db.execute('DELETE FROM "mediums" WHERE "id" = 3')
+    assert_in_sync(db)
+
+def test_sale_marks_artwork_sold(db):
+    db.execute("""INSERT INTO "sold_artworks" ("artwork_id", "person_id", "price") VALUES (1, 2, 1200.50)""")
+    assert_in_sync(db)
+    assert db.execute('SELECT "sold" FROM "art_list" WHERE "id" = 1').fetchone() == (1,)
@@ -0,0 +1,58 @@
+def indexed(conn):
+    """artworks_search as stored, by rowid."""
+    return conn.execute("""
+        SELECT "rowid", "title", "description", "keywords", "artist", "mediums", "series"
+        FROM "artworks_search" ORDER BY "rowid"
+    """).fetchall()
+
+def expected(conn):
+    """What artworks_search should hold: one row per art_list row, keywords from artworks."""
+    return conn.execute("""
+        SELECT "art_list"."id", "art_list"."title", "art_list"."description", "artworks"."keywords",
+            "art_list"."name", "art_list"."mediums", "art_list"."series"
+        FROM "art_list"
+        JOIN "artworks" ON "artworks"."id" = "art_list"."id"
+        ORDER BY "art_list"."id"
+    """).fetchall()
+
+def search(conn, query):
+    return [row[0] for row in conn.execute(
+        'SELECT "rowid" FROM "artworks_search" WHERE "artworks_search" MATCH ? ORDER BY "rowid"', (query,))]
+
+def test_backfill(db):
+    assert indexed(db) == expected(db)
+    assert search(db, "harbour") == [1]
+
+def test_artwork_insert_update_delete(db):
+    db.execute("""
+        INSERT INTO "artworks" ("id", "artist_id", "title", "size", "description", "keywords", "series")
+        VALUES (4, 1, 'Young Girl by the Window', '46 x 38 cm', 'Morning light', 'portrait', 1)
+    """)
+    db.execute('INSERT INTO "artworks_mediums" ("artwork_id", "medium_id") VALUES (4, 3)')
+    assert indexed(db) == expected(db)
+    assert search(db, "window") == [4]
+    assert search(db, "mediums:watercolour") == [3, 4]
+
+    db.execute("""UPDATE "artworks" SET "title" = 'Girl at the Balcony', "keywords" = 'portrait balcony' WHERE "id" = 4""")
+    assert indexed(db) == expected(db)
+    assert search(db, "window") == []
+    assert search(db, "balcony") == [4]
+
+    db.execute('DELETE FROM "artworks" WHERE "id" = 4')
+    assert indexed(db) == expected(db)
+    assert search(db, "balcony") == []
+
+def test_names_follow_artists_series_and_mediums(db):
+    db.execute("""UPDATE "artists" SET "last_name" = 'Caillebotte-Martial' WHERE "id" = 2""")
+    db.execute("""UPDATE "series" SET "name" = 'Ports' WHERE "id" = 1""")
+    db.execute("""UPDATE "mediums" SET "name" = 'aquarelle' WHERE "id" = 3""")
+    assert indexed(db) == expected(db)
+    assert search(db, "artist:martial") == [2, 3]
+    assert search(db, "series:ports") == [1]
+    assert search(db, "aquarelle") == [3]
+    assert search(db, "watercolour") == []
+
+def test_diacritics_and_prefixes(db):
+    db.execute("""UPDATE "artworks" SET "title" = 'Bateaux croisés' WHERE "id" = 1""")
+    assert search(db, "croises") == [1]
+    assert search(db, "roo*") == [2]
@@ -0,0 +1,44 @@
+def versions(conn):
+    return dict(conn.execute('SELECT "name", "version" FROM "catalog_versions"').fetchall())
+
+def test_artwork_writes_bump_artworks(db):
+    before = versions(db)
+    db.execute("""INSERT INTO "artworks" ("id", "artist_id", "title", "size") VALUES (4, 1, 'Summer Day', '45 x 75 cm')""")
+    inserted = versions(db)
+    assert inserted["artworks"] > before["artworks"]
+    assert inserted["artists"] == before["artists"]
+
+    db.execute("""UPDATE "artworks" SET "price" = 300 WHERE "id" = 4""")
+    updated = versions(db)
+    assert updated["artworks"] > inserted["artworks"]
+
+    db.execute('DELETE FROM "artworks" WHERE "id" = 4')
+    assert versions(db)["artworks"] > updated["artworks"]
+
+def test_names_shown_on_artworks_bump_artworks(db):
+    for statement in (
+        """UPDATE "series" SET "name" = 'Ports' WHERE "id" = 1""",
+        """UPDATE "departments" SET "name" = 'Oil paintings' WHERE "id" = 1""",
+        """UPDATE "mediums" SET "name" = 'oil paint' WHERE "id" = 1""",
+        """INSERT INTO "artworks_mediums" ("artwork_id", "medium_id") VALUES (3, 2)""",
+    ):
+        before = versions(db)["artworks"]
+        db.execute(statement)
+        assert versions(db)["artworks"] > before, statement
+
+def test_artist_writes_bump_both(db):
+    before = versions(db)
+    db.execute("""UPDATE "artists" SET "last_name" = 'Morisot-Manet' WHERE "id" = 1""")
+    after = versions(db)
+    assert after["artists"] > before["artists"]
+    assert after["artworks"] > before["artworks"]
+
+    db.execute("""INSERT INTO "artists" ("id", "first_name", "last_name", "short_bio") VALUES (3, 'Mary', 'Cassatt', 'Painter')""")
+    db.execute('DELETE FROM "artists" WHERE "id" = 3')
+    assert versions(db)["artists"] == after["artists"] + 2
+
+def test_unrelated_writes_leave_versions_alone(db):
+    before = versions(db)
+    db.execute("""UPDATE "artworks" SET "price" = "price" WHERE "id" = -1""")
+    db.execute("""INSERT INTO "organizations" ("name", "city", "state", "type") VALUES ('Cafe', 'Boston', 'MA', 'restaurant')""")
+    assert versions(db) == before
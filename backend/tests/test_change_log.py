@@ -0,0 +1,104 @@
+KEYS = {
+    "artists": '"id", NULL',
+    "departments": '"id", NULL',
+    "series": '"id", NULL',
+    "mediums": '"id", NULL',
+    "artworks": '"id", NULL',
+    "artworks_mediums": '"artwork_id", "medium_id"',
+}
+
+def replayed(conn, since=0):
+    """The keys per table that a client applying the log from `since` would hold, and the ones it would drop."""
+    present, deleted = {table: set() for table in KEYS}, {table: set() for table in KEYS}
+    for table_name, row_id, related_id, operation in conn.execute("""
+        SELECT "table_name", "row_id", "related_id", "operation" FROM "change_log" WHERE "seq" > ? ORDER BY "seq"
+    """, (since,)):
+        key = (row_id, related_id)
+        if operation == "delete":
+            present[table_name].discard(key)
+            deleted[table_name].add(key)
+        else:
+            present[table_name].add(key)
+            deleted[table_name].discard(key)
+    return present, deleted
+
+def keys(conn):
+    return {table: set(conn.execute(f'SELECT {columns} FROM "{table}"').fetchall()) for table, columns in KEYS.items()}
+
+def last_seq(conn):
+    return conn.execute('SELECT COALESCE(MAX("seq"), 0) FROM "change_log"').fetchone()[0]
+
+def test_backfill(db):
+    present, deleted = replayed(db)
+    assert present == keys(db)
+    assert not any(deleted.values())
+    assert {row[0] for row in db.execute('SELECT DISTINCT "operation" FROM "change_log"')} == {"insert"}
+
+def test_insert_update_delete(db):
+    seen = last_seq(db)
+    db.execute("""INSERT INTO "artists" ("id", "first_name", "last_name", "short_bio") VALUES (3, 'Mary', 'Cassatt', 'Painter')""")
+    db.execute("""INSERT INTO "mediums" ("id", "name") VALUES (4, 'pastel')""")
+    db.execute("""INSERT INTO "artworks" ("id", "artist_id", "title", "size") VALUES (4, 3, 'Mother and Child', '70 x 50 cm')""")
+    db.execute('INSERT INTO "artworks_mediums" ("artwork_id", "medium_id") VALUES (4, 4), (4, 2)')
+    present, deleted = replayed(db)
+    assert present == keys(db)
+    present, _ = replayed(db, seen)
+    assert present["artworks_mediums"] == {(4, 4), (4, 2)}
+    assert present["artists"] == {(3, None)}
+    assert present["artworks"] == present["mediums"] == {(4, None)}
+
+    seen = last_seq(db)
+    db.execute("""UPDATE "artworks" SET "title" = 'Mother and Child (Pastel)' WHERE "id" = 4""")
+    db.execute("""UPDATE "series" SET "name" = 'Ports' WHERE "id" = 1""")
+    db.execute("""UPDATE "mediums" SET "name" = 'pastel on paper' WHERE "id" = 4""")
+    db.execute('DELETE FROM "artworks_mediums" WHERE "artwork_id" = 4 AND "medium_id" = 2')
+    present, deleted = replayed(db)
+    assert present == keys(db)
+    present, deleted = replayed(db, seen)
+    assert present["artworks"] == present["mediums"] == {(4, None)}
+    assert present["series"] == {(1, None)}
+    assert deleted["artworks_mediums"] == {(4, 2)}
+
+    seen = last_seq(db)
+    db.execute('DELETE FROM "artworks" WHERE "id" = 4')
+    db.execute('DELETE FROM "mediums" WHERE "id" = 4')
+    db.execute('DELETE FROM "artists" WHERE "id" = 3')
+    db.execute('DELETE FROM "departments" WHERE "id" = 2')
+    present, deleted = replayed(db)
+    assert present == keys(db)
+    present, deleted = replayed(db, seen)
+    assert not any(present.values())
+    assert deleted["artworks"] == {(4, None)}
+    assert deleted["artworks_mediums"] == {(4, 4)}  # by schema.sql's remove_artwork_from_mediums
+    assert deleted["mediums"] == deleted["artworks"]
+    assert deleted["departments"] == {(2, None)}
+
+def test_link_update_moves_the_key(db):
+    seen = last_seq(db)
+    db.execute('UPDATE "artworks_mediums" SET "medium_id" = 3 WHERE "artwork_id" = 1 AND "medium_id" = 2')
+    present, deleted = replayed(db)
+    assert present == keys(db)
+    assert (1, 2) not in present["artworks_mediums"]
+    present, deleted = replayed(db, seen)
+    assert present["artworks_mediums"] == {(1, 3)}
+    assert deleted["artworks_mediums"] == {(1, 2)}
+
+def test_id_change_moves_the_key(db):
+    seen = last_seq(db)
+    db.execute('UPDATE "departments" SET "id" = 5 WHERE "id" = 2')
+    db.execute('UPDATE "mediums" SET "name" = \'oils\' WHERE "id" = 1')
+    present, deleted = replayed(db)
+    assert present == keys(db)
+    present, deleted = replayed(db, seen)
+    assert present["departments"] == {(5, None)}
+    assert deleted["departments"] == {(2, None)}
+    assert present["mediums"] == {(1, None)}
+    assert not deleted["mediums"]
+    operations = db.execute('SELECT "table_name", "row_id", "operation" FROM "change_log" WHERE "seq" > ? ORDER BY "seq"', (seen,))
+    assert operations.fetchall() == [("departments", 2, "delete"), ("departments", 5, "insert"), ("mediums", 1, "update")]
+
+def test_seq_is_never_reused(db):
+    seen = last_seq(db)
+    db.execute('DELETE FROM "change_log" WHERE "seq" = ?', (seen,))
+    db.execute("""UPDATE "departments" SET "name" = 'Drawings' WHERE "id" = 2""")
+    assert last_seq(db) == seen + 1
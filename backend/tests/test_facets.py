@@ -0,0 +1,66 @@
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.facets import FacetIndex
+
+def caught_up(db, writes):
+    """An index built before `writes` and caught up from the change log after, how many reloads that took,
+    and one built from scratch after."""
+    path = db.execute("PRAGMA database_list").fetchone()[2]
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        async with AsyncSession(engine) as session:
+            index = FacetIndex()
+            await index.rebuild(session)
+            reloads = []
+            reload = index.reload
+            async def counted_reload(session):
+                reloads.append(1)
+                await reload(session)
+            index.reload = counted_reload
+            for statement in writes:
+                db.execute(statement)
+            await session.rollback()  # a fresh read transaction, to see the writes
+            await index.catch_up(session)
+            fresh = FacetIndex()
+            await fresh.rebuild(session)
+        await engine.dispose()
+        return index, len(reloads), fresh
+
+    return asyncio.run(run())
+
+def assert_same(index, fresh):
+    for filters in ({}, {"medium": "oil"}, {"department": "Paintings"}, {"series": "Harbours"}, {"sold": 0}):
+        assert index.counts(**filters) == fresh.counts(**filters), filters
+
+def test_inserts_are_applied_without_a_reload(db):
+    index, reloads, fresh = caught_up(db, [
+        """INSERT INTO "mediums" ("id", "name") VALUES (4, 'pastel')""",
+        """INSERT INTO "series" ("id", "artist_id", "name") VALUES (3, 1, 'Portraits')""",
+        """INSERT INTO "departments" ("id", "name") VALUES (3, 'Sculpture')""",
+        """INSERT INTO "artworks" ("id", "artist_id", "title", "size", "department", "series", "year") VALUES (4, 1, 'Julie', '60 x 50 cm', 3, 3, 1884)""",
+        """INSERT INTO "artworks_mediums" ("artwork_id", "medium_id") VALUES (4, 4), (1, 4)""",
+        """UPDATE "artworks" SET "sold" = 1 WHERE "id" = 2""",
+    ])
+    assert reloads == 0
+    assert_same(index, fresh)
+    assert {"value": "pastel", "count": 2} in index.counts()["facets"]["medium"]
+    assert index.counts(series="Portraits")["total"] == 1
+
+def test_new_values_past_the_bitmap_rows(db):
+    writes = [f"""INSERT INTO "mediums" ("id", "name") VALUES ({medium_id}, 'medium {medium_id}')""" for medium_id in range(4, 24)]
+    writes.append(f"""INSERT INTO "artworks_mediums" ("artwork_id", "medium_id") VALUES {", ".join(f"(3, {medium_id})" for medium_id in range(4, 24))}""")
+    index, reloads, fresh = caught_up(db, writes)
+    assert reloads == 0
+    assert_same(index, fresh)
+    assert index.counts(medium="medium 23")["total"] == 1
+
+def test_renames_and_deletes_reload(db):
+    index, reloads, fresh = caught_up(db, [
+        """UPDATE "mediums" SET "name" = 'oil paint' WHERE "id" = 1""",
+        """DELETE FROM "series" WHERE "id" = 2""",
+    ])
+    assert reloads == 1
+    assert_same(index, fresh)
+    assert index.counts(medium="oil")["total"] == 0
+    assert index.counts(medium="oil paint")["total"] == 2
@@ -0,0 +1,73 @@
+CENTS = 'CAST(ROUND(COALESCE("sold_artworks"."price", 0) * 100) AS INTEGER)'
+MONTH = """COALESCE(strftime('%Y-%m', "date_sold"), strftime('%Y-%m', "timestamp"), 'unknown')"""
+
+# each rollup recomputed from sold_artworks, under the artist and organization type the sale was counted for
+EXPECTED = {
+    "sales_by_artist": f"""
+        SELECT "sales_rollup_snapshots"."artist_id", COUNT(*), SUM({CENTS}) FROM "sold_artworks"
+        JOIN "sales_rollup_snapshots" ON "sales_rollup_snapshots"."sale_id" = "sold_artworks"."id"
+        WHERE "sales_rollup_snapshots"."artist_id" IS NOT NULL
+        GROUP BY 1
+    """,
+    "sales_by_month": f'SELECT {MONTH}, COUNT(*), SUM({CENTS}) FROM "sold_artworks" GROUP BY 1',
+    "sales_by_organization_type": f"""
+        SELECT "sales_rollup_snapshots"."organization_type", COUNT(*), SUM({CENTS}) FROM "sold_artworks"
+        JOIN "sales_rollup_snapshots" ON "sales_rollup_snapshots"."sale_id" = "sold_artworks"."id"
+        GROUP BY 1
+    """,
+    "sales_by_collector": f'SELECT "person_id", COUNT(*), SUM({CENTS}) FROM "sold_artworks" GROUP BY 1',
+}
+
+def rollup(conn, table):
+    # a group whose last sale went away stays behind at zero
+    return sorted(row for row in conn.execute(f'SELECT * FROM "{table}"') if row[1] != 0 or row[2] != 0)
+
+def assert_in_sync(conn):
+    for table, query in EXPECTED.items():
+        assert rollup(conn, table) == sorted(conn.execute(query).fetchall()), table
+    snapshot_ids = [row[0] for row in conn.execute('SELECT "sale_id" FROM "sales_rollup_snapshots" ORDER BY 1')]
+    assert snapshot_ids == [row[0] for row in conn.execute('SELECT "id" FROM "sold_artworks" ORDER BY 1')]
+
+def test_backfill(db):
+    assert_in_sync(db)
+    assert rollup(db, "sales_by_artist") == [(2, 1, 90000)]
+    assert rollup(db, "sales_by_month") == [("2024-03", 1, 90000)]
+
+def test_sale_insert_update_delete(db):
+    db.execute("""
+        INSERT INTO "sold_artworks" ("id", "artwork_id", "person_id", "org_id", "price", "date_sold")
+        VALUES (2, 1, 2, 2, 1200.50, '2024-04-02'), (3, 3, 2, NULL, NULL, NULL)
+    """)
+    assert_in_sync(db)
+    assert rollup(db, "sales_by_organization_type") == [("gallery", 1, 120050), ("museum", 1, 90000), ("none", 1, 0)]
+    assert rollup(db, "sales_by_artist") == [(1, 1, 120050), (2, 2, 90000)]
+
+    db.execute("""UPDATE "sold_artworks" SET "price" = 1100, "date_sold" = '2024-03-20', "org_id" = 1 WHERE "id" = 2""")
+    db.execute("""UPDATE "sold_artworks" SET "person_id" = 1, "artwork_id" = 1 WHERE "id" = 3""")
+    assert_in_sync(db)
+
+    db.execute('DELETE FROM "sold_artworks" WHERE "id" IN (1, 3)')
+    assert_in_sync(db)
+    assert rollup(db, "sales_by_artist") == [(1, 1, 110000)]
+    assert rollup(db, "sales_by_collector") == [(2, 1, 110000)]
+
+    db.execute('DELETE FROM "sold_artworks"')
+    assert_in_sync(db)
+    assert rollup(db, "sales_by_month") == []
+
+def test_sales_stay_with_the_artist_and_organization_type_they_were_counted_for(db):
+    db.execute("""UPDATE "artworks" SET "artist_id" = 1 WHERE "id" = 2""")
+    db.execute("""UPDATE "organizations" SET "type" = 'gallery' WHERE "id" = 1""")
+    assert_in_sync(db)
+    assert rollup(db, "sales_by_artist") == [(2, 1, 90000)]
+    assert rollup(db, "sales_by_organization_type") == [("museum", 1, 90000)]
+
+    # taken back from where it was counted, then counted again under the current values
+    db.execute("""UPDATE "sold_artworks" SET "price" = 950 WHERE "id" = 1""")
+    assert_in_sync(db)
+    assert rollup(db, "sales_by_artist") == [(1, 1, 95000)]
+    assert rollup(db, "sales_by_organization_type") == [("gallery", 1, 95000)]
+
+    db.execute('DELETE FROM "sold_artworks" WHERE "id" = 1')
+    assert_in_sync(db)
+    assert rollup(db, "sales_by_artist") == []
@@ -1,11 +1,23 @@
 import argparse
 import sqlite3
 import csv
+import collections
+import hashlib
+import itertools
 import os
 import logging
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
 from datetime import datetime
 
 # python3 csv_to_artworks.py artwork_csv.csv ../db/artbasethree.db
+# python3 csv_to_artworks.py artwork_csv.csv ../db/artbasethree.db --bulk   (large files)
+# python3 csv_to_artworks.py artwork_csv.csv ../db/artbasethree.db --parallel   (multi-GB files, bad rows go to a reject file)
+# add --resume to either to carry on from where a crashed run of the same file stopped
+# add --duplicates warn (log it) or reject (skip the row) to check images for near-duplicates of ones already imported
 
 # CSV headers:
 # artist_name, title, size, year, end_year, description, keywords, mediums, series, department, image_url, hi_res_url, price, sold
@@ -112,58 +124,514 @@ def insert_mediums_for_artwork(conn, artwork_id, mediums):
         medium_id = check_and_insert_medium(conn, medium)
         cursor = conn.cursor()
         cursor.execute("""
-            INSERT INTO artworks_mediums (artwork_id, medium_id) VALUES (?, ?)
+            INSERT OR IGNORE INTO artworks_mediums (artwork_id, medium_id) VALUES (?, ?)
         """, (artwork_id, medium_id))
         conn.commit()
 
-def process_csv_file(csv_file, db_file):
+def parse_row(row):
+    """Pull the fields for one artwork out of a CSV row."""
+    return {
+        'artist_name': row['artist_name'],
+        'title': row['title'],
+        'size': row['size'],
+        'year': row['year'],
+        'end_year': row.get('end_year', None),
+        'description': row['description'],
+        'keywords': row['keywords'],
+        'price': row.get('price', None),
+        # Convert the sold value to an integer (1 or 0)
+        'sold': 1 if row.get('sold', '0') == '1' else 0,
+        'image_url': row['image_url'],
+        'hi_res_url': row.get('hi_res_url', None),
+        'mediums': row['mediums'].split(','),  # Assuming it's a comma-separated list
+        'series_name': row['series'],
+        'department_name': row['department'],
+    }
+
+def open_duplicate_check(conn, duplicates):
+    """The near-duplicate image check for --duplicates warn/reject, None when it's off.
+
+    duplicates is None or the DuplicateImageCheck options: reject, images_dir, fingerprints_dir.
+    """
+    if duplicates is None:
+        return None
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'image_fingerprints'").fetchone():
+        print("No image_fingerprints table yet (the API adds it on startup), skipping the near-duplicate image check.")
+        return None
+    from image_fingerprints import DuplicateImageCheck  # needs numpy and Pillow, only when checking
+    return DuplicateImageCheck(conn, **duplicates)
+
+def find_duplicate(check, fields):
+    """Log it if the row's image looks like one already in the catalog or earlier in the file. Returns the match."""
+    if check is None:
+        return None
+    match = check.check(fields['image_url'], fields['title'])
+    if match is not None:
+        action = "Skipped" if check.reject else "Added"
+        logging.warning(f"{action} near-duplicate image: {fields['title']} ({fields['image_url']}) looks like {match}")
+    return match
+
+def process_csv_file(csv_file, db_file, duplicates=None):
     """Process the CSV file and insert data into the database."""
     conn = create_connection(db_file)
+    check = open_duplicate_check(conn, duplicates)
 
     with open(csv_file, 'r') as f:
         reader = csv.DictReader(f)
 
         for row in reader:
-            artist_name = row['artist_name']
-            title = row['title']
-            size = row['size']
-            year = row['year']
-            end_year = row.get('end_year', None)
-            description = row['description']
-            keywords = row['keywords']
-            price = row.get('price', None)
-            
-            # Convert the sold value to an integer (1 or 0)
-            sold = 1 if row.get('sold', '0') == '1' else 0
-            
-            image_url = row['image_url']
-            hi_res_url = row.get('hi_res_url', None)
-            mediums = row['mediums'].split(',')  # Assuming it's a comma-separated list
-            series_name = row['series']
-            department_name = row['department']
+            fields = parse_row(row)
+
+            if find_duplicate(check, fields) is not None and check.reject:
+                continue
 
             # Insert artist
-            artist_id = check_and_insert_artist(conn, artist_name)
+            artist_id = check_and_insert_artist(conn, fields['artist_name'])
 
             # Insert series
-            series_id = check_and_insert_series(conn, artist_id, series_name)
+            series_id = check_and_insert_series(conn, artist_id, fields['series_name'])
 
             # Insert department
-            department_id = check_and_insert_department(conn, department_name)
+            department_id = check_and_insert_department(conn, fields['department_name'])
 
             # Insert artwork
-            artwork_id = check_and_insert_artwork(conn, artist_id, title, size, year, end_year, description, keywords, price, sold, image_url, hi_res_url, series_id, department_id)
+            artwork_id = check_and_insert_artwork(conn, artist_id, fields['title'], fields['size'], fields['year'], fields['end_year'],
+                                                  fields['description'], fields['keywords'], fields['price'], fields['sold'],
+                                                  fields['image_url'], fields['hi_res_url'], series_id, department_id)
 
             # Insert mediums for the artwork
-            insert_mediums_for_artwork(conn, artwork_id, mediums)
+            insert_mediums_for_artwork(conn, artwork_id, fields['mediums'])
+
+JOURNAL_TABLE = """
+    CREATE TABLE IF NOT EXISTS "import_journal" (
+        "file_hash" TEXT, -- sha256 of the CSV, so a renamed file still resumes and an edited one starts over
+        "file_name" TEXT NOT NULL,
+        "rows_committed" INTEGER NOT NULL DEFAULT(0), -- CSV data rows (good and rejected) covered by committed batches
+        "status" TEXT NOT NULL DEFAULT('running') CHECK("status" IN ('running', 'complete')),
+        "started_at" TIMESTAMP DEFAULT(CURRENT_TIMESTAMP),
+        "updated_at" TIMESTAMP DEFAULT(CURRENT_TIMESTAMP),
+        PRIMARY KEY("file_hash")
+    )
+"""
+
+def hash_file(path):
+    """sha256 of a file, read 1 MB at a time."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class ImportJournal:
+    """Checkpoints for one CSV file: how many of its rows are already committed.
+
+    record() doesn't commit on its own, it's called inside the same transaction as the batch it
+    describes, so the journal can never claim rows that didn't make it into the database.
+    """
+
+    def __init__(self, conn, file_hash, file_name):
+        self.conn = conn
+        self.file_hash = file_hash
+        self.file_name = file_name
+        with conn:
+            conn.execute(JOURNAL_TABLE)
+
+    def committed(self):
+        """Return (rows_committed, status) from the last run of this file, or (0, None) if there wasn't one."""
+        row = self.conn.execute('SELECT rows_committed, status FROM import_journal WHERE file_hash = ?',
+                                (self.file_hash,)).fetchone()
+        return row if row else (0, None)
+
+    def record(self, rows_committed, status='running'):
+        self.conn.execute("""
+            INSERT INTO import_journal (file_hash, file_name, rows_committed, status) VALUES (?, ?, ?, ?)
+            ON CONFLICT (file_hash) DO UPDATE SET
+                file_name = excluded.file_name, rows_committed = excluded.rows_committed,
+                status = excluded.status, updated_at = CURRENT_TIMESTAMP
+        """, (self.file_hash, self.file_name, rows_committed, status))
+
+def skip_rows(reader, count):
+    """Move a csv reader past its first count data rows without keeping them."""
+    collections.deque(itertools.islice(reader, count), maxlen=0)
+
+def integer_affinity(value):
+    """Mirror how SQLite stores text in an INTEGER column, so in-memory lookups match `year = ?` in SQL."""
+    if not isinstance(value, str):
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else number
+
+class BulkImporter:
+    """Imports artworks in chunked transactions instead of one commit per insert.
+
+    Artists, series, departments, mediums and existing artworks are loaded into dictionaries up front,
+    so there are no SELECTs per row. New rows get their ids handed out here, the same max(id) + 1 that
+    SQLite would pick, which lets each table go in with a single executemany and keeps the ids identical
+    to the per-row import.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.artists = self.load("SELECT artist_name, id FROM artists")
+        self.mediums = self.load("SELECT name, id FROM mediums")
+        self.series = self.load("SELECT name, artist_id, id FROM series")
+        self.departments = self.load("SELECT name, id FROM departments")
+        self.artworks = self.load("SELECT title, year, artist_id, id FROM artworks")
+        self.next_ids = {
+            table: conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+            for table in ('artists', 'mediums', 'series', 'departments', 'artworks')
+        }
+        self.allocated = []  # (table, key) handed out by the chunk being imported
+
+    def load(self, query):
+        """Map the leading columns to the id in the last column, keeping the first match like fetchone() does."""
+        lookup = {}
+        for *key, row_id in self.conn.execute(query):
+            if None in key:  # NULL never equals anything in SQL
+                continue
+            lookup.setdefault(key[0] if len(key) == 1 else tuple(key), row_id)
+        return lookup
+
+    def resolve(self, table, key, pending, values):
+        """Return the id for key, queueing a new row for table if it isn't known yet."""
+        if key in getattr(self, table):
+            return getattr(self, table)[key]
+        row_id = self.next_ids[table]
+        self.next_ids[table] += 1
+        getattr(self, table)[key] = row_id
+        pending[table].append((row_id, *values))
+        self.allocated.append((table, key))
+        return row_id
+
+    def forget_allocated(self, next_ids):
+        """Take back the ids and lookups a chunk that didn't commit handed out, so the importer can carry on."""
+        for table, key in self.allocated:
+            del getattr(self, table)[key]
+        self.next_ids = next_ids
+        self.allocated = []
+
+    def import_rows(self, rows, journal=None, rows_committed=None):
+        """Insert one chunk of parsed rows inside a single transaction, checkpointing the journal in the same one."""
+        pending = {table: [] for table in ('artists', 'mediums', 'series', 'departments', 'artworks')}
+        artwork_mediums = []
+        next_ids, self.allocated = dict(self.next_ids), []
+
+        for fields in rows:
+            artist_id = self.resolve('artists', fields['artist_name'], pending,
+                                     (fields['artist_name'], 'Unknown', 'Unknown', 'No bio available'))
+            series_id = self.resolve('series', (fields['series_name'], artist_id), pending,
+                                     (artist_id, fields['series_name']))
+            department_id = self.resolve('departments', fields['department_name'], pending,
+                                         (fields['department_name'],))
+
+            key = (fields['title'], integer_affinity(fields['year']), artist_id)
+            is_new = key not in self.artworks
+            artwork_id = self.resolve('artworks', key, pending, (
+                artist_id, fields['title'], fields['size'], fields['year'], fields['end_year'], fields['description'],
+                fields['keywords'], fields['price'], fields['sold'], fields['image_url'], fields['hi_res_url'],
+                series_id, department_id))
+            if is_new:
+                logging.info(f"Added artwork: {fields['title']} by {artist_id}")
+
+            for medium in fields['mediums']:
+                medium_id = self.resolve('mediums', medium, pending, (medium,))
+                artwork_mediums.append((artwork_id, medium_id))
+
+        try:
+            self.write(pending, artwork_mediums, journal, rows_committed)
+        except sqlite3.Error:
+            self.forget_allocated(next_ids)
+            raise
+        self.allocated = []
+
+    def write(self, pending, artwork_mediums, journal, rows_committed):
+        with self.conn:
+            self.conn.executemany("INSERT INTO artists (id, artist_name, first_name, last_name, short_bio) VALUES (?, ?, ?, ?, ?)",
+                                  pending['artists'])
+            self.conn.executemany("INSERT INTO series (id, artist_id, name) VALUES (?, ?, ?)", pending['series'])
+            self.conn.executemany("INSERT INTO departments (id, name) VALUES (?, ?)", pending['departments'])
+            self.conn.executemany("INSERT INTO mediums (id, name) VALUES (?, ?)", pending['mediums'])
+            self.conn.executemany("""
+                INSERT INTO artworks (id, artist_id, title, size, year, end_year, description, keywords, price, sold, image_url, hi_res_url, series, department)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, pending['artworks'])
+            self.conn.executemany("INSERT OR IGNORE INTO artworks_mediums (artwork_id, medium_id) VALUES (?, ?)", artwork_mediums)
+            if journal:
+                journal.record(rows_committed)
+
+def bulk_process_csv_file(csv_file, db_file, batch_size=1000, resume=False, duplicates=None):
+    """Process the CSV file in chunks of batch_size rows, one transaction per chunk. Returns the number of rows.
+
+    With resume, picks up after the last chunk a previous run of the same file committed.
+    """
+    conn = create_connection(db_file)
+    journal = ImportJournal(conn, hash_file(csv_file), os.path.basename(csv_file))
+    start, status = journal.committed() if resume else (0, None)
+    if status == 'complete':
+        print(f"{csv_file} was already imported, nothing to resume.")
+        conn.close()
+        return 0
+
+    importer = BulkImporter(conn)
+    check = open_duplicate_check(conn, duplicates)
+    started = time.perf_counter()
+    total = 0
+
+    with open(csv_file, 'r') as f:
+        reader = csv.DictReader(f)
+        skip_rows(reader, start)
+        while True:
+            rows = [parse_row(row) for row in itertools.islice(reader, batch_size)]
+            if not rows:
+                break
+            total += len(rows)
+            if check is not None:
+                rows = [fields for fields in rows if find_duplicate(check, fields) is None or not check.reject]
+            importer.import_rows(rows, journal, start + total)
+
+    with conn:
+        journal.record(start + total, 'complete')
+    conn.close()
+    elapsed = time.perf_counter() - started
+    rate = total / elapsed if elapsed else float(total)
+    logging.info(f"Bulk import: {total} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    print(f"Imported {total} rows in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    return total
+
+SOLD_VALUES = {'': 0, '0': 0, '1': 1, 'false': 0, 'true': 1, 'no': 0, 'yes': 1}
+
+def optional_int(value, field):
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{field} is not a whole number: {value!r}")
+
+def validate_row(row):
+    """Parse one CSV row and check it, normalizing as it goes. Raises ValueError for rows that should be rejected.
+
+    Unlike parse_row, blanks become NULL rather than empty strings, year/end_year/price are checked
+    and converted, sold accepts true/false/yes/no, and mediums are stripped and de-duplicated.
+    """
+    try:
+        fields = parse_row(row)
+    except (KeyError, AttributeError) as e:
+        raise ValueError(f"missing column {e}")
+
+    for field in ('artist_name', 'title', 'size'):
+        if not (fields[field] or '').strip():
+            raise ValueError(f"{field} is required")
+
+    fields['year'] = optional_int(fields['year'], 'year')
+    fields['end_year'] = optional_int(fields['end_year'], 'end_year')
+    if fields['year'] is not None and fields['end_year'] is not None and fields['end_year'] < fields['year']:
+        raise ValueError("end_year is before year")
+
+    price = (fields['price'] or '').strip()
+    if price:
+        try:
+            if Decimal(price) < 0:
+                raise ValueError(f"price is negative: {price!r}")
+        except InvalidOperation:
+            raise ValueError(f"price is not a number: {price!r}")
+    fields['price'] = price or None  # SQLite's NUMERIC affinity turns the text into a number
+
+    sold = (row.get('sold') or '').strip().lower()
+    if sold not in SOLD_VALUES:
+        raise ValueError(f"sold should be 0 or 1: {row.get('sold')!r}")
+    fields['sold'] = SOLD_VALUES[sold]
+
+    fields['mediums'] = list(dict.fromkeys(medium.strip() for medium in fields['mediums'] if medium.strip()))
+    fields['hi_res_url'] = fields['hi_res_url'] or None
+    return fields
+
+def validate_chunk(chunk):
+    """Worker process stage: validate a list of (line number, row) pairs, returning (good fields, rejected rows)."""
+    valid, rejected = [], []
+    for line, row in chunk:
+        try:
+            valid.append({**validate_row(row), 'line': line})
+        except ValueError as e:
+            rejected.append({**row, 'line': line, 'error': str(e)})
+    return valid, rejected
+
+def read_chunks(reader, batch_size):
+    """Reader stage: yield lists of (line number, row) pairs, batch_size rows at a time."""
+    while True:
+        chunk = []
+        for row in itertools.islice(reader, batch_size):
+            row.pop(None, None)  # extra values past the header
+            chunk.append((reader.line_num, row))
+        if not chunk:
+            return
+        yield chunk
+
+def write_batches(db_file, batches, reject_writer, stats, file_hash, file_name, duplicates=None):
+    """Writer stage: the only thread that touches the database or the reject file.
+
+    Takes (valid, rejected, row count) batches off the queue until it gets None, checkpointing the
+    journal with each one. If a batch trips a constraint
+    (e.g. a series name already used by another artist) it is retried row by row, and just the
+    offending rows are rejected. So are near-duplicate images, with --duplicates reject.
+    """
+    conn = None
+    try:
+        conn = create_connection(db_file)
+        journal = ImportJournal(conn, file_hash, file_name)
+        importer = BulkImporter(conn)
+        check = open_duplicate_check(conn, duplicates)
+    except BaseException as e:
+        # SystemExit included: the main thread re-raises it, the loop below just has to keep draining
+        stats['error'] = e
+    while True:
+        batch = batches.get()
+        if batch is None:
+            break
+        if 'error' in stats:
+            continue  # keep draining so the reader never blocks on a full queue
+        valid, rejected, row_count = batch
+        rows_committed = stats['rows_committed'] + row_count
+        try:
+            if check is not None:
+                kept = []
+                for fields in valid:
+                    match = find_duplicate(check, fields)
+                    if match is not None and check.reject:
+                        rejected.append({'artist_name': fields['artist_name'], 'title': fields['title'], 'image_url': fields['image_url'],
+                                         'line': fields['line'], 'error': f"image looks like {match}"})
+                    else:
+                        kept.append(fields)
+                valid = kept
+            try:
+                importer.import_rows(valid, journal, rows_committed)
+                stats['imported'] += len(valid)
+            except sqlite3.IntegrityError:
+                # import_rows took back the ids the failed batch handed out, so the same importer carries on
+                for fields in valid:
+                    try:
+                        importer.import_rows([fields])
+                        stats['imported'] += 1
+                    except sqlite3.IntegrityError as e:
+                        rejected.append({'artist_name': fields['artist_name'], 'title': fields['title'],
+                                         'line': fields['line'], 'error': str(e)})
+                with conn:
+                    journal.record(rows_committed)
+            reject_writer.writerows(rejected)
+            stats['rejected'] += len(rejected)
+            stats['rows_committed'] = rows_committed
+        except Exception as e:
+            stats['error'] = e
+    if 'error' not in stats:
+        with conn:
+            journal.record(stats['rows_committed'], 'complete')
+    if conn is not None:
+        conn.close()
+
+def pipeline_process_csv_file(csv_file, db_file, reject_file, batch_size=1000, workers=None, queue_size=4, resume=False, duplicates=None):
+    """Import a very large CSV using every core, with bounded memory.
+
+    The main process reads the CSV in chunks, a process pool validates them, and a single writer thread
+    imports them with BulkImporter. At most workers * 2 chunks are being validated and queue_size are
+    waiting to be written, so memory doesn't grow with the file. Bad rows go to reject_file with their
+    line number and the reason, and the import carries on. With resume, picks up after the last batch a
+    previous run of the same file committed and appends to its reject file.
+    """
+    file_hash, file_name = hash_file(csv_file), os.path.basename(csv_file)
+    start, status = 0, None
+    if resume:
+        conn = create_connection(db_file)
+        start, status = ImportJournal(conn, file_hash, file_name).committed()
+        conn.close()
+    if status == 'complete':
+        print(f"{csv_file} was already imported, nothing to resume.")
+        return None
+
+    workers = workers or os.cpu_count()
+    started = time.perf_counter()
+    stats = {'imported': 0, 'rejected': 0, 'rows_committed': start}
+    batches = queue.Queue(maxsize=queue_size)
+
+    with open(csv_file, 'r', newline='') as f, open(reject_file, 'a' if start else 'w', newline='') as rf:
+        reader = csv.DictReader(f)
+        reject_writer = csv.DictWriter(rf, fieldnames=[*(reader.fieldnames or []), 'line', 'error'], extrasaction='ignore')
+        if not start:
+            reject_writer.writeheader()
+        skip_rows(reader, start)
+
+        writer = threading.Thread(target=write_batches, args=(db_file, batches, reject_writer, stats, file_hash, file_name, duplicates))
+        writer.start()
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                in_flight = collections.deque()
+                for chunk in read_chunks(reader, batch_size):
+                    in_flight.append((pool.submit(validate_chunk, chunk), len(chunk)))
+                    # hand results to the writer in file order, so ids come out the same on every run
+                    # and the journal's row count always marks a clean point in the file
+                    if len(in_flight) >= workers * 2:
+                        future, row_count = in_flight.popleft()
+                        batches.put((*future.result(), row_count))
+                    if 'error' in stats:
+                        break
+                while in_flight and 'error' not in stats:
+                    future, row_count = in_flight.popleft()
+                    batches.put((*future.result(), row_count))
+                for future, _ in in_flight:
+                    future.cancel()
+        finally:
+            batches.put(None)
+            writer.join()
+
+    if 'error' in stats:
+        raise stats['error']
+
+    elapsed = time.perf_counter() - started
+    rate = stats['imported'] / elapsed if elapsed else float(stats['imported'])
+    logging.info(f"Parallel import: {stats['imported']} rows, {stats['rejected']} rejected, in {elapsed:.2f}s ({rate:.0f} rows/sec)")
+    print(f"Imported {stats['imported']} rows in {elapsed:.2f}s ({rate:.0f} rows/sec), {stats['rejected']} rejected -> {reject_file}")
+    return stats
 
 def main():
     parser = argparse.ArgumentParser(description="Insert artworks from CSV into SQLite database.")
     parser.add_argument('csv_file', help="The path to the CSV file.")
     parser.add_argument('db_file', help="The path to the SQLite database file.")
+    parser.add_argument('--bulk', action='store_true', help="Import in chunked transactions with executemany, much faster for large files.")
+    parser.add_argument('--parallel', action='store_true', help="Validate in a process pool and write from a single thread, for multi-GB files.")
+    parser.add_argument('--batch-size', type=int, default=1000, help="Rows per transaction in --bulk/--parallel mode (default 1000).")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes for --parallel (default: one per core).")
+    parser.add_argument('--reject-file', default=None, help="Where --parallel writes bad rows (default: <csv_file>.rejects.csv).")
+    parser.add_argument('--resume', action='store_true', help="With --bulk/--parallel, skip the rows a previous run of this file already committed.")
+    parser.add_argument('--duplicates', choices=('warn', 'reject', 'off'), default='off',
+                        help="Check each row's image for near-duplicates, which needs numpy and Pillow: log them, skip the row, or don't check (default: off).")
+    parser.add_argument('--images-dir', default=None, help="Folder the /images/... URLs point into, for the duplicate check (default: db/images).")
+    parser.add_argument('--fingerprints-dir', default=None, help="Where image_fingerprints.py keeps its matrices (default: db/fingerprints).")
     args = parser.parse_args()
-
-    process_csv_file(args.csv_file, args.db_file)
+    if args.resume and not (args.bulk or args.parallel):
+        parser.error("--resume needs --bulk or --parallel")
+
+    duplicates = None
+    if args.duplicates != 'off':
+        duplicates = {'reject': args.duplicates == 'reject'}
+        if args.images_dir:
+            duplicates['images_dir'] = args.images_dir
+        if args.fingerprints_dir:
+            duplicates['fingerprints_dir'] = args.fingerprints_dir
+
+    if args.parallel:
+        reject_file = args.reject_file or f"{os.path.splitext(args.csv_file)[0]}.rejects.csv"
+        pipeline_process_csv_file(args.csv_file, args.db_file, reject_file, args.batch_size, args.workers, resume=args.resume, duplicates=duplicates)
+    elif args.bulk:
+        bulk_process_csv_file(args.csv_file, args.db_file, args.batch_size, resume=args.resume, duplicates=duplicates)
+    else:
+        process_csv_file(args.csv_file, args.db_file, duplicates)
     print("Artwork processing complete.")
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps, features
+
+# python3 image_derivatives.py ../db/artbasethree.db
+# python3 image_derivatives.py ../db/artbasethree.db --images-dir ../db/images --workers 4
+
+# Makes thumbnail, medium and large copies of every artwork and artist image, as JPEG, WebP and
+# (when Pillow has it) AVIF. Files are named after the original's hash, so an unchanged original is
+# skipped and a replaced one gets new files and new URLs, which browsers and CDNs can cache forever.
+
+SIZES = {'thumb': 320, 'medium': 800, 'large': 1600}  # longest edge, in pixels
+FORMATS = {
+    'jpeg': {'quality': 82, 'optimize': True, 'progressive': True},
+    'webp': {'quality': 80, 'method': 6},
+}
+if features.check('avif'):
+    FORMATS['avif'] = {'quality': 60}
+
+DEFAULT_IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'db', 'images')
+DERIVATIVES_DIR = 'derivatives'  # inside the images dir, served under /images/derivatives/...
+
+def create_connection(db_file):
+    """Create a database connection to the SQLite database."""
+    conn = sqlite3.connect(db_file)
+    return conn
+
+def source_path(images_dir, url):
+    """Where an image URL like /images/picasso.png lives on disk."""
+    return os.path.join(images_dir, url.rsplit('/images/', 1)[-1].lstrip('/'))
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_derivatives(url, path, source_hash, images_dir):
+    """Worker process: write every size/format of one original. Returns rows for image_derivatives.
+
+    Sizes are never upscaled, a size the original is too small for is left out (thumb is always made).
+    """
+    out_dir = os.path.join(images_dir, DERIVATIVES_DIR, source_hash[:2])
+    os.makedirs(out_dir, exist_ok=True)
+    rows = []
+
+    with Image.open(path) as original:
+        original = ImageOps.exif_transpose(original)
+        for size, edge in SIZES.items():
+            if size != 'thumb' and max(original.size) < edge:
+                continue
+            resized = original.copy()
+            resized.thumbnail((edge, edge), Image.LANCZOS)
+            for format, options in FORMATS.items():
+                image = resized.convert('RGB') if format == 'jpeg' else resized.convert('RGBA' if 'A' in resized.getbands() else 'RGB')
+                filename = f"{source_hash[:16]}-{size}.{format if format != 'jpeg' else 'jpg'}"
+                file_path = os.path.join(out_dir, filename)
+                if not os.path.exists(file_path):
+                    # write then rename, so a crash never leaves a half-written file under the final name
+                    image.save(file_path + '.tmp', format=format.upper(), **options)
+                    os.replace(file_path + '.tmp', file_path)
+                rows.append((url, source_hash, size, format,
+                             f"/images/{DERIVATIVES_DIR}/{source_hash[:2]}/{filename}",
+                             image.width, image.height, os.path.getsize(file_path)))
+    return rows
+
+def image_urls(conn):
+    """Every distinct artwork and artist image URL."""
+    query = """
+        SELECT image_url FROM artworks WHERE image_url IS NOT NULL AND image_url != ''
+        UNION
+        SELECT image_url FROM artists WHERE image_url IS NOT NULL AND image_url != ''
+    """
+    return [row[0] for row in conn.execute(query)]
+
+def generate_derivatives(db_file, images_dir=DEFAULT_IMAGES_DIR, workers=None, force=False):
+    """Build derivatives for every image whose original changed since last time, in a process pool."""
+    conn = create_connection(db_file)
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'image_derivatives'").fetchone():
+        raise SystemExit("image_derivatives table is missing, start the API once so it applies db/migrations.")
+    known = dict(conn.execute("SELECT DISTINCT source_url, source_hash FROM image_derivatives"))
+    started = time.perf_counter()
+
+    jobs, missing = [], []
+    for url in image_urls(conn):
+        path = source_path(images_dir, url)
+        if not os.path.isfile(path):
+            missing.append(url)
+            continue
+        source_hash = hash_file(path)
+        if force or known.get(url) != source_hash:
+            jobs.append((url, path, source_hash))
+
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(make_derivatives, url, path, source_hash, images_dir) for url, path, source_hash in jobs]
+        for (url, path, source_hash), future in zip(jobs, futures):
+            try:
+                rows = future.result()
+            except OSError as e:  # unreadable or not an image
+                print(f"Skipped {url}: {e}")
+                continue
+            with conn:
+                conn.execute("DELETE FROM image_derivatives WHERE source_url = ?", (url,))
+                conn.executemany("""
+                    INSERT INTO image_derivatives (source_url, source_hash, size, format, url, width, height, bytes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+            done += 1
+
+    conn.close()
+    elapsed = time.perf_counter() - started
+    for url in missing:
+        print(f"Missing original for {url}")
+    print(f"Built derivatives for {done} of {len(jobs)} changed images in {elapsed:.2f}s "
+          f"({len(missing)} missing, formats: {', '.join(FORMATS)})")
+    return done
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate resized WebP/AVIF/JPEG copies of artwork and artist images.")
+    parser.add_argument('db_file', help="The path to the SQLite database file.")
+    parser.add_argument('--images-dir', default=DEFAULT_IMAGES_DIR, help="Folder the /images/... URLs point into (default: db/images).")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per core).")
+    parser.add_argument('--force', action='store_true', help="Rebuild everything, even images that haven't changed.")
+    args = parser.parse_args()
+
+    generate_derivatives(args.db_file, args.images_dir, args.workers, args.force)
+
+if __name__ == "__main__":
+    main()
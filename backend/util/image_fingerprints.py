@@ -0,0 +1,303 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from PIL import Image, ImageOps
+
+# python3 image_fingerprints.py ../db/artbasethree.db
+# python3 image_fingerprints.py ../db/artbasethree.db --images-dir ../db/images --workers 4
+
+# Fingerprints every artwork image for GET /artworks/{id}/similar and the near-duplicate check in
+# csv_to_artworks.py: a 64 bit perceptual (DCT) hash and a 64 bit difference hash, which survive
+# resizing, recompression and small edits, and a colour histogram vector for "looks like" ranking.
+# They live in two memory-mapped matrices, one row per image, so a search is a few NumPy operations
+# over every row at once. An image is only fingerprinted again when its file changes.
+
+DEFAULT_IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'db', 'images')
+DEFAULT_FINGERPRINTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'db', 'fingerprints')
+HASHES_FILE = 'hashes.npy'  # (rows, 2) uint64: perceptual hash, difference hash
+VECTORS_FILE = 'vectors.npy'  # (rows, 64) float32, unit length, so a dot product is the cosine
+HASH_BITS = 128
+COLOUR_LEVELS = 4  # per channel, 4 * 4 * 4 = 64 histogram bins
+
+# near duplicate: at most this many of the 128 hash bits differ and the colours agree this closely
+DUPLICATE_DISTANCE = 12
+DUPLICATE_COSINE = 0.9
+
+def create_connection(db_file):
+    """Create a database connection to the SQLite database."""
+    conn = sqlite3.connect(db_file)
+    return conn
+
+def source_path(images_dir, url):
+    """Where an image URL like /images/picasso.png lives on disk."""
+    return os.path.join(images_dir, url.rsplit('/images/', 1)[-1].lstrip('/'))
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def dct_matrix(n):
+    """Orthonormal DCT-II as a matrix, so a 2D DCT is two matrix products."""
+    k, i = np.arange(n)[:, None], np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+DCT_32 = dct_matrix(32)
+
+def pack_bits(bits):
+    return int(np.packbits(bits.ravel(), bitorder='little').view('<u8')[0])
+
+def fingerprint(path):
+    """(perceptual hash, difference hash) as ints and the colour vector of one image file."""
+    with Image.open(path) as image:
+        image.draft('RGB', (128, 128))  # JPEGs decode straight at 1/2..1/8 scale, much faster for big originals
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+        grey = np.asarray(image.convert('L').resize((32, 32), Image.LANCZOS), dtype=np.float64)
+        low = (DCT_32 @ grey @ DCT_32.T)[:8, :8]
+        perceptual = pack_bits(low > np.median(low.ravel()[1:]))  # the DC term says nothing about structure
+
+        small = np.asarray(image.convert('L').resize((9, 8), Image.LANCZOS), dtype=np.int16)
+        difference = pack_bits(small[:, 1:] > small[:, :-1])
+
+        pixels = np.asarray(image.resize((64, 64), Image.BILINEAR), dtype=np.uint16) * COLOUR_LEVELS // 256
+        bins = (pixels[..., 0] * COLOUR_LEVELS + pixels[..., 1]) * COLOUR_LEVELS + pixels[..., 2]
+        histogram = np.sqrt(np.bincount(bins.ravel(), minlength=COLOUR_LEVELS ** 3))  # Hellinger: square roots, then cosine
+        vector = (histogram / np.linalg.norm(histogram)).astype(np.float32)
+    return (perceptual, difference), vector
+
+def fingerprint_file(url, path, source_hash):
+    """Worker process: fingerprint one image, None if it can't be read."""
+    try:
+        hashes, vector = fingerprint(path)
+    except OSError:
+        return None
+    return url, source_hash, hashes, vector
+
+def search(hashes, vectors, query_hashes, query_vector):
+    """Hash bits differing (0-128) and colour cosine, for every row at once."""
+    query_hashes = np.array(query_hashes, dtype='<u8')
+    # a column at a time in uint8, several times quicker than reducing the (rows, 2) matrix
+    distance = np.bitwise_count(hashes[:, 0] ^ query_hashes[0]) + np.bitwise_count(hashes[:, 1] ^ query_hashes[1])
+    return distance, vectors @ query_vector
+
+def near_duplicates(distance, cosine):
+    return np.flatnonzero((distance <= DUPLICATE_DISTANCE) & (cosine >= DUPLICATE_COSINE))
+
+class FingerprintStore:
+    """The two matrices, memory-mapped, and image_fingerprints, which says which row is which image.
+
+    The files have spare rows; when they run out, a copy twice the size replaces them, so a reader
+    that has the old ones open keeps a consistent view until it reopens. Rows are written and flushed
+    before the rows in image_fingerprints that point at them are committed.
+
+    With read_only the files are opened for reading and never created: if they aren't there yet the
+    store is just empty.
+    """
+
+    def __init__(self, conn, fingerprints_dir=DEFAULT_FINGERPRINTS_DIR, read_only=False):
+        self.conn = conn
+        self.dir = fingerprints_dir
+        self.read_only = read_only
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'image_fingerprints'").fetchone():
+            raise SystemExit("image_fingerprints table is missing, start the API once so it applies db/migrations.")
+        self.rows = conn.execute('SELECT COALESCE(MAX("row"), -1) + 1 FROM image_fingerprints').fetchone()[0]
+        self.known = {url: (source_hash, row) for url, source_hash, row in
+                      conn.execute('SELECT source_url, source_hash, "row" FROM image_fingerprints')}
+        if read_only:
+            self.hashes, self.vectors = self.open_read_only()
+            return
+        os.makedirs(fingerprints_dir, exist_ok=True)
+        self.hashes = self.open(HASHES_FILE, (2,), '<u8')
+        self.vectors = self.open(VECTORS_FILE, (COLOUR_LEVELS ** 3,), '<f4')
+
+    def open_read_only(self):
+        paths = [os.path.join(self.dir, name) for name in (HASHES_FILE, VECTORS_FILE)]
+        if not all(os.path.exists(path) for path in paths):
+            self.rows = 0
+            return np.zeros((0, 2), '<u8'), np.zeros((0, COLOUR_LEVELS ** 3), '<f4')
+        hashes, vectors = (np.load(path, mmap_mode='r') for path in paths)
+        self.rows = min(self.rows, len(hashes), len(vectors))
+        return hashes, vectors
+
+    def open(self, name, row_shape, dtype, capacity=None):
+        path = os.path.join(self.dir, name)
+        if capacity is None and os.path.exists(path):
+            return np.load(path, mmap_mode='r+')
+        capacity = capacity or 1024
+        matrix = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=dtype, shape=(capacity, *row_shape))
+        if os.path.exists(path):
+            matrix[:self.rows] = np.load(path, mmap_mode='r')[:self.rows]
+        matrix.flush()
+        del matrix
+        os.replace(path + '.tmp', path)
+        return np.load(path, mmap_mode='r+')
+
+    def matrices(self):
+        """What's been stored so far, as (hashes, vectors)."""
+        return self.hashes[:self.rows], self.vectors[:self.rows]
+
+    def add(self, fingerprints):
+        """Store (url, source_hash, hashes, vector) tuples: a changed image keeps its row, a new one gets the next."""
+        if not fingerprints:
+            return
+        if self.read_only:
+            raise ValueError("this FingerprintStore was opened read-only")
+        rows, needed = [], self.rows
+        for url, source_hash, _, _ in fingerprints:
+            if url in self.known:
+                row = self.known[url][1]
+            else:
+                row, needed = needed, needed + 1
+            rows.append((url, source_hash, row))
+        if needed > len(self.hashes):
+            capacity = max(needed, len(self.hashes) * 2)
+            self.hashes = self.open(HASHES_FILE, (2,), '<u8', capacity)
+            self.vectors = self.open(VECTORS_FILE, (COLOUR_LEVELS ** 3,), '<f4', capacity)
+        for (_, _, row), (_, _, hashes, vector) in zip(rows, fingerprints):
+            self.hashes[row] = hashes
+            self.vectors[row] = vector
+        self.hashes.flush()
+        self.vectors.flush()
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO image_fingerprints (source_url, source_hash, "row") VALUES (?, ?, ?)
+                ON CONFLICT (source_url) DO UPDATE SET source_hash = excluded.source_hash
+            """, rows)
+        for url, source_hash, row in rows:
+            self.known[url] = (source_hash, row)
+        self.rows = max(self.rows, needed)
+
+class DuplicateImageCheck:
+    """Near-duplicate check for csv_to_artworks.py: is this row's image already in the catalog, or earlier in the file?
+
+    Images are compared against the stored fingerprints, read-only, and against the ones fingerprinted
+    so far in this run, which are only kept in memory; image_fingerprints.py stores them afterwards.
+    Rows whose image isn't a local file under images_dir pass unchecked.
+    """
+
+    def __init__(self, conn, images_dir=DEFAULT_IMAGES_DIR, fingerprints_dir=DEFAULT_FINGERPRINTS_DIR, reject=False):
+        self.conn = conn
+        self.images_dir = images_dir
+        self.reject = reject  # rejected rows aren't imported, so their images aren't remembered either
+        self.store = FingerprintStore(conn, fingerprints_dir, read_only=True)
+        # fingerprinted this run, in arrays that double as they fill so each check is one vectorized search
+        self.seen_hashes = np.zeros((1024, 2), '<u8')
+        self.seen_vectors = np.zeros((1024, COLOUR_LEVELS ** 3), '<f4')
+        self.seen_titles = []
+        self.seen_urls = set()
+
+    def check(self, image_url, title):
+        """The artwork title or URL this image looks like a copy of, or None."""
+        if not image_url:
+            return None
+        path = source_path(self.images_dir, image_url)
+        if not os.path.isfile(path):
+            return None
+        if image_url in self.seen_urls:
+            return None  # the same file as an earlier row, not a second copy of it
+        if image_url in self.store.known and self.store.known[image_url][0] == hash_file(path):
+            return None
+        try:
+            hashes, vector = fingerprint(path)
+        except OSError:
+            return None
+
+        match = None
+        stored_hashes, stored_vectors = self.store.matrices()
+        if len(stored_hashes):
+            distance, cosine = search(stored_hashes, stored_vectors, hashes, vector)
+            duplicates = near_duplicates(distance, cosine)
+            if len(duplicates):
+                row = int(duplicates[np.argmin(distance[duplicates])])
+                match = self.describe_row(row)
+        seen = len(self.seen_titles)
+        if match is None and seen:
+            distance, cosine = search(self.seen_hashes[:seen], self.seen_vectors[:seen], hashes, vector)
+            duplicates = near_duplicates(distance, cosine)
+            if len(duplicates):
+                match = self.seen_titles[int(duplicates[np.argmin(distance[duplicates])])]
+        if match is None or not self.reject:
+            self.remember(image_url, hashes, vector, title)
+        return match
+
+    def remember(self, image_url, hashes, vector, title):
+        seen = len(self.seen_titles)
+        if seen == len(self.seen_hashes):
+            self.seen_hashes = np.concatenate([self.seen_hashes, np.zeros_like(self.seen_hashes)])
+            self.seen_vectors = np.concatenate([self.seen_vectors, np.zeros_like(self.seen_vectors)])
+        self.seen_hashes[seen] = hashes
+        self.seen_vectors[seen] = vector
+        self.seen_titles.append(title)
+        self.seen_urls.add(image_url)
+
+    def describe_row(self, row):
+        found = self.conn.execute("""
+            SELECT artworks.title, image_fingerprints.source_url FROM image_fingerprints
+            LEFT JOIN artworks ON artworks.image_url = image_fingerprints.source_url
+            WHERE image_fingerprints."row" = ?
+        """, (row,)).fetchone()
+        return (found[0] or found[1]) if found else None
+
+def image_urls(conn):
+    """Every distinct artwork image URL."""
+    return [row[0] for row in conn.execute("SELECT DISTINCT image_url FROM artworks WHERE image_url IS NOT NULL AND image_url != ''")]
+
+def generate_fingerprints(db_file, images_dir=DEFAULT_IMAGES_DIR, fingerprints_dir=DEFAULT_FINGERPRINTS_DIR, workers=None, force=False):
+    """Fingerprint every artwork image that changed since last time, in a process pool."""
+    conn = create_connection(db_file)
+    store = FingerprintStore(conn, fingerprints_dir)
+    started = time.perf_counter()
+
+    jobs, missing = [], []
+    for url in image_urls(conn):
+        path = source_path(images_dir, url)
+        if not os.path.isfile(path):
+            missing.append(url)
+            continue
+        source_hash = hash_file(path)
+        if force or store.known.get(url, (None,))[0] != source_hash:
+            jobs.append((url, path, source_hash))
+
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        batch = []
+        for result in pool.map(fingerprint_file, *zip(*jobs), chunksize=16) if jobs else ():
+            if result is None:
+                continue
+            batch.append(result)
+            if len(batch) >= 1000:
+                store.add(batch)
+                done += len(batch)
+                batch = []
+        store.add(batch)
+        done += len(batch)
+
+    conn.close()
+    elapsed = time.perf_counter() - started
+    for url in missing:
+        print(f"Missing original for {url}")
+    print(f"Fingerprinted {done} of {len(jobs)} changed images in {elapsed:.2f}s ({len(missing)} missing, {store.rows} stored)")
+    return done
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute perceptual hashes and colour vectors of artwork images for similarity search.")
+    parser.add_argument('db_file', help="The path to the SQLite database file.")
+    parser.add_argument('--images-dir', default=DEFAULT_IMAGES_DIR, help="Folder the /images/... URLs point into (default: db/images).")
+    parser.add_argument('--fingerprints-dir', default=DEFAULT_FINGERPRINTS_DIR, help="Where the matrices are kept (default: db/fingerprints).")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per core).")
+    parser.add_argument('--force', action='store_true', help="Fingerprint everything, even images that haven't changed.")
+    args = parser.parse_args()
+
+    generate_fingerprints(args.db_file, args.images_dir, args.fingerprints_dir, args.workers, args.force)
+
+if __name__ == "__main__":
+    main()